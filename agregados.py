@@ -0,0 +1,123 @@
+"""
+🧮 AGREGADOS DOS DADOS
+Foto única dos números usados pelo dashboard, pela barra lateral e pelos responders,
+calculada uma vez por versão dos dados.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Colunas somadas do cálculo de VR (em uma única passada sobre a matriz numérica)
+COLUNAS_VR = ['VALOR_TOTAL', 'CUSTO_EMPRESA', 'DESCONTO_FUNCIONARIO', 'DIAS_FERIAS']
+
+
+def _contagem(df, coluna):
+    """Contagem por valor, maior primeiro (categorias sem linhas ficam de fora)"""
+    if coluna not in df.columns:
+        return pd.Series(dtype='int64')
+    contagem = df[coluna].value_counts()
+    return contagem[contagem > 0]
+
+
+def _taxa(parte, total):
+    return parte / total if total else 0.0
+
+
+def _cadastro(funcionarios):
+    """Contagens do cadastro de funcionários"""
+    return {
+        'funcionarios': len(funcionarios),
+        'por_situacao': _contagem(funcionarios, 'SITUACAO'),
+        'por_departamento': _contagem(funcionarios, 'DEPARTAMENTO'),
+        'por_sindicato': _contagem(funcionarios, 'SINDICATO')
+    }
+
+
+def _movimentacao(ferias, admissoes, desligamentos, total):
+    """Férias, admissões e desligamentos (tabelas pequenas: sempre recalculadas inteiras)"""
+    total_ferias = len(ferias)
+    total_admissoes = len(admissoes)
+    total_desligamentos = len(desligamentos)
+    dias_ferias = ferias['DIAS_FERIAS']
+
+    return {
+        'ferias': total_ferias,
+        'admissoes': total_admissoes,
+        'desligamentos': total_desligamentos,
+        'crescimento_liquido': total_admissoes - total_desligamentos,
+        'taxa_ferias': _taxa(total_ferias, total),
+        'rotatividade': _taxa(total_desligamentos, total),
+        'taxa_admissoes': _taxa(total_admissoes, total),
+
+        'admissoes_por_cargo': _contagem(admissoes, 'CARGO'),
+        'desligamentos_por_motivo': _contagem(desligamentos, 'MOTIVO'),
+        'comunicados_ok': int((desligamentos['COMUNICADO'] == 'OK').sum()) if total_desligamentos else 0,
+
+        'ferias_media_dias': float(dias_ferias.mean()) if total_ferias else 0.0,
+        'ferias_max_dias': int(dias_ferias.max()) if total_ferias else 0,
+        'ferias_min_dias': int(dias_ferias.min()) if total_ferias else 0,
+        'ferias_total_dias': int(dias_ferias.sum())
+    }
+
+
+def _somas_vr(vr):
+    """Partes somáveis do VR: podem ser subtraídas/acrescentadas linha a linha"""
+    elegivel = (vr['ELEGIVEL'] == 'SIM').to_numpy()
+    valores = vr[COLUNAS_VR].to_numpy(dtype=np.float64)
+    somas = dict(zip(COLUNAS_VR, valores.sum(axis=0))) if len(vr) else dict.fromkeys(COLUNAS_VR, 0.0)
+    return {
+        'vr_linhas': len(vr),
+        'vr_elegiveis': int(elegivel.sum()),
+        'vr_valor_elegiveis': float(valores[elegivel, 0].sum()) if len(vr) else 0.0,
+        'vr_valor_total': float(somas['VALOR_TOTAL']),
+        'vr_custo_empresa': float(somas['CUSTO_EMPRESA']),
+        'vr_desconto': float(somas['DESCONTO_FUNCIONARIO']),
+        'vr_dias_ferias': int(somas['DIAS_FERIAS'])
+    }
+
+
+def _vr(somas, vr):
+    """
+    Indicadores de VR a partir das somas (mínimo/máximo lidos da tabela atual).
+
+    A taxa de elegibilidade é sobre as linhas do VR (cadastro + admitidos do mês), não sobre o
+    total do cadastro usado nas taxas de movimentação.
+    """
+    linhas, elegiveis = somas['vr_linhas'], somas['vr_elegiveis']
+    return {
+        **somas,
+        'vr_nao_elegiveis': linhas - elegiveis,
+        'vr_taxa_elegibilidade': _taxa(elegiveis, linhas),
+        'vr_valor_medio_elegivel': _taxa(somas['vr_valor_elegiveis'], elegiveis),
+        'vr_valor_diario_min': float(vr['VALOR_DIARIO'].min()) if len(vr) else 0.0,
+        'vr_valor_diario_max': float(vr['VALOR_DIARIO'].max()) if len(vr) else 0.0,
+        'vr_dias_uteis_mes': int(vr['DIAS_UTEIS_MES'].max()) if len(vr) else 0
+    }
+
+
+def calcular_agregados(dados):
+    """Contagens, elegibilidade, totais de VR e rotatividade das cinco tabelas"""
+    cadastro = _cadastro(dados['funcionarios'])
+    return {
+        **cadastro,
+        **_movimentacao(dados['ferias'], dados['admissoes'], dados['desligamentos'], cadastro['funcionarios']),
+        **_vr(_somas_vr(dados['vr']), dados['vr'])
+    }
+
+
+def atualizar_agregados(anteriores, dados, vr_removidas, vr_novas):
+    """
+    Agregados depois de uma movimentação, sem varrer o cadastro nem somar o VR inteiro de novo.
+
+    O cadastro não muda com a movimentação; férias/admissões/desligamentos são recalculados
+    e as somas de VR recebem só a diferença entre as linhas novas e as removidas.
+    """
+    removidas, novas = _somas_vr(vr_removidas), _somas_vr(vr_novas)
+    somas = {chave: anteriores[chave] - removidas[chave] + novas[chave] for chave in novas}
+
+    return {
+        **anteriores,
+        **_movimentacao(dados['ferias'], dados['admissoes'], dados['desligamentos'], anteriores['funcionarios']),
+        **_vr(somas, dados['vr'])
+    }
@@ -0,0 +1,151 @@
+"""
+🔍 DETECÇÃO DE ANOMALIAS
+Regras vetorizadas sobre as cinco tabelas (junções por hash com isin/merge e comparações
+de intervalos ordenados); cada regra devolve as matrículas problemáticas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculo_vr import contar_dias_uteis, limites_competencia
+
+
+SEVERIDADES = ['ALTA', 'MÉDIA', 'BAIXA']
+
+# Situações em que o funcionário não deveria receber VR
+SITUACOES_SEM_VR = ['Afastado', 'Licença']
+
+# Máximo de matrículas guardadas por anomalia (a contagem é sempre completa)
+MAX_MATRICULAS = 1000
+
+# Diferença (R$) abaixo da qual o VR de um desligado é considerado proporcional
+TOLERANCIA_PROPORCIONAL = 0.005
+
+
+# ==================== REGRAS ====================
+def duplicatas(dados, competencia):
+    """Matrículas repetidas no cadastro de ativos ou no cálculo de VR"""
+    repetidas = [
+        dados[tabela]['MATRICULA'][dados[tabela]['MATRICULA'].duplicated()]
+        for tabela in ('funcionarios', 'vr')
+    ]
+    return np.unique(np.concatenate([r.to_numpy() for r in repetidas]))
+
+
+def desligados_elegiveis(dados, competencia):
+    """
+    Desligados elegíveis com VR acima do proporcional: desligados antes da competência ou com
+    mais que VALOR_DIARIO × (dias úteis do mês − dias úteis depois do desligamento).
+
+    Quem sai durante o mês continua elegível aos dias trabalhados; isso não é anomalia.
+    """
+    inicio_mes, fim_mes = limites_competencia(competencia)
+    vr = dados['vr']
+    vr = vr[(vr['ELEGIVEL'] == 'SIM').to_numpy()]
+    desligamento = dados['desligamentos'].drop_duplicates('MATRICULA').set_index('MATRICULA')['DATA_DESLIGAMENTO']
+    data = vr['MATRICULA'].map(desligamento).to_numpy(dtype='datetime64[D]')
+    desligados = ~np.isnat(data)
+    vr, data = vr[desligados], data[desligados]
+
+    # Dias úteis da competência depois do desligamento (calendário do estado de cada linha)
+    depois = np.minimum(np.maximum(data + 1, inicio_mes), fim_mes)
+    estados = vr['ESTADO'].astype(object).fillna('').to_numpy(dtype=object)
+    dias_fora = contar_dias_uteis(depois, np.full(len(vr), fim_mes), estados, int(str(competencia)[:4]))
+    dias = np.clip(vr['DIAS_UTEIS_MES'].to_numpy(dtype=np.int64) - dias_fora, 0, None)
+    limite = vr['VALOR_DIARIO'].to_numpy(dtype=np.float64) * dias
+
+    acima = (data < inicio_mes) | (vr['VALOR_TOTAL'].to_numpy(dtype=np.float64) > limite + TOLERANCIA_PROPORCIONAL)
+    return np.unique(vr['MATRICULA'].to_numpy()[acima])
+
+
+def ferias_apos_desligamento(dados, competencia):
+    """Férias que terminam depois da data de desligamento"""
+    cruzamento = dados['ferias'][['MATRICULA', 'FIM_FERIAS']].merge(
+        dados['desligamentos'][['MATRICULA', 'DATA_DESLIGAMENTO']], on='MATRICULA'
+    )
+    problema = cruzamento['FIM_FERIAS'] >= cruzamento['DATA_DESLIGAMENTO']
+    return np.unique(cruzamento['MATRICULA'][problema.to_numpy()].to_numpy())
+
+
+def ferias_sobrepostas(dados, competencia):
+    """Períodos de férias da mesma matrícula que se sobrepõem (ordenados por início)"""
+    ferias = dados['ferias'][['MATRICULA', 'INICIO_FERIAS', 'FIM_FERIAS']].sort_values(
+        ['MATRICULA', 'INICIO_FERIAS'], kind='stable'
+    )
+    matriculas = ferias['MATRICULA'].to_numpy()
+    if len(ferias) < 2:
+        return np.array([], dtype=matriculas.dtype)
+
+    # Datas como inteiros (ns): cummax agrupado em datetime não é confiável entre versões do pandas
+    inicio = ferias['INICIO_FERIAS'].to_numpy('datetime64[ns]').view('int64')
+    fim = pd.Series(ferias['FIM_FERIAS'].to_numpy('datetime64[ns]').view('int64'))
+
+    # Maior fim visto até cada linha, dentro da mesma matrícula
+    fim_anterior = fim.groupby(matriculas, sort=False).cummax().to_numpy()
+    mesma = matriculas[1:] == matriculas[:-1]
+    sobreposta = mesma & (inicio[1:] <= fim_anterior[:-1])
+    return np.unique(matriculas[1:][sobreposta])
+
+
+def admissoes_futuras(dados, competencia):
+    """Admissões com data depois do fim da competência"""
+    _, fim = limites_competencia(competencia)
+    fim = pd.Timestamp(fim)
+    futuras = [
+        dados[tabela]['MATRICULA'][(dados[tabela]['DATA_ADMISSAO'] >= fim).to_numpy()]
+        for tabela in ('funcionarios', 'admissoes')
+    ]
+    return np.unique(np.concatenate([f.to_numpy() for f in futuras]))
+
+
+def vr_para_afastados(dados, competencia):
+    """VR com valor para quem está afastado ou de licença"""
+    funcionarios = dados['funcionarios']
+    afastados = funcionarios['MATRICULA'][funcionarios['SITUACAO'].isin(SITUACOES_SEM_VR).to_numpy()]
+    vr = dados['vr']
+    pagos = vr['MATRICULA'][(vr['VALOR_TOTAL'] > 0).to_numpy()]
+    return np.unique(pagos[pagos.isin(afastados)].to_numpy())
+
+
+# Ordem de exibição: (tipo, severidade, descrição com {n}, regra)
+REGRAS = [
+    ('DUPLICATA', 'ALTA', '{n} matrícula(s) duplicada(s) no cadastro ou no VR', duplicatas),
+    ('VR_AFASTADO', 'ALTA', '{n} afastado(s)/em licença recebendo VR', vr_para_afastados),
+    ('FERIAS_APOS_DESLIGAMENTO', 'ALTA', '{n} férias terminando após o desligamento', ferias_apos_desligamento),
+    ('DESLIGADO_ELEGIVEL', 'MÉDIA', '{n} desligado(s) com VR acima do proporcional', desligados_elegiveis),
+    ('FERIAS_SOBREPOSTAS', 'MÉDIA', '{n} matrícula(s) com períodos de férias sobrepostos', ferias_sobrepostas),
+    ('ADMISSAO_FUTURA', 'BAIXA', '{n} admissão(ões) depois do fim da competência', admissoes_futuras)
+]
+
+
+# ==================== MOTOR ====================
+def encontrar_matriculas(dados, competencia, regras=None):
+    """Matrículas encontradas por regra ({tipo: array}), sem limite nem resumo"""
+    return {tipo: regra(dados, competencia) for tipo, _, _, regra in regras or REGRAS}
+
+
+def resumir_anomalias(encontradas, regras=None):
+    """
+    Só as regras que encontraram algo, da mais grave para a menos grave.
+
+    Cada item: {'Tipo', 'Severidade', 'Descrição', 'Quantidade', 'Matrículas'} (até MAX_MATRICULAS).
+    """
+    anomalias = []
+    for tipo, severidade, descricao, _ in regras or REGRAS:
+        matriculas = encontradas.get(tipo, [])
+        if len(matriculas):
+            anomalias.append({
+                'Tipo': tipo,
+                'Severidade': severidade,
+                'Descrição': descricao.format(n=f"{len(matriculas):,}"),
+                'Quantidade': len(matriculas),
+                'Matrículas': matriculas[:MAX_MATRICULAS].tolist()
+            })
+
+    anomalias.sort(key=lambda a: SEVERIDADES.index(a['Severidade']))
+    return anomalias
+
+
+def detectar_anomalias(dados, competencia, regras=None):
+    """Roda todas as regras e resume o que encontraram (ver resumir_anomalias)"""
+    return resumir_anomalias(encontrar_matriculas(dados, competencia, regras), regras)
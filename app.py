@@ -6,143 +6,133 @@ Sistema com Chat Inteligente - 100% Gratuito
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
+import logging
+import os
 import random
 import re
-import base64
+import tempfile
+import threading
+import time
+from collections import deque
 from io import BytesIO
 
-# Configuração da página
-st.set_page_config(
-    page_title="Agente IA - Vale Refeição",
-    page_icon="🤖",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS Customizado
-st.markdown("""
-<style>
-    .main {padding-top: 0;}
-    .stAlert {background-color: #f0f8ff;}
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 10px;
-        color: white;
-        margin: 10px 0;
-    }
-    .chat-message {
-        padding: 10px;
-        border-radius: 10px;
-        margin: 5px 0;
-    }
-    .user-message {
-        background-color: #e3f2fd;
-        text-align: right;
-    }
-    .bot-message {
-        background-color: #f5f5f5;
-        text-align: left;
-    }
-</style>
-""", unsafe_allow_html=True)
+from agregados import atualizar_agregados, calcular_agregados
+from anomalias import detectar_anomalias
+from busca import IndiceBusca
+from cache import CacheRespostas, resposta_em_cache
+from calculo_vr import limites_competencia, nome_competencia
+from compactacao import compactar_dados, materializar
+from conciliacao import conciliar
+from conversas import CAMINHO_BANCO_PADRAO, HistoricoMensagens
+from cubo import DIMENSOES, CuboFuncionarios, interpretar
+from delta import aplicar_delta, parametros_vr
+from exportacao import FORMATOS, ArquivoExportado, exportar
+from gerador import gerar_dados
+from historico import PASTA_HISTORICO_PADRAO, carregar_resumo, comparar_vr, competencias, resolver_competencias, salvar_competencia
+from indices import IndiceMatriculas
+from intervalos import indices_de_datas
+from ingestao import carregar_delta, carregar_pasta
+from metricas import MetricasAgente, medir_tempo
+from navegacao import NavegadorTabela
+from roteador import INTENCOES_COM_DATA, classificar, extrair_meses, normalizar
+
+# Mês de referência do cálculo de VR
+COMPETENCIA_ATUAL = os.environ.get('AGENTE_VR_COMPETENCIA', '2025-01')
+
+# Pasta com as bases reais do mês (ativos, férias, admissões...); sem ela, usa dados simulados
+PASTA_DADOS = os.environ.get('AGENTE_VR_DADOS')
+
+# Retratos das competências fechadas (um Parquet por tabela e competência)
+PASTA_HISTORICO = os.environ.get('AGENTE_VR_HISTORICO', PASTA_HISTORICO_PADRAO)
+
+# Tamanho do quadro simulado (testes de carga usam valores maiores)
+FUNCIONARIOS_SIMULADOS = int(os.environ.get('AGENTE_VR_FUNCIONARIOS', '1816'))
+
+# Histórico do chat: mensagens por sessão em memória (as anteriores vão para o SQLite) e por página na tela
+LIMITE_MENSAGENS = int(os.environ.get('AGENTE_VR_MENSAGENS_MEMORIA', '40'))
+MENSAGENS_POR_PAGINA = int(os.environ.get('AGENTE_VR_MENSAGENS_PAGINA', '20'))
+CAMINHO_CONVERSAS = os.environ.get('AGENTE_VR_CONVERSAS', CAMINHO_BANCO_PADRAO)
+
+# Intenções em que cargo/departamento/sindicato/situação/elegibilidade na pergunta viram um recorte do cubo
+INTENCOES_CUBO = ['estatisticas', 'ferias', 'vr', 'padrao']
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s: %(message)s')
+
+# ==================== CONFIGURAÇÃO DA PÁGINA ====================
+def configurar_pagina():
+    """Aplica configuração e CSS da página (precisa ser o primeiro comando st)"""
+    # Configuração da página
+    st.set_page_config(
+        page_title="Agente IA - Vale Refeição",
+        page_icon="🤖",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # CSS Customizado
+    st.markdown("""
+    <style>
+        .main {padding-top: 0;}
+        .stAlert {background-color: #f0f8ff;}
+        .metric-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            border-radius: 10px;
+            color: white;
+            margin: 10px 0;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 # ==================== DADOS SIMULADOS ====================
-@st.cache_data
 def carregar_dados():
-    """Carrega dados simulados do sistema"""
-    
-    # Dados de funcionários ativos
-    np.random.seed(42)
-    matriculas = list(range(30000, 31816))
-    
-    # Situações possíveis
-    situacoes = ['Trabalhando'] * 1600 + ['Férias'] * 81 + ['Afastado'] * 50 + ['Licença'] * 30 + ['Home Office'] * 54
-    random.shuffle(situacoes)
-    
-    # Sindicatos
-    sindicatos = [
-        'SINDPD SP - SIND.TRAB.EM PROC DADOS SP',
-        'SINDPPD RS - SINDICATO TRAB. PROC. DADOS RS',
-        'SINDPD RJ - SINDICATO TRAB. PROC. DADOS RJ',
-        'SINDPD MG - SINDICATO TRAB. PROC. DADOS MG'
-    ]
-    
-    # Cargos
-    cargos = [
-        'ANALISTA DE SISTEMAS', 'DESENVOLVEDOR', 'ANALISTA CONTÁBIL',
-        'TECH RECRUITER', 'COORDENADOR', 'GERENTE', 'ASSISTENTE',
-        'ANALISTA DE DADOS', 'ENGENHEIRO DE SOFTWARE', 'PRODUCT OWNER'
-    ]
-    
-    # Criar DataFrame principal
-    dados_funcionarios = pd.DataFrame({
-        'MATRICULA': matriculas,
-        'NOME': [f'Funcionário {m}' for m in matriculas],
-        'CARGO': np.random.choice(cargos, len(matriculas)),
-        'SITUACAO': situacoes[:len(matriculas)],
-        'SINDICATO': np.random.choice(sindicatos, len(matriculas)),
-        'DATA_ADMISSAO': pd.date_range(start='2015-01-01', periods=len(matriculas), freq='D'),
-        'SALARIO': np.random.uniform(3000, 15000, len(matriculas)),
-        'DEPARTAMENTO': np.random.choice(['TI', 'RH', 'FINANCEIRO', 'OPERAÇÕES'], len(matriculas)),
-        'EMAIL': [f'func{m}@empresa.com' for m in matriculas]
-    })
-    
-    # Dados de férias
-    ferias_idx = dados_funcionarios[dados_funcionarios['SITUACAO'] == 'Férias'].index[:81]
-    dados_ferias = pd.DataFrame({
-        'MATRICULA': dados_funcionarios.loc[ferias_idx, 'MATRICULA'].values,
-        'DIAS_FERIAS': np.random.randint(5, 30, len(ferias_idx)),
-        'INICIO_FERIAS': pd.date_range(start='2025-01-01', periods=len(ferias_idx), freq='D'),
-        'FIM_FERIAS': pd.date_range(start='2025-01-15', periods=len(ferias_idx), freq='D')
-    })
-    
-    # Dados de admissões
-    novas_matriculas = list(range(35000, 35085))
-    dados_admissoes = pd.DataFrame({
-        'MATRICULA': novas_matriculas,
-        'DATA_ADMISSAO': pd.date_range(start='2025-01-01', periods=len(novas_matriculas), freq='D'),
-        'CARGO': np.random.choice(cargos, len(novas_matriculas)),
-        'STATUS': ['Novo'] * len(novas_matriculas)
-    })
-    
-    # Dados de desligamentos
-    desl_matriculas = np.random.choice(matriculas, 52, replace=False)
-    dados_desligamentos = pd.DataFrame({
-        'MATRICULA': desl_matriculas,
-        'DATA_DESLIGAMENTO': pd.date_range(start='2025-01-10', periods=len(desl_matriculas), freq='D'),
-        'MOTIVO': np.random.choice(['Pedido demissão', 'Término contrato', 'Justa causa'], len(desl_matriculas)),
-        'COMUNICADO': ['OK'] * len(desl_matriculas)
-    })
-    
-    # Dados de VR
-    dados_vr = pd.DataFrame({
-        'MATRICULA': matriculas,
-        'ELEGIVEL': np.random.choice(['SIM', 'NAO'], len(matriculas), p=[0.946, 0.054]),
-        'VALOR_DIARIO': 37.50,
-        'DIAS_UTEIS': 22,
-        'VALOR_TOTAL': 37.50 * 22,
-        'DESCONTO_FUNCIONARIO': 37.50 * 22 * 0.2,
-        'CUSTO_EMPRESA': 37.50 * 22 * 0.8
-    })
-    
-    return {
-        'funcionarios': dados_funcionarios,
-        'ferias': dados_ferias,
-        'admissoes': dados_admissoes,
-        'desligamentos': dados_desligamentos,
-        'vr': dados_vr
-    }
+    """
+    Carrega dados simulados do sistema (gerador determinístico, semente fixa).
+    
+    Sem st.cache_data: quem guarda os dados é o agente de carregar_agente(); o cache_data
+    copiaria (pickle) as tabelas a cada acesso e as movimentações aplicadas se perderiam.
+    """
+    return gerar_dados(FUNCIONARIOS_SIMULADOS, competencia=COMPETENCIA_ATUAL, seed=42)
+
+def criar_agente(dados):
+    """Compacta os dados e monta o agente (sem Streamlit: usado também pelo servidor HTTP)"""
+    dados, relatorio_memoria = compactar_dados(dados)
+    return AgenteChat(dados, relatorio_memoria=relatorio_memoria)
+
+@st.cache_resource
+def carregar_agente():
+    """Agente único do processo: dados, índices e caches compartilhados por todas as sessões"""
+    dados = carregar_pasta(PASTA_DADOS, COMPETENCIA_ATUAL) if PASTA_DADOS else carregar_dados()
+    return criar_agente(dados)
 
 # ==================== AGENTE INTELIGENTE ====================
 class AgenteChat:
-    """Agente inteligente que responde perguntas sobre funcionários"""
+    """
+    Agente inteligente que responde perguntas sobre funcionários.
     
-    def __init__(self, dados):
+    É compartilhado entre sessões: guarda só dados, índices e caches; o estado
+    de cada conversa fica em Conversa.
+    """
+    
+    def __init__(self, dados, indice=None, relatorio_memoria=None):
         self.dados = dados
-        self.contexto = []
+        # Versão de cada tabela: sobe a cada movimentação aplicada a ela
+        self._versoes = dict.fromkeys(dados, 0)
+        self._lock_dados = threading.Lock()
+        self.relatorio_memoria = relatorio_memoria
+        self.indice = indice if indice is not None else IndiceMatriculas(dados)
+        self.cache = CacheRespostas()
+        self.metricas = MetricasAgente()
+        self._agregados = None
+        self._anomalias = None
+        self._intervalos = None
+        self._busca = None
+        self._cubo = None
+        self._parametros_vr = None
+        self._navegadores = {}
+        self._lock_navegadores = threading.Lock()
         self.respostas_padrao = {
             'saudacao': [
                 "Olá! Sou o Agente Inteligente de VR. Como posso ajudar?",
@@ -161,73 +151,140 @@ class AgenteChat:
             ]
         }
     
-    def processar_pergunta(self, pergunta):
-        """Processa a pergunta e retorna resposta inteligente"""
+    def processar_pergunta(self, pergunta, arquivo=None):
+        """Processa a pergunta e retorna resposta inteligente (arquivo: retorno da operadora, para conciliar)"""
+        return self.processar_com_intencao(pergunta, arquivo)[1]
+    
+    def processar_com_intencao(self, pergunta, arquivo=None):
+        """Como processar_pergunta, devolvendo (intenção usada na resposta, resposta)"""
+        inicio = time.perf_counter()
         
+        # Classificar intenção e extrair entidades em uma única passada
+        rota = self.classificar(pergunta)
+        resposta = self.responder_rota(rota, pergunta, arquivo)
+        
+        self.metricas.registrar_pergunta(rota['intencao'], time.perf_counter() - inicio)
+        return rota['intencao'], resposta
+    
+    def responder_rota(self, rota, pergunta, arquivo=None):
+        """Despacha a pergunta já classificada para o responder da intenção"""
+        intencao = rota['intencao']
         pergunta_lower = pergunta.lower()
         
-        # Detectar saudações
-        if any(s in pergunta_lower for s in ['olá', 'oi', 'bom dia', 'boa tarde', 'boa noite', 'hello', 'hi']):
+        if intencao == 'saudacao':
             return random.choice(self.respostas_padrao['saudacao'])
         
-        # Detectar despedidas
-        if any(s in pergunta_lower for s in ['tchau', 'até', 'adeus', 'bye', 'obrigado', 'obrigada']):
+        if intencao == 'despedida':
             return random.choice(self.respostas_padrao['despedida'])
         
-        # Extrair matrícula da pergunta
-        matricula = self.extrair_matricula(pergunta)
+        if intencao == 'conciliacao':
+            return self.responder_conciliacao(arquivo)
+        
+        if intencao == 'matricula':
+            return self.consultar_matricula(rota['matricula'])
         
-        if matricula:
-            return self.consultar_matricula(matricula)
+        if intencao == 'comparacao':
+            return self.responder_comparacao(pergunta_lower)
+        
+        # Férias, admissões e desligamentos de um período: índice de intervalos
+        if intencao in INTENCOES_COM_DATA and rota.get('periodo'):
+            return self.responder_periodo(intencao, rota['periodo'], rota.get('evento'))
+        
+        # Recortes e agrupamentos ("analistas de TI em férias", "custo de VR por departamento"): cubo
+        if intencao in INTENCOES_CUBO:
+            # Pergunta sem intenção só é recorte com contagem/custo ou agrupamento; senão é busca
+            consulta = interpretar(pergunta, self.cubo(), exigir_pista=intencao == 'padrao')
+            if consulta is not None:
+                return self.responder_cubo(consulta['filtro'], consulta['por'], consulta['nao_reconhecidos'])
         
         # Perguntas gerais
-        if 'quantos' in pergunta_lower or 'total' in pergunta_lower:
+        if intencao == 'estatisticas':
             return self.responder_estatisticas(pergunta_lower)
         
-        if 'férias' in pergunta_lower or 'ferias' in pergunta_lower:
+        if intencao == 'ferias':
             return self.responder_ferias(pergunta_lower)
         
-        if 'admiss' in pergunta_lower or 'contrat' in pergunta_lower:
+        if intencao == 'admissoes':
             return self.responder_admissoes(pergunta_lower)
         
-        if 'deslig' in pergunta_lower or 'demiss' in pergunta_lower:
+        if intencao == 'desligamentos':
             return self.responder_desligamentos(pergunta_lower)
         
-        if 'vr' in pergunta_lower or 'vale' in pergunta_lower or 'refeição' in pergunta_lower:
+        if intencao == 'vr':
             return self.responder_vr(pergunta_lower)
         
+        # Sem matrícula: procurar nome, e-mail ou cargo parecidos
+        candidatos = self.buscar_texto(pergunta)
+        if candidatos:
+            return self.responder_busca(candidatos)
+        
         # Resposta padrão
         return self.resposta_inteligente_padrao(pergunta)
     
+    @medir_tempo('processar_lote')
+    def processar_lote(self, itens):
+        """Responde uma lista de perguntas/matrículas, na ordem de entrada"""
+        respostas = [None] * len(itens)
+        
+        # Itens só com dígitos são matrículas (de qualquer tamanho)
+        rotas = [
+            {'intencao': 'matricula', 'matricula': int(item)} if str(item).strip().isdigit()
+            else self.classificar(str(item))
+            for item in itens
+        ]
+        
+        # Matrículas: todas resolvidas de uma vez pelo índice
+        posicoes = [i for i, rota in enumerate(rotas) if rota['intencao'] == 'matricula']
+        matriculas = [rotas[i]['matricula'] for i in posicoes]
+        for i, matricula, registro in zip(posicoes, matriculas, self.indice.registros(matriculas)):
+            respostas[i] = self.formatar_consulta_matricula(matricula, registro)
+        self.metricas.registrar_pergunta('matricula', quantidade=len(posicoes))
+        
+        # Demais intenções: perguntas iguais são respondidas uma vez só
+        respondidas = {}
+        for i, (item, rota) in enumerate(zip(itens, rotas)):
+            if respostas[i] is None:
+                chave = (rota['intencao'], str(item).lower())
+                if chave not in respondidas:
+                    respondidas[chave] = self.processar_pergunta(str(item))
+                respostas[i] = respondidas[chave]
+        
+        return respostas
+    
+    def classificar(self, pergunta):
+        """Classifica a pergunta; datas relativas ("esta semana", "15/01") contam a partir da data de referência"""
+        hoje = self.data_referencia()
+        return classificar(pergunta, ano_padrao=hoje.year, hoje=hoje)
+    
+    def data_referencia(self):
+        """Data de hoje limitada ao mês da competência dos dados"""
+        inicio, fim = limites_competencia(COMPETENCIA_ATUAL)
+        inicio = pd.Timestamp(inicio).date()
+        fim = (pd.Timestamp(fim) - pd.Timedelta(days=1)).date()
+        return min(max(date.today(), inicio), fim)
+    
     def extrair_matricula(self, texto):
         """Extrai número de matrícula do texto"""
-        # Procurar por números de 5 dígitos
-        numeros = re.findall(r'\b\d{5}\b', texto)
-        if numeros:
-            return int(numeros[0])
-        
-        # Procurar por "matricula XXXXX"
-        match = re.search(r'matr[íi]cula\s*(\d+)', texto, re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-        
-        return None
+        return classificar(texto)['matricula']
     
+    @medir_tempo('consultar_matricula')
     def consultar_matricula(self, matricula):
         """Consulta informações completas de uma matrícula"""
         
-        # Procurar nos funcionários
-        func = self.dados['funcionarios'][self.dados['funcionarios']['MATRICULA'] == matricula]
+        # Resolver a matrícula em todas as tabelas pelo índice
+        return self.formatar_consulta_matricula(matricula, self.indice.registro(matricula))
+    
+    def formatar_consulta_matricula(self, matricula, registro):
+        """Formata a resposta a partir do registro da matrícula no índice"""
+        func_info = registro['funcionario']
         
-        if func.empty:
+        if func_info is None:
             # Procurar nas admissões
-            adm = self.dados['admissoes'][self.dados['admissoes']['MATRICULA'] == matricula]
-            if not adm.empty:
-                return self.formatar_resposta_admissao(adm.iloc[0])
+            if registro['admissao'] is not None:
+                return self.formatar_resposta_admissao(registro['admissao'])
             
             return f"❌ Matrícula {matricula} não encontrada no sistema."
         
-        func_info = func.iloc[0]
         resposta = f"""
 📋 **INFORMAÇÕES DA MATRÍCULA {matricula}**
 
@@ -245,9 +302,8 @@ class AgenteChat:
 """
         
         # Verificar férias
-        ferias = self.dados['ferias'][self.dados['ferias']['MATRICULA'] == matricula]
-        if not ferias.empty:
-            ferias_info = ferias.iloc[0]
+        ferias_info = registro['ferias']
+        if ferias_info is not None:
             resposta += f"""
 🏖️ **Informações de Férias:**
 • Dias de férias: {ferias_info['DIAS_FERIAS']}
@@ -256,9 +312,8 @@ class AgenteChat:
 """
         
         # Verificar desligamento
-        desl = self.dados['desligamentos'][self.dados['desligamentos']['MATRICULA'] == matricula]
-        if not desl.empty:
-            desl_info = desl.iloc[0]
+        desl_info = registro['desligamento']
+        if desl_info is not None:
             resposta += f"""
 📤 **Informações de Desligamento:**
 • Data: {desl_info['DATA_DESLIGAMENTO'].strftime('%d/%m/%Y')}
@@ -267,21 +322,20 @@ class AgenteChat:
 """
         
         # Informações de VR
-        vr = self.dados['vr'][self.dados['vr']['MATRICULA'] == matricula]
-        if not vr.empty:
-            vr_info = vr.iloc[0]
+        vr_info = registro['vr']
+        if vr_info is not None:
             resposta += f"""
 💳 **Vale Refeição:**
-• Elegível: {vr_info['ELEGIVEL']}
+• Elegível: {vr_info['ELEGIVEL']}{f" ({vr_info['MOTIVO_INELEGIBILIDADE']})" if vr_info.get('MOTIVO_INELEGIBILIDADE') else ''}
 • Valor diário: R$ {vr_info['VALOR_DIARIO']:.2f}
-• Dias úteis: {vr_info['DIAS_UTEIS']}
+• Dias úteis: {vr_info['DIAS_UTEIS']} de {vr_info['DIAS_UTEIS_MES']} ({vr_info['DIAS_FERIAS']} em férias)
 • Valor total: R$ {vr_info['VALOR_TOTAL']:.2f}
 • Desconto funcionário: R$ {vr_info['DESCONTO_FUNCIONARIO']:.2f}
 • Custo empresa: R$ {vr_info['CUSTO_EMPRESA']:.2f}
 """
         
         # Análise inteligente
-        resposta += self.gerar_analise_inteligente(func_info, ferias, desl, vr)
+        resposta += self.gerar_analise_inteligente(func_info, ferias_info, desl_info, vr_info)
         
         return resposta
     
@@ -298,7 +352,7 @@ class AgenteChat:
             return f"{meses} mês(es)"
     
     def gerar_analise_inteligente(self, func, ferias, desl, vr):
-        """Gera análise inteligente do funcionário"""
+        """Gera análise inteligente do funcionário (registros do índice ou None)"""
         analise = "\n🤖 **Análise Inteligente:**\n"
         
         # Análise de situação
@@ -310,64 +364,246 @@ class AgenteChat:
             analise += "• ✅ Funcionário ativo e trabalhando\n"
         
         # Análise de VR
-        if not vr.empty:
-            if vr.iloc[0]['ELEGIVEL'] == 'NAO':
-                analise += "• ❌ Não elegível ao VR - verificar motivo\n"
+        if vr is not None:
+            if vr['ELEGIVEL'] == 'NAO':
+                analise += f"• ❌ Não elegível ao VR - {vr.get('MOTIVO_INELEGIBILIDADE') or 'verificar motivo'}\n"
             else:
                 analise += "• ✅ Elegível ao VR\n"
         
         # Análise de desligamento
-        if not desl.empty:
+        if desl is not None:
             analise += "• 📤 Funcionário desligado - processo finalizado\n"
         
         # Recomendações
         analise += "\n💡 **Recomendações:**\n"
-        if func['SITUACAO'] == 'Férias' and not ferias.empty:
-            dias_restantes = (ferias.iloc[0]['FIM_FERIAS'] - datetime.now()).days
+        if func['SITUACAO'] == 'Férias' and ferias is not None:
+            dias_restantes = (pd.Timestamp(ferias['FIM_FERIAS']).date() - self.data_referencia()).days
             if dias_restantes > 0:
                 analise += f"• Retorno previsto em {dias_restantes} dias\n"
         
-        if not desl.empty:
+        if desl is not None:
             analise += "• Verificar pendências de rescisão\n"
         
         return analise
     
+    def versao_dados(self, tabelas=None):
+        """Identifica o estado atual das tabelas pedidas (todas por padrão); muda quando alguma é trocada"""
+        return tuple(
+            (nome, self._versoes.get(nome, 0), id(self.dados[nome]), self.dados[nome].shape)
+            for nome in (tabelas or self.dados)
+        )
+    
+    @property
+    def versao(self):
+        """Contador de movimentações aplicadas (soma das versões das tabelas)"""
+        return sum(self._versoes.values())
+    
+    @medir_tempo('aplicar_movimentacao')
+    def aplicar_movimentacao(self, delta):
+        """
+        Aplica admissões, desligamentos e férias do dia ({tabela: linhas}) sem recarregar a base.
+        
+        O VR é calculado só para as matrículas afetadas, mas cada tabela tocada (e o VR) é remontada
+        inteira, e o índice de matrículas dessas tabelas é refeito inteiro: custo O(linhas) de cópia,
+        sem o cálculo de VR de todos. Os agregados recebem só a diferença das linhas de VR, e o que depende
+        só das tabelas que não mudaram (busca, navegadores) continua valendo.
+        """
+        with self._lock_dados:
+            dados, alteracoes = aplicar_delta(self.dados, delta, COMPETENCIA_ATUAL, self.parametros_vr())
+            if not alteracoes['tabelas']:
+                return alteracoes
+            
+            versao_anterior = self.versao_dados()
+            agregados = self._agregados
+            
+            self.indice.atualizar(dados, alteracoes['tabelas'])
+            for tabela in alteracoes['tabelas']:
+                self._versoes[tabela] += 1
+            self.dados = dados
+            
+            if agregados is not None and agregados[0] == versao_anterior:
+                self._agregados = (self.versao_dados(), atualizar_agregados(
+                    agregados[1], dados, alteracoes['vr_removidas'], alteracoes['vr_novas']
+                ))
+            return alteracoes
+    
+    def parametros_vr(self):
+        """
+        (sindicatos, dias_uteis) do cálculo de VR carregado, para os recálculos parciais.
+
+        Só o cadastro os muda: as movimentações não tocam em funcionarios e as linhas de VR
+        recalculadas seguem estes mesmos parâmetros, então não é preciso varrer o VR a cada delta.
+        """
+        versao = self.versao_dados(['funcionarios'])
+        atual = self._parametros_vr
+        if atual is None or atual[0] != versao:
+            atual = self._parametros_vr = (versao, parametros_vr(self.dados))
+        return atual[1]
+    
+    def agregados(self):
+        """Foto dos agregados (contagens, elegibilidade, totais de VR), recalculada só quando os dados mudam"""
+        versao = self.versao_dados()
+        atual = self._agregados
+        if atual is None or atual[0] != versao:
+            atual = self._agregados = (versao, calcular_agregados(self.dados))
+        return atual[1]
+    
+    def anomalias(self):
+        """Anomalias encontradas pelas regras vetorizadas, recalculadas só quando os dados mudam"""
+        versao = self.versao_dados()
+        atual = self._anomalias
+        if atual is None or atual[0] != versao:
+            atual = self._anomalias = (versao, detectar_anomalias(self.dados, COMPETENCIA_ATUAL))
+        return atual[1]
+    
+    def intervalos(self):
+        """Índices de intervalos de datas (férias, admissões, desligamentos), refeitos só quando essas tabelas mudam"""
+        versao = self.versao_dados(['ferias', 'admissoes', 'desligamentos'])
+        atual = self._intervalos
+        if atual is None or atual[0] != versao:
+            atual = self._intervalos = (versao, indices_de_datas(self.dados))
+        return atual[1]
+    
+    def cubo(self):
+        """Cubo de contagens e somas de VR por dimensão, recalculado só quando o cadastro, as admissões ou o VR mudam"""
+        versao = self.versao_dados(['funcionarios', 'admissoes', 'vr'])
+        atual = self._cubo
+        if atual is None or atual[0] != versao:
+            atual = self._cubo = (versao, CuboFuncionarios(self.dados))
+        return atual[1]
+    
+    def busca(self):
+        """Índice de trigramas de NOME/EMAIL/CARGO, construído no primeiro uso e refeito só quando o cadastro muda"""
+        versao = self.versao_dados(['funcionarios'])
+        atual = self._busca
+        if atual is None or atual[0] != versao:
+            atual = self._busca = (versao, IndiceBusca(self.dados['funcionarios']))
+        return atual[1]
+    
+    def buscar_texto(self, pergunta, limite=5):
+        """Candidatos (nome, e-mail ou cargo) mais parecidos com a pergunta"""
+        termo = IndiceBusca.termo(pergunta)
+        return self.cache.obter(
+            'busca', (termo, limite), self.versao_dados(['funcionarios']),
+            lambda: self.busca().buscar(termo, limite)
+        )
+    
+    def navegador(self, tabela):
+        """Navegador paginado da tabela (bitmaps de filtro), criado no primeiro uso e refeito se os dados mudarem"""
+        versao = self.versao_dados([tabela])
+        with self._lock_navegadores:
+            atual = self._navegadores.get(tabela)
+            if atual is None or atual[0] != versao:
+                atual = self._navegadores[tabela] = (versao, NavegadorTabela(self.dados[tabela]))
+        return atual[1]
+    
+    @medir_tempo('responder_estatisticas')
+    @resposta_em_cache('estatisticas')
     def responder_estatisticas(self, pergunta):
         """Responde perguntas sobre estatísticas gerais"""
-        total_func = len(self.dados['funcionarios'])
-        total_ferias = len(self.dados['ferias'])
-        total_admissoes = len(self.dados['admissoes'])
-        total_desligamentos = len(self.dados['desligamentos'])
-        
-        elegíveis_vr = len(self.dados['vr'][self.dados['vr']['ELEGIVEL'] == 'SIM'])
+        ag = self.agregados()
         
         return f"""
 📊 **ESTATÍSTICAS DO SISTEMA**
 
 👥 **Quadro de Funcionários:**
-• Total de funcionários: {total_func}
-• Em férias: {total_ferias}
-• Taxa de férias: {(total_ferias/total_func*100):.1f}%
+• Total de funcionários: {ag['funcionarios']}
+• Em férias: {ag['ferias']}
+• Taxa de férias: {ag['taxa_ferias'] * 100:.1f}%
 
 📈 **Movimentação:**
-• Admissões recentes: {total_admissoes}
-• Desligamentos: {total_desligamentos}
-• Crescimento líquido: {total_admissoes - total_desligamentos}
+• Admissões recentes: {ag['admissoes']}
+• Desligamentos: {ag['desligamentos']}
+• Crescimento líquido: {ag['crescimento_liquido']}
 
 💳 **Vale Refeição:**
-• Funcionários elegíveis: {elegíveis_vr}
-• Taxa de elegibilidade: {(elegíveis_vr/total_func*100):.1f}%
-• Valor total mensal: R$ {elegíveis_vr * 37.50 * 22:,.2f}
+• Funcionários no cálculo (cadastro + admitidos): {ag['vr_linhas']}
+• Funcionários elegíveis: {ag['vr_elegiveis']}
+• Taxa de elegibilidade (das linhas de VR): {ag['vr_taxa_elegibilidade'] * 100:.1f}%
+• Valor total mensal: R$ {ag['vr_valor_total']:,.2f}
 
 🤖 **Análise do Agente:**
-• Situação: {"Normal ✅" if (total_ferias/total_func) < 0.1 else "Alta taxa de férias ⚠️"}
-• Rotatividade: {(total_desligamentos/total_func*100):.1f}%
-• Recomendação: {"Monitorar admissões" if total_admissoes > 50 else "Situação estável"}
+• Situação: {"Normal ✅" if ag['taxa_ferias'] < 0.1 else "Alta taxa de férias ⚠️"}
+• Rotatividade: {ag['rotatividade'] * 100:.1f}%
+• Recomendação: {"Monitorar admissões" if ag['admissoes'] > 50 else "Situação estável"}
+"""
+    
+    @medir_tempo('responder_periodo')
+    def responder_periodo(self, intencao, periodo, evento=None):
+        """Responde férias/admissões/desligamentos de um período (data ou intervalo) pelo índice de datas"""
+        return self.cache.obter(
+            f'{intencao}_periodo', (periodo, evento), self.versao_dados(['ferias', 'admissoes', 'desligamentos']),
+            lambda: self.formatar_periodo(intencao, periodo, evento)
+        )
+    
+    def formatar_periodo(self, intencao, periodo, evento=None):
+        """Monta a resposta do período a partir das posições devolvidas pelo índice"""
+        inicio, fim = periodo
+        indice = self.intervalos()[intencao]
+        um_dia = timedelta(days=1)
+        
+        if inicio == fim:
+            descricao = f"{inicio:%d/%m/%Y}"
+        else:
+            descricao = f"{inicio:%d/%m/%Y} a {fim:%d/%m/%Y}"
+        
+        if intencao == 'ferias':
+            if evento == 'retorno':
+                # Retorno é o dia seguinte ao fim das férias
+                posicoes = indice.terminando(inicio - um_dia, fim - um_dia)
+                titulo, situacao, ordem = "🔙 **RETORNOS DE FÉRIAS**", "voltando de férias", 'FIM_FERIAS'
+            elif evento == 'inicio':
+                posicoes = indice.comecando(inicio, fim)
+                titulo, situacao, ordem = "✈️ **SAÍDAS PARA FÉRIAS**", "saindo de férias", 'INICIO_FERIAS'
+            else:
+                posicoes = indice.sobrepostos(inicio, fim)
+                titulo, situacao, ordem = "🏖️ **FUNCIONÁRIOS EM FÉRIAS**", "de férias", 'INICIO_FERIAS'
+            formato = lambda row: (
+                f"• Matrícula {row['MATRICULA']}: {row['INICIO_FERIAS']:%d/%m} a {row['FIM_FERIAS']:%d/%m} "
+                f"({row['DIAS_FERIAS']} dias) - retorno {row['FIM_FERIAS'] + um_dia:%d/%m}"
+            )
+        elif intencao == 'admissoes':
+            posicoes = indice.comecando(inicio, fim)
+            titulo, situacao, ordem = "👋 **ADMISSÕES**", "admitido(s)", 'DATA_ADMISSAO'
+            formato = lambda row: f"• Matrícula {row['MATRICULA']}: {row['DATA_ADMISSAO']:%d/%m/%Y} - {row['CARGO']}"
+        else:
+            posicoes = indice.comecando(inicio, fim)
+            titulo, situacao, ordem = "📤 **DESLIGAMENTOS**", "desligado(s)", 'DATA_DESLIGAMENTO'
+            formato = lambda row: f"• Matrícula {row['MATRICULA']}: {row['DATA_DESLIGAMENTO']:%d/%m/%Y} - {row['MOTIVO']}"
+        
+        if len(posicoes) == 0:
+            return f"""
+{titulo}
+
+📅 Período: {descricao}
+
+Nenhum registro encontrado no período.
+"""
+        
+        # Os 20 primeiros em ordem de data
+        tabela = self.dados[intencao]
+        datas = tabela[ordem].to_numpy()[posicoes]
+        amostra = tabela.take(posicoes[np.argsort(datas, kind='stable')[:20]])
+        lista = "\n".join([formato(row) for _, row in amostra.iterrows()])
+        
+        return f"""
+{titulo}
+
+📅 Período: {descricao}
+Total: {len(posicoes)} funcionário(s) {situacao}
+
+**Lista (primeiros {len(amostra)}):**
+{lista}
+
+💡 Use a matrícula específica para mais detalhes!
 """
     
+    @medir_tempo('responder_ferias')
+    @resposta_em_cache('ferias', lambda pergunta: 'quem' in pergunta or 'quais' in pergunta)
     def responder_ferias(self, pergunta):
         """Responde perguntas sobre férias"""
         ferias_df = self.dados['ferias']
+        ag = self.agregados()
         
         if 'quem' in pergunta or 'quais' in pergunta:
             # Listar alguns funcionários de férias
@@ -378,15 +614,15 @@ class AgenteChat:
             return f"""
 🏖️ **FUNCIONÁRIOS EM FÉRIAS**
 
-Total: {len(ferias_df)} funcionários
+Total: {ag['ferias']} funcionários
 
 **Amostra (primeiros 10):**
 {lista}
 
 📊 **Estatísticas:**
-• Média de dias: {ferias_df['DIAS_FERIAS'].mean():.1f}
-• Máximo: {ferias_df['DIAS_FERIAS'].max()} dias
-• Mínimo: {ferias_df['DIAS_FERIAS'].min()} dias
+• Média de dias: {ag['ferias_media_dias']:.1f}
+• Máximo: {ag['ferias_max_dias']} dias
+• Mínimo: {ag['ferias_min_dias']} dias
 
 💡 Use a matrícula específica para mais detalhes!
 """
@@ -394,77 +630,359 @@ Total: {len(ferias_df)} funcionários
         return f"""
 🏖️ **INFORMAÇÕES DE FÉRIAS**
 
-• Total de funcionários em férias: {len(ferias_df)}
-• Média de dias de férias: {ferias_df['DIAS_FERIAS'].mean():.1f}
-• Total de dias de férias concedidos: {ferias_df['DIAS_FERIAS'].sum()}
+• Total de funcionários em férias: {ag['ferias']}
+• Média de dias de férias: {ag['ferias_media_dias']:.1f}
+• Total de dias de férias concedidos: {ag['ferias_total_dias']}
 
 Digite uma matrícula específica para ver detalhes!
 """
     
+    @medir_tempo('responder_admissoes')
+    @resposta_em_cache('admissoes')
     def responder_admissoes(self, pergunta):
         """Responde sobre admissões"""
-        adm_df = self.dados['admissoes']
+        ag = self.agregados()
         
         return f"""
 📥 **ADMISSÕES RECENTES**
 
-• Total de novas contratações: {len(adm_df)}
-• Período: Janeiro/2025
+• Total de novas contratações: {ag['admissoes']}
+• Período: {nome_competencia(COMPETENCIA_ATUAL)}
 
 **Principais cargos contratados:**
-{adm_df['CARGO'].value_counts().head(5).to_string()}
+{ag['admissoes_por_cargo'].head(5).to_string()}
 
 💡 **Análise:**
-• Taxa de crescimento: {(len(adm_df)/len(self.dados['funcionarios'])*100):.1f}%
-• Recomendação: {"Crescimento acelerado ⚠️" if len(adm_df) > 50 else "Crescimento normal ✅"}
+• Taxa de crescimento: {ag['taxa_admissoes'] * 100:.1f}%
+• Recomendação: {"Crescimento acelerado ⚠️" if ag['admissoes'] > 50 else "Crescimento normal ✅"}
 """
     
+    @medir_tempo('responder_desligamentos')
+    @resposta_em_cache('desligamentos')
     def responder_desligamentos(self, pergunta):
         """Responde sobre desligamentos"""
-        desl_df = self.dados['desligamentos']
+        ag = self.agregados()
         
         return f"""
 📤 **DESLIGAMENTOS RECENTES**
 
-• Total de desligamentos: {len(desl_df)}
-• Período: Janeiro/2025
+• Total de desligamentos: {ag['desligamentos']}
+• Período: {nome_competencia(COMPETENCIA_ATUAL)}
 
 **Motivos:**
-{desl_df['MOTIVO'].value_counts().to_string()}
+{ag['desligamentos_por_motivo'].to_string()}
 
 📊 **Análise:**
-• Taxa de rotatividade: {(len(desl_df)/len(self.dados['funcionarios'])*100):.1f}%
-• Status: {"Alta rotatividade ⚠️" if len(desl_df) > 30 else "Rotatividade normal ✅"}
-• Comunicados processados: {len(desl_df[desl_df['COMUNICADO'] == 'OK'])}
+• Taxa de rotatividade: {ag['rotatividade'] * 100:.1f}%
+• Status: {"Alta rotatividade ⚠️" if ag['desligamentos'] > 30 else "Rotatividade normal ✅"}
+• Comunicados processados: {ag['comunicados_ok']}
 """
     
+    @medir_tempo('responder_vr')
+    @resposta_em_cache('vr')
     def responder_vr(self, pergunta):
-        """Responde sobre vale refeição"""
-        vr_df = self.dados['vr']
-        elegíveis = vr_df[vr_df['ELEGIVEL'] == 'SIM']
+        """Responde sobre vale refeição (a partir do cálculo mensal em dados['vr'])"""
+        ag = self.agregados()
         
         return f"""
 💳 **INFORMAÇÕES DE VALE REFEIÇÃO**
 
-**Resumo Geral:**
-• Total de funcionários: {len(vr_df)}
-• Elegíveis: {len(elegíveis)}
-• Não elegíveis: {len(vr_df) - len(elegíveis)}
-• Taxa de elegibilidade: {(len(elegíveis)/len(vr_df)*100):.1f}%
+**Resumo Geral ({COMPETENCIA_ATUAL}):**
+• Funcionários no cálculo (cadastro + admitidos): {ag['vr_linhas']}
+• Elegíveis: {ag['vr_elegiveis']}
+• Não elegíveis: {ag['vr_nao_elegiveis']}
+• Taxa de elegibilidade (das linhas de VR): {ag['vr_taxa_elegibilidade'] * 100:.1f}%
 
 **Valores:**
-• Valor diário: R$ 37,50
-• Dias úteis: 22
-• Valor mensal por funcionário: R$ 825,00
+• Valor diário: R$ {ag['vr_valor_diario_min']:.2f} a R$ {ag['vr_valor_diario_max']:.2f}
+• Dias úteis no mês: {ag['vr_dias_uteis_mes']}
+• Dias descontados por férias: {ag['vr_dias_ferias']}
+• Valor mensal médio por elegível: R$ {ag['vr_valor_medio_elegivel']:,.2f}
 
 **Custos Totais:**
-• Valor total VR: R$ {len(elegíveis) * 825:,.2f}
-• Custo empresa (80%): R$ {len(elegíveis) * 825 * 0.8:,.2f}
-• Desconto funcionários (20%): R$ {len(elegíveis) * 825 * 0.2:,.2f}
+• Valor total VR: R$ {ag['vr_valor_total']:,.2f}
+• Custo empresa (80%): R$ {ag['vr_custo_empresa']:,.2f}
+• Desconto funcionários (20%): R$ {ag['vr_desconto']:,.2f}
 
 🤖 **Análise Inteligente:**
-• Impacto na folha: {(len(elegíveis) * 825 * 0.8 / (len(vr_df) * 5000) * 100):.1f}% do total estimado
-• Recomendação: {"Custos dentro do esperado ✅" if len(elegíveis)/len(vr_df) < 0.95 else "Revisar critérios de elegibilidade ⚠️"}
+• Impacto na folha: {(ag['vr_custo_empresa'] / (ag['vr_linhas'] * 5000) * 100):.1f}% do total estimado
+• Recomendação: {"Custos dentro do esperado ✅" if ag['vr_taxa_elegibilidade'] < 0.95 else "Revisar critérios de elegibilidade ⚠️"}
+"""
+    
+    @medir_tempo('responder_cubo')
+    def responder_cubo(self, filtro, por=None, nao_reconhecidos=()):
+        """Responde contagens e custos de VR de um recorte (e, se pedido, agrupados por uma dimensão)"""
+        if nao_reconhecidos:
+            return self.formatar_nao_reconhecidos(filtro, nao_reconhecidos)
+        chave = (tuple(sorted((d, tuple(v)) for d, v in filtro.items())), por)
+        return self.cache.obter(
+            'cubo', chave, self.versao_dados(['funcionarios', 'admissoes', 'vr']),
+            lambda: self.formatar_cubo(filtro, por)
+        )
+    
+    def formatar_cubo(self, filtro, por=None):
+        """Monta a resposta do recorte a partir das células do cubo"""
+        cubo = self.cubo()
+        totais = cubo.totais(filtro)
+        curto = lambda valor: str(valor).split(' - ')[0]
+        
+        if filtro:
+            filtros = "\n".join([
+                f"• {DIMENSOES[d]}: {', '.join(curto(v) for v in valores)}" for d, valores in filtro.items()
+            ])
+        else:
+            filtros = "• Nenhum (todos os funcionários)"
+        
+        # Valores citados sem nenhuma linha nos dados (ex.: um estado sem funcionários): recorte vazio
+        ausentes = [
+            f"{DIMENSOES[d]} {curto(v)}" for d, valores in filtro.items() for v in valores if v not in cubo.valores(d)
+        ]
+        aviso = f"\n⚠️ Sem funcionários nos dados para: {', '.join(ausentes)}\n" if ausentes else ""
+        
+        resposta = f"""
+🧊 **CONSULTA POR RECORTE**
+
+**Filtros:**
+{filtros}
+{aviso}
+📊 **Resultado:**
+• Funcionários: {totais['FUNCIONARIOS']:,}
+• Elegíveis ao VR: {totais['ELEGIVEIS']:,}
+• Valor total VR: R$ {totais['VALOR_TOTAL']:,.2f}
+• Custo empresa: R$ {totais['CUSTO_EMPRESA']:,.2f}
+• Desconto funcionários: R$ {totais['DESCONTO_FUNCIONARIO']:,.2f}
+"""
+        
+        if por:
+            grupos = cubo.agrupar(por, filtro)
+            linhas = "\n".join([
+                f"• {curto(valor)}: {int(row['FUNCIONARIOS']):,} funcionário(s) · "
+                f"VR R$ {row['VALOR_TOTAL']:,.2f} · custo empresa R$ {row['CUSTO_EMPRESA']:,.2f}"
+                for valor, row in grupos.iterrows()
+            ]) or "• Nenhum funcionário no recorte"
+            resposta += f"""
+**Por {DIMENSOES[por].lower()}:**
+{linhas}
+"""
+        
+        return resposta + """
+💡 Combine cargo, departamento, sindicato, estado, situação e elegibilidade (ex.: "analistas de TI em férias por sindicato")
+"""
+    
+    def formatar_nao_reconhecidos(self, filtro, nao_reconhecidos):
+        """Recorte com termos desconhecidos: em vez de um total maior que o pedido, diz o que não foi entendido"""
+        cubo = self.cubo()
+        curto = lambda valor: str(valor).split(' - ')[0]
+        reconhecidos = "\n".join([
+            f"• {DIMENSOES[d]}: {', '.join(curto(v) for v in valores)}" for d, valores in filtro.items()
+        ]) or "• Nenhum"
+        estados = ', '.join(v for v in cubo.valores('ESTADO') if v != '(vazio)')
+        
+        return f"""
+🧊 **CONSULTA POR RECORTE**
+
+⚠️ Não reconheci: **{', '.join(nao_reconhecidos)}**. Para não mostrar um total maior que o pedido, o recorte não foi calculado.
+
+**Filtros reconhecidos:**
+{reconhecidos}
+
+💡 Recortes por local usam o estado (sigla ou nome) ou o sindicato. Estados nos dados: {estados or 'nenhum'}
+"""
+    
+    @medir_tempo('responder_busca')
+    def responder_busca(self, candidatos):
+        """Responde com os funcionários/cargos encontrados pela busca aproximada"""
+        funcionarios = self.dados['funcionarios']
+        melhor = candidatos[0]
+        
+        # Um nome/e-mail inconfundível: vai direto para a consulta da matrícula
+        if (melhor['coluna'] != 'CARGO' and len(melhor['linhas']) == 1 and melhor['nota'] >= 0.9
+                and (len(candidatos) == 1 or candidatos[1]['nota'] < melhor['nota'])):
+            return self.consultar_matricula(int(funcionarios['MATRICULA'].iloc[melhor['linhas'][0]]))
+        
+        itens = []
+        vistas = set()
+        for candidato in candidatos:
+            if candidato['coluna'] == 'CARGO':
+                exemplos = funcionarios['MATRICULA'].take(candidato['linhas'][:3])
+                itens.append(
+                    f"• Cargo {candidato['valor']}: {len(candidato['linhas']):,} funcionário(s) "
+                    f"(ex.: {', '.join(map(str, exemplos))})"
+                )
+                continue
+            
+            for _, row in materializar(funcionarios.take(candidato['linhas'][:3])).iterrows():
+                if row['MATRICULA'] not in vistas:
+                    vistas.add(row['MATRICULA'])
+                    itens.append(f"• Matrícula {row['MATRICULA']}: {row['NOME']} ({row['EMAIL']}) - {row['CARGO']}")
+        
+        lista = "\n".join(itens)
+        
+        return f"""
+🔎 **RESULTADOS DA BUSCA**
+
+Encontrei {len(itens)} resultado(s) parecido(s):
+
+{lista}
+
+💡 Digite a matrícula para ver as informações completas!
+"""
+    
+    def salvar_competencia(self):
+        """Grava a competência atual no histórico (FileExistsError se ela já foi salva)"""
+        return salvar_competencia(self.dados, COMPETENCIA_ATUAL, PASTA_HISTORICO)
+    
+    @medir_tempo('responder_comparacao')
+    def responder_comparacao(self, pergunta):
+        """Compara o VR de duas competências (a atual vem da memória; as demais, do histórico)"""
+        disponiveis = competencias(PASTA_HISTORICO)
+        try:
+            antes, depois = resolver_competencias(extrair_meses(pergunta), disponiveis, COMPETENCIA_ATUAL)
+        except ValueError as erro:
+            return f"""
+📚 **HISTÓRICO DE COMPETÊNCIAS**
+
+{erro}.
+
+• Competências salvas: {', '.join(nome_competencia(c) for c in disponiveis) or 'nenhuma'}
+• Competência atual: {nome_competencia(COMPETENCIA_ATUAL)}
+
+💡 Salve cada competência fechada na aba **📋 Dados** (Histórico de Competências) para compará-las depois.
+"""
+        
+        palavras = set(re.findall(r'\w+', normalizar(pergunta)))
+        foco = 'valores'
+        if palavras & {'perdeu', 'perderam'}:
+            foco = 'perderam'
+        elif palavras & {'ganhou', 'ganharam'}:
+            foco = 'ganharam'
+        
+        # A competência atual muda com as movimentações; um retrato salvo só muda se for salvo de novo
+        versao = tuple(
+            self.versao_dados(['vr']) if competencia == COMPETENCIA_ATUAL
+            else (competencia, carregar_resumo(competencia, PASTA_HISTORICO)['salva_em'])
+            for competencia in (antes, depois)
+        )
+        return self.cache.obter(
+            'comparacao', (antes, depois, foco), versao,
+            lambda: self.formatar_comparacao(antes, depois, foco)
+        )
+    
+    def formatar_comparacao(self, antes, depois, foco, limite=5):
+        """Totais das duas competências e a lista do foco (perderam, ganharam ou maiores variações)"""
+        def origem(competencia):
+            return self.dados['vr'] if competencia == COMPETENCIA_ATUAL else competencia
+        
+        comparacao = comparar_vr(origem(antes), origem(depois), PASTA_HISTORICO)
+        resumo_antes, resumo_depois = comparacao['resumo_antes'], comparacao['resumo_depois']
+        
+        if foco == 'perderam':
+            titulo, tabela = "📉 Perderam elegibilidade", comparacao['perderam']
+            itens = [
+                f"• Matrícula {row.MATRICULA}: {row.MOTIVO_INELEGIBILIDADE_DEPOIS or 'motivo não registrado'}"
+                for row in tabela.head(limite).itertuples()
+            ]
+        elif foco == 'ganharam':
+            titulo, tabela = "📈 Ganharam elegibilidade", comparacao['ganharam']
+            itens = [
+                f"• Matrícula {row.MATRICULA}: R$ {row.VALOR_TOTAL_DEPOIS:,.2f} (antes: {row.MOTIVO_INELEGIBILIDADE_ANTES or 'inelegível'})"
+                for row in tabela.head(limite).itertuples()
+            ]
+        else:
+            titulo, tabela = "💰 Maiores variações de valor", comparacao['valores']
+            variacao = (tabela['VALOR_TOTAL_DEPOIS'] - tabela['VALOR_TOTAL_ANTES']).abs()
+            itens = [
+                f"• Matrícula {row.MATRICULA}: R$ {row.VALOR_TOTAL_ANTES:,.2f} → R$ {row.VALOR_TOTAL_DEPOIS:,.2f}"
+                for row in tabela.loc[variacao.sort_values(ascending=False, kind='stable').index[:limite]].itertuples()
+            ]
+        if len(tabela) > limite:
+            itens.append(f"• ... e mais {len(tabela) - limite:,}")
+        lista = "\n".join(itens) or "nenhuma ✅"
+        
+        return f"""
+📚 **O QUE MUDOU NO VR: {nome_competencia(antes)} → {nome_competencia(depois)}**
+
+• Funcionários no cálculo: {resumo_antes['funcionarios']:,} → {resumo_depois['funcionarios']:,} ({len(comparacao['entraram']):,} entraram, {len(comparacao['sairam']):,} saíram)
+• Elegíveis: {resumo_antes['elegiveis']:,} → {resumo_depois['elegiveis']:,}
+• Valor total: R$ {resumo_antes['valor_total']:,.2f} → R$ {resumo_depois['valor_total']:,.2f} (R$ {resumo_depois['valor_total'] - resumo_antes['valor_total']:+,.2f})
+• Perderam elegibilidade: {len(comparacao['perderam']):,}
+• Ganharam elegibilidade: {len(comparacao['ganharam']):,}
+• Valor alterado: {len(comparacao['valores']):,} matrícula(s)
+
+**{titulo}:**
+{lista}
+"""
+    
+    @medir_tempo('responder_conciliacao')
+    def responder_conciliacao(self, arquivo):
+        """Concilia o arquivo de retorno da operadora com o VR calculado"""
+        if arquivo is None:
+            return """
+🧮 **CONCILIAÇÃO COM A OPERADORA**
+
+Nenhum arquivo de retorno foi enviado.
+
+💡 Envie o CSV da operadora (matrícula, valor creditado e status; pode ser .gz) em
+**🧮 Conciliação com a operadora**, logo abaixo do chat, e peça de novo: "conciliar arquivo".
+"""
+        
+        try:
+            resultado = conciliar(arquivo, self.dados)
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as erro:
+            return f"""
+❌ **ARQUIVO DE RETORNO INVÁLIDO**
+
+{erro}
+
+💡 O arquivo precisa de um cabeçalho com as colunas de matrícula e de valor creditado.
+"""
+        
+        return self.formatar_conciliacao(resultado)
+    
+    def formatar_conciliacao(self, resultado, limite=5):
+        """Resumo da conciliação com as maiores divergências de cada tipo"""
+        def secao(titulo, tabela):
+            if tabela.empty:
+                return f"**{titulo}:** nenhuma ✅"
+            linhas = [
+                f"• Matrícula {row.MATRICULA}: esperado R$ {row.ESPERADO:,.2f}, creditado R$ {row.CREDITADO:,.2f}"
+                for row in tabela.head(limite).itertuples()
+            ]
+            if len(tabela) > limite:
+                linhas.append(f"• ... e mais {len(tabela) - limite:,}")
+            total = tabela['DIFERENCA'].sum()
+            return f"**{titulo}:** {len(tabela):,} (diferença R$ {total:,.2f})\n" + "\n".join(linhas)
+        
+        sem_calculo = resultado['sem_calculo']
+        recusados = "\n".join(
+            f"• {status or '(sem status)'}: {linhas:,} linha(s), R$ {valor:,.2f}"
+            for status, (linhas, valor) in sorted(resultado['recusados'].items(), key=lambda item: -item[1][0])
+        )
+        diferenca = resultado['valor_creditado'] - resultado['valor_esperado']
+        divergencias = sum(len(resultado[k]) for k in ('faltantes', 'a_maior', 'a_menor', 'desligados'))
+        
+        return f"""
+🧮 **CONCILIAÇÃO COM A OPERADORA**
+
+• Linhas no arquivo: {resultado['linhas']:,} ({resultado['linhas_invalidas']:,} inválidas)
+• Valor esperado: R$ {resultado['valor_esperado']:,.2f}
+• Valor creditado: R$ {resultado['valor_creditado']:,.2f}
+• Diferença: R$ {diferenca:,.2f}
+
+{secao('❗ Créditos faltantes', resultado['faltantes'])}
+
+{secao('⬆️ Créditos a maior', resultado['a_maior'])}
+
+{secao('⬇️ Créditos a menor', resultado['a_menor'])}
+
+{secao('📤 Créditos a desligados', resultado['desligados'])}
+
+**❓ Matrículas fora do cálculo:** {sem_calculo['linhas']:,} linha(s), R$ {sem_calculo['valor']:,.2f}
+
+**🚫 Linhas recusadas pela operadora:**
+{recusados or "nenhuma ✅"}
+
+📊 **Status:** {"Conciliado ✅" if divergencias == 0 and sem_calculo['linhas'] == 0 else f"{divergencias:,} matrícula(s) com divergência ⚠️"}
 """
     
     def resposta_inteligente_padrao(self, pergunta):
@@ -477,6 +995,7 @@ Posso ajudar com:
 **📋 Consultas de Funcionários:**
 • Digite a matrícula (5 dígitos) para informações completas
 • Ex: "Consultar matrícula 30001"
+• Ou procure por nome, e-mail ou cargo: "func30001@empresa.com"
 
 **📊 Estatísticas Gerais:**
 • "Quantos funcionários temos?"
@@ -488,6 +1007,9 @@ Posso ajudar com:
 • "Admissões recentes"
 • "Desligamentos do mês"
 • "Informações sobre vale refeição"
+• "Conciliar arquivo" (retorno da operadora de VR)
+• "O que mudou no VR de fevereiro para março?"
+• "Quem perdeu elegibilidade?"
 
 **💡 Dica:** Seja específico para respostas mais precisas!
 
@@ -511,9 +1033,60 @@ Como posso ajudar?
 • Cadastrar em sistemas internos
 """
 
+class Conversa:
+    """Estado de uma sessão de chat (histórico e contexto) sobre um AgenteChat compartilhado"""
+    
+    def __init__(self, agente, limite_mensagens=LIMITE_MENSAGENS):
+        self.agente = agente
+        self.mensagens = HistoricoMensagens(limite_mensagens, CAMINHO_CONVERSAS)
+        # Últimas perguntas da sessão (limitadas como o histórico em memória)
+        self.contexto = deque(maxlen=limite_mensagens)
+        # Último retorno da operadora enviado na sessão (usado por "conciliar arquivo")
+        self.arquivo_conciliacao = None
+    
+    def perguntar(self, pergunta):
+        """Registra a pergunta, obtém a resposta do agente e guarda as duas no histórico"""
+        self.mensagens.adicionar('user', pergunta)
+        
+        resposta = self.agente.processar_pergunta(pergunta, arquivo=self.arquivo_conciliacao)
+        
+        self.mensagens.adicionar('bot', resposta)
+        self.contexto.append(pergunta)
+        
+        return resposta
+    
+    def limpar(self):
+        """Começa uma nova conversa"""
+        self.mensagens.limpar()
+        self.contexto.clear()
+
 # ==================== INTERFACE STREAMLIT ====================
 
+# Rótulo exibido -> chave em dados
+TABELAS = {
+    "Funcionários": 'funcionarios',
+    "Férias": 'ferias',
+    "Admissões": 'admissoes',
+    "Desligamentos": 'desligamentos',
+    "Vale Refeição": 'vr'
+}
+
+def separar_itens_lote(texto):
+    """Quebra o texto colado em itens: uma pergunta por linha, matrículas também por vírgula/espaço"""
+    itens = []
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if not linha:
+            continue
+        if re.fullmatch(r'[\d\s,;]+', linha):
+            itens.extend(re.findall(r'\d+', linha))
+        else:
+            itens.append(linha)
+    return itens
+
 def main():
+    configurar_pagina()
+    
     # Header
     st.markdown("""
     <div style='text-align: center; padding: 20px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-radius: 10px;'>
@@ -522,27 +1095,29 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Carregar dados
-    dados = carregar_dados()
-    
-    # Inicializar agente
-    if 'agente' not in st.session_state:
-        st.session_state.agente = AgenteChat(dados)
+    # Agente compartilhado pelo processo; cada sessão só cria sua conversa
+    agente = carregar_agente()
+    dados = agente.dados
     
-    if 'mensagens' not in st.session_state:
-        st.session_state.mensagens = []
+    if 'conversa' not in st.session_state:
+        st.session_state.conversa = Conversa(agente)
+    conversa = st.session_state.conversa
     
     # Sidebar com estatísticas
     with st.sidebar:
         st.markdown("### 📊 Estatísticas em Tempo Real")
         
+        # Tudo a partir da foto de agregados: um rerun não varre as tabelas
+        agregados = agente.agregados()
+        
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Total Funcionários", f"{len(dados['funcionarios']):,}")
-            st.metric("Em Férias", f"{len(dados['ferias'])}")
+            st.metric("Total Funcionários", f"{agregados['funcionarios']:,}")
+            st.metric("Em Férias", f"{agregados['ferias']:,}")
         with col2:
-            st.metric("Elegíveis VR", f"{len(dados['vr'][dados['vr']['ELEGIVEL'] == 'SIM']):,}")
-            st.metric("Taxa", "94.6%")
+            st.metric("Elegíveis VR", f"{agregados['vr_elegiveis']:,}")
+            st.metric("Taxa", f"{agregados['vr_taxa_elegibilidade']:.1%}",
+                      help=f"Elegíveis sobre as {agregados['vr_linhas']:,} linhas de VR (cadastro + admitidos)")
         
         st.markdown("---")
         
@@ -563,15 +1138,43 @@ def main():
         st.markdown("---")
         
         st.markdown("### 📈 Performance do Agente")
-        st.progress(0.946)
-        st.caption("94.6% de acurácia nas decisões")
+        cache_stats = agente.cache.estatisticas()
+        metricas = agente.metricas.resumo(cache_stats)
+        latencia = metricas['latencias'].get('processar_pergunta', {})
+        reconhecidas = 1 - metricas['taxa_sem_resposta']
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Perguntas", f"{metricas['perguntas']:,}")
+            st.metric("Latência p95", f"{latencia.get('p95_ms', 0):.1f} ms")
+        with col2:
+            st.metric("Acertos Cache", f"{cache_stats['taxa_acerto']:.0%}")
+            st.metric("Sem Resposta", f"{metricas['taxa_sem_resposta']:.1%}")
+        
+        st.progress(reconhecidas)
+        st.caption(
+            f"{reconhecidas:.1%} das perguntas reconhecidas · "
+            f"p50 {latencia.get('p50_ms', 0):.2f} ms · p99 {latencia.get('p99_ms', 0):.2f} ms"
+        )
         
-        st.markdown("### 🧠 Modelo ML")
-        if st.button("Treinar Modelo"):
-            with st.spinner("Treinando..."):
-                import time
-                time.sleep(2)
-                st.success("Modelo treinado com 94.3% de acurácia!")
+        if metricas['por_intencao']:
+            st.bar_chart(pd.Series(metricas['por_intencao'], name='Perguntas'))
+        
+        with st.expander("📤 Exportar métricas"):
+            st.download_button(
+                "Prometheus (texto)",
+                agente.metricas.exportar_prometheus(cache_stats),
+                file_name="metricas_agente.prom",
+                mime="text/plain",
+                key="metricas_prometheus"
+            )
+            st.download_button(
+                "JSON",
+                agente.metricas.exportar_json(cache_stats),
+                file_name="metricas_agente.json",
+                mime="application/json",
+                key="metricas_json"
+            )
     
     # Área principal - Chat
     tab1, tab2, tab3 = st.tabs(["💬 Chat Inteligente", "📊 Dashboard", "📋 Dados"])
@@ -582,22 +1185,18 @@ def main():
         # Container para mensagens
         container_mensagens = st.container()
         
-        # Exibir histórico de mensagens
+        # Exibir só a janela visível do histórico; "carregar mais" amplia a janela uma página por vez
+        if 'mensagens_visiveis' not in st.session_state:
+            st.session_state.mensagens_visiveis = MENSAGENS_POR_PAGINA
         with container_mensagens:
-            for msg in st.session_state.mensagens:
-                if msg['tipo'] == 'user':
-                    st.markdown(f"""
-                    <div class='chat-message user-message'>
-                        <strong>Você:</strong> {msg['texto']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class='chat-message bot-message'>
-                        <strong>🤖 Agente:</strong>
-                        {msg['texto']}
-                    </div>
-                    """, unsafe_allow_html=True)
+            anteriores = len(conversa.mensagens) - st.session_state.mensagens_visiveis
+            if anteriores > 0 and st.button(f"⬆️ Carregar mais ({anteriores:,} mensagens anteriores)", key="carregar_mais"):
+                st.session_state.mensagens_visiveis += MENSAGENS_POR_PAGINA
+                st.rerun()
+            
+            for msg in conversa.mensagens.ultimas(st.session_state.mensagens_visiveis):
+                with st.chat_message('user' if msg['tipo'] == 'user' else 'assistant'):
+                    st.markdown(msg['texto'])
         
         # Input de pergunta
         col1, col2 = st.columns([5, 1])
@@ -622,28 +1221,51 @@ def main():
             enviar = st.button("Enviar", type="primary", use_container_width=True)
         
         if enviar and pergunta:
-            # Adicionar pergunta ao histórico
-            st.session_state.mensagens.append({
-                'tipo': 'user',
-                'texto': pergunta
-            })
-            
-            # Processar resposta
-            resposta = st.session_state.agente.processar_pergunta(pergunta)
+            # Processar resposta (pergunta e resposta vão para o histórico)
+            conversa.perguntar(pergunta)
             
-            # Adicionar resposta ao histórico
-            st.session_state.mensagens.append({
-                'tipo': 'bot',
-                'texto': resposta
-            })
-            
-            # Rerun para atualizar o chat
+            # Rerun para atualizar o chat (de volta à página mais recente)
+            st.session_state.mensagens_visiveis = MENSAGENS_POR_PAGINA
             st.rerun()
         
         # Botão para limpar conversa
         if st.button("🔄 Nova Conversa"):
-            st.session_state.mensagens = []
+            conversa.limpar()
+            st.session_state.mensagens_visiveis = MENSAGENS_POR_PAGINA
             st.rerun()
+        
+        # Retorno da operadora para o comando "conciliar arquivo"
+        with st.expander("🧮 Conciliação com a operadora"):
+            conversa.arquivo_conciliacao = st.file_uploader(
+                "Arquivo de retorno (CSV com matrícula, valor creditado e status; aceita .gz):",
+                type=['csv', 'txt', 'gz'],
+                key="arquivo_conciliacao"
+            )
+            st.caption('Depois de enviar, pergunte "conciliar arquivo" no chat.')
+        
+        # Consulta em lote
+        with st.expander("📋 Consulta em lote"):
+            texto_lote = st.text_area(
+                "Cole matrículas ou perguntas (uma por linha; matrículas também podem vir separadas por vírgula):",
+                height=150,
+                key="input_lote"
+            )
+            
+            if st.button("Processar lote", key="enviar_lote") and texto_lote.strip():
+                itens = separar_itens_lote(texto_lote)
+                inicio = time.perf_counter()
+                respostas = agente.processar_lote(itens)
+                duracao = time.perf_counter() - inicio
+                
+                st.success(f"✅ {len(itens)} itens respondidos em {duracao * 1000:.0f} ms")
+                resultado_lote = pd.DataFrame({'Entrada': itens, 'Resposta': respostas})
+                st.dataframe(resultado_lote, use_container_width=True)
+                st.download_button(
+                    "📥 Baixar respostas (CSV)",
+                    resultado_lote.to_csv(index=False),
+                    file_name="consulta_lote.csv",
+                    mime="text/csv"
+                )
     
     with tab2:
         st.markdown("### 📊 Dashboard Analítico")
@@ -652,34 +1274,34 @@ def main():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.markdown("""
+            st.markdown(f"""
             <div class='metric-card'>
-                <h3>1,815</h3>
+                <h3>{agregados['funcionarios']:,}</h3>
                 <p>Total Funcionários</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col2:
-            st.markdown("""
+            st.markdown(f"""
             <div class='metric-card'>
-                <h3>1,717</h3>
+                <h3>{agregados['vr_elegiveis']:,}</h3>
                 <p>Elegíveis VR</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col3:
-            st.markdown("""
+            st.markdown(f"""
             <div class='metric-card'>
-                <h3>R$ 1.4M</h3>
+                <h3>R$ {agregados['vr_valor_total'] / 1e6:.1f}M</h3>
                 <p>Valor Total VR</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col4:
-            st.markdown("""
+            st.markdown(f"""
             <div class='metric-card'>
-                <h3>94.6%</h3>
-                <p>Taxa Elegibilidade</p>
+                <h3>{agregados['vr_taxa_elegibilidade']:.1%}</h3>
+                <p>Elegibilidade (das linhas de VR)</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -690,23 +1312,22 @@ def main():
         
         with col1:
             st.markdown("#### 📈 Distribuição por Situação")
-            situacao_counts = dados['funcionarios']['SITUACAO'].value_counts()
-            st.bar_chart(situacao_counts)
+            st.bar_chart(agregados['por_situacao'])
         
         with col2:
             st.markdown("#### 💼 Distribuição por Departamento")
-            dept_counts = dados['funcionarios']['DEPARTAMENTO'].value_counts()
-            st.bar_chart(dept_counts)
+            st.bar_chart(agregados['por_departamento'])
+        
+        st.markdown("#### 🏢 Distribuição por Sindicato")
+        st.bar_chart(agregados['por_sindicato'])
         
         # Análise de Anomalias
         st.markdown("---")
         st.markdown("### 🔍 Detecção de Anomalias")
         
-        anomalias = [
-            {"Tipo": "DUPLICATA", "Severidade": "ALTA", "Descrição": "3 matrículas duplicadas"},
-            {"Tipo": "VOLUME_ADMISSOES", "Severidade": "MÉDIA", "Descrição": "84 admissões (acima da média)"},
-            {"Tipo": "ROTATIVIDADE", "Severidade": "BAIXA", "Descrição": "Taxa de 2.9% (normal)"}
-        ]
+        anomalias = agente.anomalias()
+        if not anomalias:
+            st.success("✅ Nenhuma anomalia encontrada nas regras de verificação")
         
         for anomalia in anomalias:
             if anomalia['Severidade'] == 'ALTA':
@@ -715,6 +1336,12 @@ def main():
                 st.warning(f"⚠️ **{anomalia['Tipo']}**: {anomalia['Descrição']}")
             else:
                 st.info(f"ℹ️ **{anomalia['Tipo']}**: {anomalia['Descrição']}")
+            
+            with st.expander(f"Matrículas ({anomalia['Tipo']})"):
+                mostradas = anomalia['Matrículas']
+                st.write(", ".join(str(m) for m in mostradas[:200]))
+                if anomalia['Quantidade'] > 200:
+                    st.caption(f"Mostrando 200 de {anomalia['Quantidade']:,}")
     
     with tab3:
         st.markdown("### 📋 Visualização de Dados")
@@ -722,31 +1349,195 @@ def main():
         # Seletor de tabela
         tabela_selecionada = st.selectbox(
             "Selecione a tabela:",
-            ["Funcionários", "Férias", "Admissões", "Desligamentos", "Vale Refeição"]
+            list(TABELAS)
         )
         
-        # Exibir tabela correspondente
-        if tabela_selecionada == "Funcionários":
-            st.dataframe(dados['funcionarios'].head(100), use_container_width=True)
-        elif tabela_selecionada == "Férias":
-            st.dataframe(dados['ferias'], use_container_width=True)
-        elif tabela_selecionada == "Admissões":
-            st.dataframe(dados['admissoes'], use_container_width=True)
-        elif tabela_selecionada == "Desligamentos":
-            st.dataframe(dados['desligamentos'], use_container_width=True)
-        elif tabela_selecionada == "Vale Refeição":
-            st.dataframe(dados['vr'].head(100), use_container_width=True)
+        # Navegação paginada: filtros resolvidos no servidor, só a página visível vai para o navegador
+        chave_tabela = TABELAS[tabela_selecionada]
+        navegador = agente.navegador(chave_tabela)
+        
+        filtro = {'categorias': {}, 'intervalos': {}}
+        with st.expander("🔎 Filtros"):
+            colunas = st.columns(2)
+            for i, coluna in enumerate(navegador.colunas_categoricas):
+                with colunas[i % 2]:
+                    filtro['categorias'][coluna] = st.multiselect(
+                        coluna, navegador.valores(coluna), key=f"filtro_{chave_tabela}_{coluna}"
+                    )
+            
+            for coluna in navegador.colunas_intervalo:
+                minimo, maximo = navegador.limites(coluna)
+                if pd.isna(minimo):
+                    continue
+                if coluna == 'MATRICULA':
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        inicio = st.number_input("Matrícula de", value=int(minimo), step=1,
+                                                 key=f"filtro_{chave_tabela}_matricula_de")
+                    with col2:
+                        fim = st.number_input("Matrícula até", value=int(maximo), step=1,
+                                              key=f"filtro_{chave_tabela}_matricula_ate")
+                    filtro['intervalos'][coluna] = (
+                        None if inicio == int(minimo) else inicio,
+                        None if fim == int(maximo) else fim
+                    )
+                else:
+                    periodo = st.date_input(
+                        coluna, value=(minimo.date(), maximo.date()), key=f"filtro_{chave_tabela}_{coluna}"
+                    )
+                    # Enquanto só a data inicial foi escolhida, o intervalo fica aberto no fim
+                    periodo = tuple(periodo) + (None,) * (2 - len(periodo))
+                    if periodo != (minimo.date(), maximo.date()):
+                        filtro['intervalos'][coluna] = periodo
+        
+        inicio_filtro = time.perf_counter()
+        total_linhas = navegador.contar(filtro)
+        
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            tamanho_pagina = st.selectbox("Linhas por página:", [25, 50, 100, 200], index=1, key="tamanho_pagina")
+        total_paginas = max(1, -(-total_linhas // tamanho_pagina))
+        chave_pagina = f"pagina_{chave_tabela}"
+        if st.session_state.get(chave_pagina, 1) > total_paginas:
+            st.session_state[chave_pagina] = 1
+        with col2:
+            pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+        
+        st.dataframe(
+            navegador.pagina(filtro, int(pagina) - 1, tamanho_pagina),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(
+            f"{total_linhas:,} de {navegador.linhas:,} linhas · página {int(pagina)} de {total_paginas:,} · "
+            f"{(time.perf_counter() - inicio_filtro) * 1e3:.0f} ms"
+        )
+        
+        # Memória ocupada pelas tabelas (antes/depois da compactação)
+        if agente.relatorio_memoria is not None:
+            with st.expander("💾 Uso de memória"):
+                relatorio = agente.relatorio_memoria
+                st.caption(
+                    f"Total: {relatorio['Antes (MB)'].sum():.1f} MB → {relatorio['Depois (MB)'].sum():.1f} MB "
+                    f"(memory_usage deep=True)"
+                )
+                st.dataframe(
+                    relatorio.style.format({'Antes (MB)': '{:.2f}', 'Depois (MB)': '{:.2f}', 'Redução': '{:.0%}'}),
+                    use_container_width=True,
+                    hide_index=True
+                )
         
         # Download de dados
         st.markdown("---")
         st.markdown("### 📥 Exportar Dados")
         
-        if st.button("Gerar Relatório CSV"):
-            # Criar CSV
-            csv = dados['funcionarios'].to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="relatorio_funcionarios.csv">📥 Baixar CSV</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            tabela_exportacao = st.selectbox("Tabela:", list(TABELAS), key="exportar_tabela")
+        with col2:
+            formato = st.selectbox("Formato:", list(FORMATOS), key="exportar_formato")
+        df_exportacao = dados[TABELAS[tabela_exportacao]]
+        
+        # Recorte opcional por uma coluna categórica
+        filtro = {}
+        colunas_filtro = [c for c in df_exportacao.columns if isinstance(df_exportacao[c].dtype, pd.CategoricalDtype)]
+        if colunas_filtro:
+            coluna_filtro = st.selectbox("Filtrar por:", ["(sem filtro)"] + colunas_filtro, key="exportar_coluna")
+            if coluna_filtro != "(sem filtro)":
+                valores = st.multiselect(
+                    "Valores:", list(df_exportacao[coluna_filtro].cat.categories), key="exportar_valores"
+                )
+                filtro = {coluna_filtro: valores}
+        
+        # O arquivo fica em disco enquanto a sessão existir (ArquivoExportado apaga ao ser coletado), mas
+        # o botão de download só é desenhado na execução que o pede: desenhado a cada rerun, o Streamlit
+        # leria o arquivo inteiro para a memória de novo a cada interação
+        exportacao = st.session_state.get('exportacao')
+        mostrar_download = False
+        if st.button("Gerar Arquivo"):
+            # Gravado bloco a bloco em disco; o anterior desta sessão é descartado na hora
+            if exportacao:
+                exportacao.remover()
+                del st.session_state['exportacao']
+            with st.spinner("Gerando arquivo..."):
+                caminho, linhas = exportar(df_exportacao, formato, filtro)
+            extensao, mime = FORMATOS[formato]
+            exportacao = st.session_state.exportacao = ArquivoExportado(
+                caminho, linhas, f"relatorio_{TABELAS[tabela_exportacao]}{extensao}", mime
+            )
+            mostrar_download = True
+        elif exportacao and exportacao.existe:
+            mostrar_download = st.button(
+                f"📦 Preparar download de {exportacao.nome}", key="preparar_exportacao"
+            )
+        
+        if mostrar_download and exportacao.existe:
+            tamanho_mb = os.path.getsize(exportacao.caminho) / 2**20
+            with open(exportacao.caminho, 'rb') as arquivo:
+                st.download_button(
+                    f"📥 Baixar {exportacao.nome} ({exportacao.linhas:,} linhas, {tamanho_mb:.1f} MB)",
+                    arquivo,
+                    file_name=exportacao.nome,
+                    mime=exportacao.mime,
+                    key="baixar_exportacao"
+                )
+    
+        # Movimentação do dia: admissões, desligamentos e férias aplicados sem recarregar a base
+        st.markdown("---")
+        st.markdown("### 🔄 Movimentação do Dia")
+        
+        arquivos_delta = st.file_uploader(
+            "Arquivos de admissões, desligamentos e/ou férias (o nome do arquivo identifica a base; "
+            "apenas .xlsx e .csv)",
+            type=['csv', 'xlsx'], accept_multiple_files=True, key="arquivos_delta"
+        )
+        if arquivos_delta and st.button("Aplicar movimentação"):
+            with tempfile.TemporaryDirectory() as pasta:
+                for arquivo in arquivos_delta:
+                    with open(os.path.join(pasta, os.path.basename(arquivo.name)), 'wb') as destino:
+                        destino.write(arquivo.getbuffer())
+                try:
+                    delta = carregar_delta(pasta, COMPETENCIA_ATUAL)
+                except ValueError as erro:
+                    delta = None
+                    st.error(f"❌ {erro}")
+            
+            if delta:
+                inicio = time.perf_counter()
+                alteracoes = agente.aplicar_movimentacao(delta)
+                st.session_state.movimentacao = (
+                    f"✅ {len(alteracoes['matriculas']):,} matrícula(s) atualizada(s) em "
+                    f"{(time.perf_counter() - inicio) * 1000:.0f} ms · tabelas: {', '.join(sorted(alteracoes['tabelas']))}"
+                )
+                st.rerun()
+        
+        if 'movimentacao' in st.session_state:
+            st.success(st.session_state.movimentacao)
+        
+        # Histórico: cada competência fechada vira um retrato imutável para comparações
+        st.markdown("---")
+        st.markdown("### 📚 Histórico de Competências")
+        
+        salvas = competencias(PASTA_HISTORICO)
+        if salvas:
+            resumos = [carregar_resumo(c, PASTA_HISTORICO) for c in salvas]
+            st.dataframe(pd.DataFrame({
+                'Competência': [nome_competencia(c) for c in salvas],
+                'Funcionários': [r['vr']['funcionarios'] for r in resumos],
+                'Elegíveis': [r['vr']['elegiveis'] for r in resumos],
+                'Valor Total (R$)': [r['vr']['valor_total'] for r in resumos],
+                'Salva em': [r['salva_em'] for r in resumos]
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma competência salva ainda.")
+        
+        if st.button(
+            f"📸 Salvar competência {nome_competencia(COMPETENCIA_ATUAL)}",
+            disabled=COMPETENCIA_ATUAL in salvas, key="salvar_competencia"
+        ):
+            agente.salvar_competencia()
+            st.rerun()
+        st.caption('No chat: "O que mudou no VR de fevereiro para março?" ou "Quem perdeu elegibilidade?"')
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,228 @@
+"""
+⏱️ BENCHMARK - CAMINHOS QUENTES DO AGENTE
+Mede carga dos dados, processar_pergunta por intenção, consultar_matricula, responders
+agregados (sem cache) e exportação CSV em vários tamanhos; grava p50/p95/p99 e pico de memória em JSON.
+Confere também que perguntas alternadas de intenções diferentes continuam acertando o cache.
+
+Uso: python benchmarks/bench_agente.py [--tamanhos 2000 100000] [--saida resultados.json] [--comparar base.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+from app import AgenteChat
+from compactacao import compactar_dados, materializar
+from gerador import gerar_dados
+
+# Uma pergunta típica por intenção do roteador
+PERGUNTAS = {
+    'saudacao': 'Olá, bom dia!',
+    'despedida': 'Obrigado, até logo',
+    'estatisticas': 'Quantos funcionários temos?',
+    'ferias': 'Quem está de férias?',
+    'admissoes': 'Admissões recentes',
+    'desligamentos': 'Desligamentos do mês',
+    'vr': 'Informações sobre VR',
+    'padrao': 'Como funciona o cálculo do benefício?'
+}
+
+# Intenções que dependem de tabelas diferentes, perguntadas em sequência (estatísticas, busca, cubo, VR)
+ALTERNADAS = ['Quantos funcionários temos?', 'func30001@empresa.com', 'analistas de TI em férias',
+              'Informações sobre VR']
+
+RESPONDERS = ['responder_estatisticas', 'responder_ferias', 'responder_admissoes',
+              'responder_desligamentos', 'responder_vr']
+
+# Uma etapa fica marcada como regressão quando o p50 piora mais que isso
+LIMIAR_REGRESSAO = 1.2
+
+
+# ==================== MEDIÇÃO ====================
+def percentis(tempos):
+    """p50/p95/p99/média em milissegundos de uma lista de tempos em segundos"""
+    ms = np.asarray(tempos) * 1e3
+    return {
+        'execucoes': len(ms),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'media_ms': float(ms.mean())
+    }
+
+
+def medir(funcao, argumentos, preparar=None):
+    """Tempo de cada chamada funcao(arg); preparar() roda antes de cada uma, fora da medição"""
+    tempos = []
+    for arg in argumentos:
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao(arg)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def pico_memoria(funcao, arg, preparar=None):
+    """Pico de memória alocada (MB) por uma chamada, medido à parte para não distorcer os tempos"""
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    try:
+        funcao(arg)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 2**20
+
+
+def etapa(resultados, linhas, nome, funcao, argumentos, preparar=None):
+    """Mede uma etapa, guarda o registro e imprime a linha da tabela"""
+    registro = {'linhas': linhas, 'etapa': nome}
+    registro.update(percentis(medir(funcao, argumentos, preparar)))
+    registro['pico_mb'] = pico_memoria(funcao, argumentos[0], preparar)
+    resultados.append(registro)
+    print(f"{linhas:>10,} {nome:<40} {registro['p50_ms']:>10.3f} {registro['p95_ms']:>10.3f} "
+          f"{registro['p99_ms']:>10.3f} {registro['pico_mb']:>9.1f}")
+    return registro
+
+
+def conferir_cache_alternado(resultados, linhas, agente, rodadas):
+    """
+    Alterna as ALTERNADAS por `rodadas` rodadas com o cache vazio: só a primeira rodada pode
+    calcular, todas as outras têm de acertar (uma intenção não invalida a resposta da outra)
+    """
+    agente.cache.limpar()
+    antes = agente.cache.estatisticas()
+    for _ in range(rodadas):
+        for pergunta in ALTERNADAS:
+            agente.processar_pergunta(pergunta)
+    depois = agente.cache.estatisticas()
+
+    acertos = depois['acertos'] - antes['acertos']
+    esperados = len(ALTERNADAS) * (rodadas - 1)
+    resultados.append({'linhas': linhas, 'etapa': 'cache[alternadas]', 'acertos': acertos,
+                       'esperados': esperados, 'invalidacoes': depois['invalidacoes'] - antes['invalidacoes']})
+    marca = '' if acertos >= esperados else ' ⚠️ perguntas alternadas invalidando o cache'
+    print(f"{linhas:>10,} {'cache[alternadas]':<40} {acertos:>6}/{esperados} acertos{marca}")
+    return acertos >= esperados
+
+
+def montar_agente(dados):
+    """Mesmo caminho de carregar_agente(): compacta e monta índice/cache"""
+    compactos, relatorio = compactar_dados(dados)
+    return AgenteChat(compactos, relatorio_memoria=relatorio)
+
+
+# ==================== SUÍTE ====================
+def executar(tamanhos, repeticoes, repeticoes_carga, seed):
+    """Roda todas as etapas para cada tamanho; devolve a lista de registros"""
+    resultados = []
+    print(f"{'linhas':>10} {'etapa':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'pico MB':>9}")
+
+    for n in tamanhos:
+        carga = [n] * repeticoes_carga
+        etapa(resultados, n, 'carregar_dados', lambda k: gerar_dados(k, seed=seed), carga)
+
+        dados = gerar_dados(n, seed=seed)
+        etapa(resultados, n, 'montar_agente', montar_agente, [dados] * repeticoes_carga)
+        agente = montar_agente(dados)
+
+        for intencao, pergunta in PERGUNTAS.items():
+            etapa(resultados, n, f'processar_pergunta[{intencao}]',
+                  agente.processar_pergunta, [pergunta] * repeticoes)
+
+        conferir_cache_alternado(resultados, n, agente, rodadas=5)
+
+        # Responders agregados com o cache vazio a cada chamada: custo real do cálculo
+        for nome in RESPONDERS:
+            responder = getattr(agente, nome)
+            pergunta = PERGUNTAS[nome.replace('responder_', '')]
+            etapa(resultados, n, f'{nome}[sem cache]', responder, [pergunta] * repeticoes,
+                  preparar=agente.cache.limpar)
+
+        rng = np.random.default_rng(seed)
+        matriculas = rng.choice(dados['funcionarios']['MATRICULA'].to_numpy(), repeticoes).tolist()
+        etapa(resultados, n, 'consultar_matricula', agente.consultar_matricula, matriculas)
+
+        funcionarios = agente.dados['funcionarios']
+        etapa(resultados, n, 'exportar_csv[funcionarios]',
+              lambda df: materializar(df).to_csv(index=False), [funcionarios] * repeticoes_carga)
+
+    return resultados
+
+
+def metadados(argumentos):
+    """Ambiente da execução, para comparar resultados entre versões"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'parametros': argumentos
+    }
+
+
+def comparar(atual, caminho_base):
+    """Imprime a razão p50 atual / base por etapa e marca as regressões"""
+    with open(caminho_base, encoding='utf-8') as f:
+        base = {(r['linhas'], r['etapa']): r for r in json.load(f)['resultados']}
+
+    print(f"\nComparação com {caminho_base}:")
+    print(f"{'linhas':>10} {'etapa':<40} {'base p50':>10} {'atual p50':>10} {'razão':>7}")
+    regressoes = 0
+    for registro in atual:
+        anterior = base.get((registro['linhas'], registro['etapa']))
+        if 'p50_ms' not in registro or anterior is None or not anterior.get('p50_ms'):
+            continue
+        razao = registro['p50_ms'] / anterior['p50_ms']
+        marca = ' ⚠️' if razao > LIMIAR_REGRESSAO else ''
+        regressoes += bool(marca)
+        print(f"{registro['linhas']:>10,} {registro['etapa']:<40} {anterior['p50_ms']:>10.3f} "
+              f"{registro['p50_ms']:>10.3f} {razao:>6.2f}x{marca}")
+    print(f"{regressoes} etapa(s) mais de {LIMIAR_REGRESSAO:.0%} do tempo da base")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=200, help='chamadas por etapa rápida')
+    parser.add_argument('--repeticoes-carga', type=int, default=3, help='chamadas de carga e exportação')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', default='resultados_benchmark.json')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    resultados = executar(args.tamanhos, args.repeticoes, args.repeticoes_carga, args.seed)
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({'metadados': metadados(vars(args)), 'resultados': resultados}, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+⏱️ BENCHMARK - BUSCA APROXIMADA POR NOME, E-MAIL E CARGO
+Compara a varredura com str.contains (sem acentos) com o índice de trigramas do IndiceBusca.
+
+Uso: python benchmarks/bench_busca.py [--tamanhos 2000 100000 1000000] [--consultas 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from busca import IndiceBusca
+from compactacao import compactar_dados, obter_coluna
+from gerador import CARGOS, gerar_dados
+from roteador import normalizar
+
+
+def consultas_de_exemplo(funcionarios, quantidade):
+    """E-mails parciais, nomes com erro de acento e cargos abreviados"""
+    rng = np.random.default_rng(0)
+    matriculas = rng.choice(funcionarios['MATRICULA'].to_numpy(), quantidade)
+    consultas = []
+    for i, matricula in enumerate(matriculas):
+        tipo = i % 3
+        if tipo == 0:
+            consultas.append(f"func{matricula}@empresa")
+        elif tipo == 1:
+            consultas.append(f"funcionario {matricula}")
+        else:
+            consultas.append(CARGOS[i % len(CARGOS)].lower()[:-2])
+    return consultas
+
+
+def varredura(colunas, consulta):
+    """Reproduz a alternativa sem índice: str.contains em cada coluna já normalizada"""
+    termo = IndiceBusca.termo(consulta)
+    return {coluna: np.flatnonzero(serie.str.contains(termo, regex=False).to_numpy()) for coluna, serie in colunas.items()}
+
+
+def medir(funcao, consultas):
+    """Retorna a latência média por chamada em milissegundos"""
+    inicio = time.perf_counter()
+    for c in consultas:
+        funcao(c)
+    return (time.perf_counter() - inicio) / len(consultas) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    parser.add_argument('--consultas', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'construção':>12} {'varredura':>12} {'índice':>12}")
+    for n in args.tamanhos:
+        dados, _ = compactar_dados(gerar_dados(n))
+        funcionarios = dados['funcionarios']
+        consultas = consultas_de_exemplo(funcionarios, args.consultas)
+
+        inicio = time.perf_counter()
+        indice = IndiceBusca(funcionarios)
+        construcao = time.perf_counter() - inicio
+
+        # A varredura recebe as colunas já montadas e normalizadas (custo fora da medição)
+        colunas = {c: obter_coluna(funcionarios, c).astype(str).map(normalizar) for c in indice.colunas}
+        amostra_varredura = consultas[:max(5, args.consultas * 2000 // n)]
+        por_varredura = medir(lambda c: varredura(colunas, c), amostra_varredura)
+        por_indice = medir(indice.buscar, consultas)
+
+        print(f"{n:>10,} {construcao:>10.2f} s {por_varredura:>9.2f} ms {por_indice:>9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
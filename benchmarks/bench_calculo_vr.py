@@ -0,0 +1,37 @@
+"""
+⏱️ BENCHMARK - CÁLCULO MENSAL DE VR
+Mede calcular_vr() sobre a população inteira em diferentes tamanhos.
+
+Uso: python benchmarks/bench_calculo_vr.py [--tamanhos 2000 100000 1000000] [--competencia 2025-01]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from calculo_vr import calcular_vr
+from gerador import gerar_dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    parser.add_argument('--competencia', default='2025-01')
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'tempo':>10} {'valor total':>18}")
+    for n in args.tamanhos:
+        dados = gerar_dados(n, competencia=args.competencia)
+
+        inicio = time.perf_counter()
+        vr = calcular_vr(dados, args.competencia)
+        tempo = time.perf_counter() - inicio
+
+        print(f"{n:>10,} {tempo:>8.2f} s {vr['VALOR_TOTAL'].sum():>18,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+⏱️ BENCHMARK - CONCILIAÇÃO COM O RETORNO DA OPERADORA
+Gera um arquivo de retorno a partir do VR calculado (com créditos faltantes, a maior e de
+matrículas desconhecidas) e compara a conciliação em blocos com ler o arquivo inteiro e fazer
+um merge, medindo tempo e pico de memória (tracemalloc).
+
+Uso: python benchmarks/bench_conciliacao.py [--funcionarios 100000] [--linhas 1000000 5000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import criar_agente
+from conciliacao import conciliar
+from gerador import gerar_dados
+
+
+def gerar_retorno(vr, linhas, caminho, seed=42):
+    """
+    Arquivo de retorno com `linhas` créditos: matrículas do VR repetidas (créditos parciais da mesma
+    matrícula), 1% sem crédito, 1% a maior, 0,5% de matrículas desconhecidas e 0,5% recusados.
+    """
+    rng = np.random.default_rng(seed)
+    vr = vr[vr['VALOR_TOTAL'] > 0]
+    pagas = vr.sample(frac=0.99, random_state=seed)
+    repeticoes = max(linhas // len(pagas), 1)
+
+    matriculas = np.repeat(pagas['MATRICULA'].to_numpy(), repeticoes)
+    valores = np.repeat(pagas['VALOR_TOTAL'].to_numpy() / repeticoes, repeticoes)
+    a_maior = rng.random(len(valores)) < 0.01 / repeticoes
+    valores[a_maior] += rng.integers(1, 50, a_maior.sum())
+    desconhecidas = rng.random(len(matriculas)) < 0.005
+    matriculas[desconhecidas] = 90_000_000 + np.flatnonzero(desconhecidas)
+    status = np.where(rng.random(len(matriculas)) < 0.005, 'Recusado', 'Creditado')
+
+    pd.DataFrame({'Matrícula': matriculas, 'Valor Creditado': valores.round(2), 'Status': status}).to_csv(
+        caminho, sep=';', decimal=',', index=False
+    )
+    return len(matriculas)
+
+
+def merge_completo(caminho, dados):
+    """Alternativa sem blocos: o arquivo inteiro em memória e um merge com o VR"""
+    retorno = pd.read_csv(caminho, sep=';', decimal=',')
+    retorno = retorno[retorno['Status'] == 'Creditado']
+    creditado = retorno.groupby('Matrícula')['Valor Creditado'].sum().rename('CREDITADO')
+    tabela = dados['vr'][['MATRICULA', 'VALOR_TOTAL']].merge(
+        creditado, left_on='MATRICULA', right_index=True, how='outer'
+    )
+    return tabela.fillna(0)
+
+
+def medir(funcao, *args):
+    """(segundos, pico de memória em MB)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao(*args)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracao, pico / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=100000)
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1000000, 5000000])
+    args = parser.parse_args()
+
+    agente = criar_agente(gerar_dados(args.funcionarios))
+    dados = agente.dados
+
+    print(f"{'linhas':>10} {'arquivo':>10} {'merge':>10} {'pico merge':>11} {'blocos':>10} {'pico blocos':>12}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in args.linhas:
+            caminho = os.path.join(pasta, f'retorno_{linhas}.csv')
+            total = gerar_retorno(dados['vr'], linhas, caminho)
+            tamanho = os.path.getsize(caminho) / 1024 ** 2
+
+            tempo_merge, pico_merge = medir(merge_completo, caminho, dados)
+            tempo_blocos, pico_blocos = medir(conciliar, caminho, dados)
+            print(f"{total:>10,} {tamanho:>7.0f} MB {tempo_merge:>8.2f} s {pico_merge:>8.0f} MB "
+                  f"{tempo_blocos:>8.2f} s {pico_blocos:>9.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+⏱️ BENCHMARK - HISTÓRICO DO CHAT EM SESSÕES LONGAS
+Compara a lista que crescia sem limite (e era desenhada inteira a cada rerun) com o
+HistoricoMensagens: memória por sessão (tracemalloc) e custo de obter as mensagens de um rerun.
+
+Uso: python benchmarks/bench_conversa.py [--mensagens 200 2000 20000] [--pagina 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import criar_agente
+from conversas import LIMITE_MEMORIA, HistoricoMensagens
+from gerador import gerar_dados
+
+PERGUNTAS = ['Quantos funcionários temos?', 'Informações sobre VR', 'Quem está de férias?', 'Admissões recentes']
+
+
+def preencher(historico, agente, mensagens):
+    """Alterna perguntas (com matrículas diferentes) e respostas reais do agente"""
+    for i in range(mensagens // 2):
+        pergunta = f'Consultar matrícula {30000 + i % 1800}' if i % 2 else PERGUNTAS[i % len(PERGUNTAS)]
+        historico.adicionar('user', pergunta)
+        historico.adicionar('bot', agente.processar_pergunta(pergunta))
+
+
+class ListaSemLimite(list):
+    """O histórico antigo: todas as mensagens em memória"""
+
+    def adicionar(self, tipo, texto):
+        self.append({'tipo': tipo, 'texto': texto})
+
+
+def medir(historico, agente, mensagens, rerun):
+    """(MB retidos pelo histórico, ms para obter as mensagens de um rerun)"""
+    tracemalloc.start()
+    preencher(historico, agente, mensagens)
+    retidos = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    for _ in range(20):
+        sum(len(m['texto']) for m in rerun(historico))
+    return retidos, (time.perf_counter() - inicio) / 20 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mensagens', type=int, nargs='+', default=[200, 2000, 20000])
+    parser.add_argument('--pagina', type=int, default=20, help='mensagens visíveis por rerun')
+    args = parser.parse_args()
+
+    agente = criar_agente(gerar_dados(2000))
+    preencher(ListaSemLimite(), agente, 200)  # aquece o cache de respostas
+
+    print(f"{'mensagens':>10} {'lista (MB)':>11} {'rerun':>10} {'limitado (MB)':>14} {'rerun':>10}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in args.mensagens:
+            lista, rerun_lista = medir(ListaSemLimite(), agente, n, lambda h: h)
+            limitado, rerun_limitado = medir(
+                HistoricoMensagens(LIMITE_MEMORIA, os.path.join(pasta, 'conversas.sqlite3')),
+                agente, n, lambda h: h.ultimas(args.pagina)
+            )
+            print(f"{n:>10,} {lista:>11.2f} {rerun_lista:>7.2f} ms {limitado:>14.2f} {rerun_limitado:>7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
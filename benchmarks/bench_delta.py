@@ -0,0 +1,81 @@
+"""
+⏱️ BENCHMARK - MOVIMENTAÇÃO DO DIA (DELTA) x RECARGA COMPLETA
+Compara recarregar a base inteira (recalcular o VR, compactar, indexar e refazer os agregados)
+com aplicar só as admissões, desligamentos e férias do dia pelo AgenteChat.aplicar_movimentacao.
+
+Uso: python benchmarks/bench_delta.py [--tamanhos 2000 100000 1000000] [--movimentos 80]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from agregados import calcular_agregados
+from app import COMPETENCIA_ATUAL, criar_agente
+from delta import CHAVES, parametros_vr
+from gerador import gerar_dados, gerar_delta
+from regras_vr import calcular_vr_com_regras
+
+
+def recarga_completa(brutos, delta, sindicatos, dias_uteis):
+    """Reproduz a carga do zero: tabelas com a movimentação, VR de todos, compactação, índice e agregados"""
+    dados = {}
+    for tabela, df in brutos.items():
+        if tabela in delta:
+            df = pd.concat([df, delta[tabela]], ignore_index=True).drop_duplicates(CHAVES[tabela], keep='last')
+        dados[tabela] = df
+    dados['vr'] = calcular_vr_com_regras(dados, COMPETENCIA_ATUAL, sindicatos=sindicatos, dias_uteis=dias_uteis)
+    agente = criar_agente(dados)
+    agente.agregados()
+    return agente
+
+
+def mesmos_agregados(a, b):
+    """Compara dois dicionários de agregados (números com tolerância, contagens por grupo exatas)"""
+    def igual(x, y):
+        if isinstance(x, pd.Series):
+            return x.sort_index().equals(y.sort_index())
+        if isinstance(x, float):
+            return bool(np.isclose(x, y))
+        return x == y
+    return a.keys() == b.keys() and all(igual(a[k], b[k]) for k in a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    parser.add_argument('--movimentos', type=int, default=80, help='linhas de movimentação (metade férias)')
+    args = parser.parse_args()
+
+    quarto = max(args.movimentos // 4, 1)
+    print(f"{'linhas':>10} {'recarga':>12} {'delta':>12} {'ganho':>8} {'agregados':>10}")
+    for n in args.tamanhos:
+        brutos = gerar_dados(n)
+        agente = criar_agente(brutos)
+        agente.agregados()
+
+        # A recarga usa os mesmos parâmetros de VR (sindicatos, dias úteis) da carga original
+        sindicatos, dias_uteis = parametros_vr(agente.dados)
+        delta = gerar_delta(brutos, admissoes=quarto, desligamentos=quarto, ferias=2 * quarto)
+
+        inicio = time.perf_counter()
+        recarga_completa(brutos, delta, sindicatos, dias_uteis)
+        recarga = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        agente.aplicar_movimentacao(delta)
+        incremental = time.perf_counter() - inicio
+
+        conferido = mesmos_agregados(agente.agregados(), calcular_agregados(agente.dados))
+        print(f"{n:>10,} {recarga * 1e3:>9.0f} ms {incremental * 1e3:>9.1f} ms {recarga / incremental:>7.0f}x "
+              f"{'iguais' if conferido else 'DIFEREM':>10}")
+
+
+if __name__ == '__main__':
+    main()
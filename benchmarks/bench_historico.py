@@ -0,0 +1,100 @@
+"""
+⏱️ BENCHMARK - COMPARAÇÃO ENTRE COMPETÊNCIAS DO HISTÓRICO
+Salva duas competências (com admissões, desligamentos e mudanças de situação entre elas) e compara
+o VR das duas pelo merge em blocos do historico.comparar_vr e pela alternativa de ler as duas
+tabelas inteiras e fazer um merge. Cada medição roda num processo novo, para que o pico de memória
+(VmHWM do Linux, que inclui os buffers do Arrow) seja só o dela.
+
+Uso: python benchmarks/bench_historico.py [--tamanhos 100000 1000000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compactacao import compactar_dados
+from gerador import gerar_dados
+from historico import COLUNAS_VR, comparar_vr, salvar_competencia
+
+COMPETENCIAS = ('2025-02', '2025-03')
+
+
+def salvar_historico(n, pasta):
+    """Duas competências do mesmo quadro: a segunda com outra semente (situações, férias e movimentação mudam)"""
+    for competencia, seed in zip(COMPETENCIAS, (1, 2)):
+        dados, _ = compactar_dados(gerar_dados(n, competencia=competencia, seed=seed))
+        salvar_competencia(dados, competencia, pasta)
+
+
+def merge_completo(pasta):
+    """Alternativa: as duas tabelas inteiras em memória e um merge"""
+    antes, depois = (
+        pd.read_parquet(os.path.join(pasta, c, 'vr.parquet'), columns=['MATRICULA', *COLUNAS_VR])
+        for c in COMPETENCIAS
+    )
+    juntas = antes.merge(depois, on='MATRICULA', how='outer', suffixes=('_ANTES', '_DEPOIS'), indicator=True)
+    comuns = juntas[juntas['_merge'] == 'both']
+    perderam = comuns[(comuns['ELEGIVEL_ANTES'] == 'SIM') & (comuns['ELEGIVEL_DEPOIS'] == 'NAO')]
+    valores = ~np.isclose(comuns['VALOR_TOTAL_ANTES'], comuns['VALOR_TOTAL_DEPOIS'], rtol=0, atol=0.005)
+    return len(perderam), int(valores.sum())
+
+
+def em_blocos(pasta):
+    comparacao = comparar_vr(*COMPETENCIAS, pasta=pasta)
+    return len(comparacao['perderam']), len(comparacao['valores'])
+
+
+def _memoria_kb(campo):
+    """VmRSS (atual) ou VmHWM (pico) do processo, em kB"""
+    with open('/proc/self/status') as status:
+        return next(int(linha.split()[1]) for linha in status if linha.startswith(campo))
+
+
+def _medir(metodo, pasta, fila):
+    base = _memoria_kb('VmRSS')
+    inicio = time.perf_counter()
+    resultado = {'merge': merge_completo, 'blocos': em_blocos}[metodo](pasta)
+    duracao = time.perf_counter() - inicio
+    pico = (_memoria_kb('VmHWM') - base) / 1024
+    fila.put((duracao, pico, resultado))
+
+
+def medir(metodo, pasta):
+    """(segundos, MB de pico acima do processo ocioso, resultado) num processo novo"""
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_medir, args=(metodo, pasta, fila))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'salvar':>9} {'merge':>9} {'pico merge':>11} {'blocos':>9} {'pico blocos':>12} {'iguais':>7}")
+    for n in args.tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            inicio = time.perf_counter()
+            salvar_historico(n, pasta)
+            salvar = time.perf_counter() - inicio
+
+            tempo_merge, pico_merge, esperado = medir('merge', pasta)
+            tempo_blocos, pico_blocos, obtido = medir('blocos', pasta)
+            print(f"{n:>10,} {salvar:>7.2f} s {tempo_merge:>7.2f} s {pico_merge:>8.0f} MB "
+                  f"{tempo_blocos:>7.2f} s {pico_blocos:>9.0f} MB {'sim' if esperado == obtido else 'NÃO':>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+⏱️ BENCHMARK - CONSULTA POR MATRÍCULA
+Compara a varredura por máscara booleana com o IndiceMatriculas.
+
+Uso: python benchmarks/bench_indice.py [--tamanhos 2000 100000 1000000] [--consultas 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import AgenteChat
+from gerador import gerar_dados
+from indices import IndiceMatriculas
+
+
+def consulta_por_mascara(dados, matricula):
+    """Reproduz a busca antiga: uma varredura booleana por tabela"""
+    return {
+        tabela: df[df['MATRICULA'] == matricula]
+        for tabela, df in dados.items()
+    }
+
+
+def medir(funcao, matriculas):
+    """Retorna a latência média por chamada em microssegundos"""
+    inicio = time.perf_counter()
+    for m in matriculas:
+        funcao(m)
+    return (time.perf_counter() - inicio) / len(matriculas) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    parser.add_argument('--consultas', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'construção':>12} {'máscara':>12} {'índice':>12} {'consulta':>12}")
+    for n in args.tamanhos:
+        dados = gerar_dados(n)
+        amostra = np.random.default_rng(0).choice(dados['funcionarios']['MATRICULA'].to_numpy(), args.consultas).tolist()
+
+        inicio = time.perf_counter()
+        indice = IndiceMatriculas(dados)
+        construcao = (time.perf_counter() - inicio) * 1e3
+
+        agente = AgenteChat(dados, indice)
+
+        # A varredura é lenta demais para milhares de consultas em 1M linhas
+        amostra_mascara = amostra[:max(10, args.consultas * 2000 // n)]
+        mascara = medir(lambda m: consulta_por_mascara(dados, m), amostra_mascara)
+        por_indice = medir(indice.registro, amostra)
+        consulta = medir(agente.consultar_matricula, amostra)
+
+        print(f"{n:>10,} {construcao:>9.1f} ms {mascara:>9.1f} µs {por_indice:>9.1f} µs {consulta:>9.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
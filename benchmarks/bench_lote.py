@@ -0,0 +1,53 @@
+"""
+⏱️ BENCHMARK - CONSULTA EM LOTE
+Compara consultar_matricula/processar_pergunta item a item com AgenteChat.processar_lote.
+
+Uso: python benchmarks/bench_lote.py [--linhas 100000] [--itens 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import AgenteChat
+from gerador import gerar_dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--itens', type=int, default=10000)
+    args = parser.parse_args()
+
+    dados = gerar_dados(args.linhas)
+    agente = AgenteChat(dados)
+
+    rng = np.random.default_rng(0)
+    matriculas = [str(m) for m in rng.choice(dados['funcionarios']['MATRICULA'].to_numpy(), args.itens)]
+    perguntas = ['Quem está de férias?', 'Informações sobre VR', 'Quantos funcionários temos?']
+    misto = matriculas[:-300] + perguntas * 100
+
+    for nome, itens in [('matrículas', matriculas), ('misto', misto)]:
+        inicio = time.perf_counter()
+        individuais = [
+            agente.consultar_matricula(int(item)) if item.isdigit() else agente.processar_pergunta(item)
+            for item in itens
+        ]
+        tempo_individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        lote = agente.processar_lote(itens)
+        tempo_lote = time.perf_counter() - inicio
+
+        iguais = sum(a == b for a, b in zip(individuais, lote))
+        print(f"{nome:<11} {len(itens):>7,} itens | individual {tempo_individual:6.2f} s | "
+              f"lote {tempo_lote:6.2f} s | respostas iguais {iguais:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+⏱️ BENCHMARK - ELEGIBILIDADE AO VR PELAS REGRAS DOS SINDICATOS
+Compara a avaliação linha a linha (DataFrame.apply) com as regras compiladas do RegrasElegibilidade,
+incluindo a recompilação depois de uma mudança de regra.
+
+Uso: python benchmarks/bench_regras.py [--tamanhos 2000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compactacao import compactar_dados
+from gerador import gerar_dados
+from regras_vr import REGRAS_PADRAO, REGRAS_SINDICATO, RegrasElegibilidade
+from roteador import normalizar
+
+COMPETENCIA = '2025-01'
+
+
+def linha_a_linha(dados, regras):
+    """Reproduz a alternativa sem compilação: todas as regras avaliadas para cada funcionário"""
+    desligamentos = dados['desligamentos'].drop_duplicates('MATRICULA').set_index('MATRICULA')
+    inicio_mes = pd.Timestamp(COMPETENCIA)
+
+    def avaliar(funcionario):
+        regra = {**REGRAS_PADRAO, **regras.get(funcionario.SINDICATO, {})}
+        if normalizar(str(funcionario.CARGO)).startswith(tuple(normalizar(c) for c in regra['cargos_excluidos'])):
+            return 'NAO'
+        if funcionario.SITUACAO in regra['situacoes_excluidas']:
+            return 'NAO'
+        if funcionario.MATRICULA in desligamentos.index:
+            desligamento = desligamentos.loc[funcionario.MATRICULA]
+            limite = inicio_mes + pd.Timedelta(days=regra['dia_corte_desligamento'] - 1)
+            if desligamento['COMUNICADO'] == 'OK' and desligamento['DATA_DESLIGAMENTO'] <= limite:
+                return 'NAO'
+        return 'SIM'
+
+    return dados['funcionarios'].apply(avaliar, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[2000, 100000, 1000000])
+    args = parser.parse_args()
+
+    # Mudança de regra: corte de desligamento de SP antecipado para o dia 5
+    alteradas = {**REGRAS_SINDICATO, 'SINDPD SP - SIND.TRAB.EM PROC DADOS SP': {'dia_corte_desligamento': 5}}
+
+    print(f"{'linhas':>10} {'linha a linha':>14} {'compiladas':>12} {'regra nova':>12} {'inelegíveis':>12}")
+    for n in args.tamanhos:
+        dados, _ = compactar_dados(gerar_dados(n))
+
+        # A avaliação linha a linha roda numa amostra e é extrapolada para n
+        amostra = min(n, 20000)
+        recorte = dict(dados, funcionarios=dados['funcionarios'].iloc[:amostra])
+        inicio = time.perf_counter()
+        linha_a_linha(recorte, REGRAS_SINDICATO)
+        por_linha = (time.perf_counter() - inicio) * n / amostra
+
+        inicio = time.perf_counter()
+        resultado = RegrasElegibilidade().avaliar(dados, COMPETENCIA)
+        compiladas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        RegrasElegibilidade(alteradas).avaliar(dados, COMPETENCIA)
+        regra_nova = time.perf_counter() - inicio
+
+        inelegiveis = (resultado['ELEGIVEL'] == 'NAO').sum()
+        print(f"{n:>10,} {por_linha:>12.2f} s {compiladas:>10.2f} s {regra_nova:>10.2f} s {inelegiveis:>12,}")
+
+
+if __name__ == '__main__':
+    main()
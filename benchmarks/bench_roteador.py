@@ -0,0 +1,112 @@
+"""
+⏱️ BENCHMARK - ROTEADOR DE INTENÇÕES
+Vazão de roteador.classificar() contra a cadeia antiga de any(... in ...) sobre um corpus sintético.
+
+Uso: python benchmarks/bench_roteador.py [--perguntas 300000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from roteador import classificar
+
+MODELOS = [
+    "Consultar matrícula {mat}",
+    "{mat}",
+    "Quais os dados do funcionário {mat}?",
+    "Quantos funcionários temos no {dep}?",
+    "Qual o total de férias?",
+    "Quem está de férias em {dia}/{mes}?",
+    "O que acontece depois das férias?",
+    "Histórico de admissões",
+    "Admissões recentes no {dep}",
+    "Desligamentos do mês",
+    "Quantas demissões tivemos em {dia}/{mes}/2025?",
+    "Informações sobre vale refeição",
+    "Estatísticas de VR",
+    "Olá, bom dia!",
+    "Obrigado, até logo",
+    "Taxa de rotatividade",
+    "Como funciona o cálculo do benefício?"
+]
+
+
+def gerar_corpus(n, seed=42):
+    """Gera n perguntas variando modelo, matrícula, departamento e data"""
+    rng = np.random.default_rng(seed)
+    modelos = rng.integers(0, len(MODELOS), n)
+    mats = rng.integers(30000, 31816, n)
+    deps = rng.choice(['TI', 'RH', 'financeiro', 'Operações'], n)
+    dias = rng.integers(1, 29, n)
+    meses = rng.integers(1, 13, n)
+    return [
+        MODELOS[i].format(mat=m, dep=d, dia=dd, mes=mm)
+        for i, m, d, dd, mm in zip(modelos, mats, deps, dias, meses)
+    ]
+
+
+def classificar_antigo(pergunta):
+    """Cadeia de verificações do processar_pergunta original (referência)"""
+    pergunta_lower = pergunta.lower()
+    if any(s in pergunta_lower for s in ['olá', 'oi', 'bom dia', 'boa tarde', 'boa noite', 'hello', 'hi']):
+        return 'saudacao'
+    if any(s in pergunta_lower for s in ['tchau', 'até', 'adeus', 'bye', 'obrigado', 'obrigada']):
+        return 'despedida'
+    if re.findall(r'\b\d{5}\b', pergunta) or re.search(r'matr[íi]cula\s*(\d+)', pergunta, re.IGNORECASE):
+        return 'matricula'
+    if 'quantos' in pergunta_lower or 'total' in pergunta_lower:
+        return 'estatisticas'
+    if 'férias' in pergunta_lower or 'ferias' in pergunta_lower:
+        return 'ferias'
+    if 'admiss' in pergunta_lower or 'contrat' in pergunta_lower:
+        return 'admissoes'
+    if 'deslig' in pergunta_lower or 'demiss' in pergunta_lower:
+        return 'desligamentos'
+    if 'vr' in pergunta_lower or 'vale' in pergunta_lower or 'refeição' in pergunta_lower:
+        return 'vr'
+    return 'padrao'
+
+
+def medir(funcao, corpus):
+    inicio = time.perf_counter()
+    resultados = [funcao(p) for p in corpus]
+    return time.perf_counter() - inicio, resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--perguntas', type=int, default=300000)
+    args = parser.parse_args()
+
+    corpus = gerar_corpus(args.perguntas)
+
+    tempo_antigo, antigas = medir(classificar_antigo, corpus)
+    tempo_novo, novas = medir(classificar, corpus)
+
+    print(f"Perguntas: {len(corpus):,}")
+    print(f"Cadeia antiga: {len(corpus) / tempo_antigo:>12,.0f} perguntas/s")
+    print(f"Roteador:      {len(corpus) / tempo_novo:>12,.0f} perguntas/s (com entidades)")
+
+    print("\nIntenções (roteador):")
+    for intencao, total in Counter(r['intencao'] for r in novas).most_common():
+        print(f"  {intencao:<15} {total:>8,}")
+
+    divergentes = Counter(
+        (p if len(p) < 40 else p[:37] + '...', a, r['intencao'])
+        for p, a, r in zip(corpus, antigas, novas) if a != r['intencao']
+    )
+    print(f"\nRoteamentos que mudaram: {sum(divergentes.values()):,}")
+    for (pergunta, antiga, nova), total in divergentes.most_common(10):
+        print(f"  {antiga:>12} -> {nova:<12} {pergunta}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+⏱️ BENCHMARK - SERVIDOR HTTP DO AGENTE
+Gerador de carga local: conexões keep-alive concorrentes com uma mistura de perguntas, matrículas e lotes;
+reporta requisições/segundo e latência de cauda por rota.
+
+Uso: python benchmarks/bench_servidor.py [--conexoes 32] [--segundos 10] [--funcionarios 100000]
+     python benchmarks/bench_servidor.py --host 10.0.0.5 --porta 8080   (servidor já em execução)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PERGUNTAS = [
+    'Quantos funcionários temos?',
+    'Quem está de férias?',
+    'Informações sobre VR',
+    'Admissões recentes',
+    'Desligamentos do mês',
+    'Olá, bom dia!',
+    'Como funciona o cálculo do benefício?'
+]
+
+# Fração de cada tipo de requisição na mistura
+MISTURA = {'perguntar': 0.45, 'matricula': 0.5, 'lote': 0.05}
+
+
+class Cliente:
+    """Conexão HTTP/1.1 keep-alive mínima"""
+
+    def __init__(self, host, porta):
+        self.host = host
+        self.porta = porta
+        self.leitor = self.escritor = None
+
+    async def requisitar(self, metodo, caminho, corpo=None):
+        if self.escritor is None:
+            self.leitor, self.escritor = await asyncio.open_connection(self.host, self.porta)
+
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+        self.escritor.write(
+            f"{metodo} {caminho} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(dados)}\r\n\r\n".encode('latin-1') + dados
+        )
+        await self.escritor.drain()
+
+        status = int((await self.leitor.readline()).split()[1])
+        tamanho = 0
+        fechar = False
+        while True:
+            linha = await self.leitor.readline()
+            if linha in (b'\r\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            if nome.lower() == 'content-length':
+                tamanho = int(valor)
+            elif nome.lower() == 'connection' and valor.strip().lower() == 'close':
+                fechar = True
+        await self.leitor.readexactly(tamanho)
+
+        if fechar:
+            self.fechar()
+        return status
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+        self.leitor = self.escritor = None
+
+
+async def trabalhador(host, porta, fim, matriculas, seed, latencias, erros):
+    """Dispara requisições em sequência numa conexão até o tempo acabar"""
+    rng = np.random.default_rng(seed)
+    cliente = Cliente(host, porta)
+    tipos = list(MISTURA)
+    pesos = list(MISTURA.values())
+
+    while time.perf_counter() < fim:
+        tipo = tipos[rng.choice(len(tipos), p=pesos)]
+        if tipo == 'perguntar':
+            pedido = ('POST', '/perguntar', {'pergunta': PERGUNTAS[rng.integers(len(PERGUNTAS))]})
+        elif tipo == 'matricula':
+            pedido = ('GET', f'/matricula/{rng.choice(matriculas)}', None)
+        else:
+            itens = [str(m) for m in rng.choice(matriculas, 50)] + PERGUNTAS[:3]
+            pedido = ('POST', '/lote', {'itens': itens})
+
+        inicio = time.perf_counter()
+        try:
+            status = await cliente.requisitar(*pedido)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            cliente.fechar()
+            erros[tipo] = erros.get(tipo, 0) + 1
+            continue
+        latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+        if status != 200:
+            erros[tipo] = erros.get(tipo, 0) + 1
+
+    cliente.fechar()
+
+
+async def gerar_carga(host, porta, conexoes, segundos, matriculas):
+    latencias, erros = {}, {}
+    inicio = time.perf_counter()
+    fim = inicio + segundos
+    await asyncio.gather(*[
+        trabalhador(host, porta, fim, matriculas, i, latencias, erros)
+        for i in range(conexoes)
+    ])
+    return latencias, erros, time.perf_counter() - inicio
+
+
+async def esperar_servidor(host, porta, limite):
+    """Espera /saude responder (o servidor carrega os dados antes de abrir a porta)"""
+    fim = time.perf_counter() + limite
+    while time.perf_counter() < fim:
+        cliente = Cliente(host, porta)
+        try:
+            if await cliente.requisitar('GET', '/saude') == 200:
+                return
+        except OSError:
+            await asyncio.sleep(0.5)
+        finally:
+            cliente.fechar()
+    raise TimeoutError(f'Servidor não respondeu em {limite} s')
+
+
+def relatorio(latencias, erros, duracao):
+    total = sum(len(v) for v in latencias.values())
+    print(f"\n{total:,} requisições em {duracao:.1f} s = {total / duracao:,.0f} req/s "
+          f"({sum(erros.values())} erros)\n")
+    print(f"{'rota':<12} {'req':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    todas = []
+    for tipo, tempos in sorted(latencias.items()):
+        ms = np.asarray(tempos) * 1e3
+        todas.append(ms)
+        print(f"{tipo:<12} {len(ms):>8,} {len(ms) / duracao:>9,.0f} {np.percentile(ms, 50):>9.2f} "
+              f"{np.percentile(ms, 95):>9.2f} {np.percentile(ms, 99):>9.2f} {ms.max():>9.2f}")
+    if todas:
+        ms = np.concatenate(todas)
+        print(f"{'total':<12} {len(ms):>8,} {len(ms) / duracao:>9,.0f} {np.percentile(ms, 50):>9.2f} "
+              f"{np.percentile(ms, 95):>9.2f} {np.percentile(ms, 99):>9.2f} {ms.max():>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', help='servidor já em execução (sem isso, sobe um local)')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--conexoes', type=int, default=32)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--funcionarios', type=int, default=100000, help='tamanho dos dados do servidor local')
+    parser.add_argument('--threads', type=int, help='threads do servidor local')
+    args = parser.parse_args()
+
+    processo = None
+    host = args.host or '127.0.0.1'
+    if args.host is None:
+        comando = [sys.executable, os.path.join(RAIZ, 'servidor.py'), '--host', host,
+                   '--porta', str(args.porta), '--funcionarios', str(args.funcionarios)]
+        if args.threads:
+            comando += ['--threads', str(args.threads)]
+        processo = subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        asyncio.run(esperar_servidor(host, args.porta, limite=300))
+        # Matrículas do intervalo do gerador (30000...), incluindo algumas inexistentes
+        matriculas = np.arange(30000, 30000 + int(args.funcionarios * 1.05))
+        latencias, erros, duracao = asyncio.run(
+            gerar_carga(host, args.porta, args.conexoes, args.segundos, matriculas)
+        )
+        relatorio(latencias, erros, duracao)
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == '__main__':
+    main()
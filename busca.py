@@ -0,0 +1,173 @@
+"""
+🔤 BUSCA APROXIMADA POR NOME, E-MAIL E CARGO
+Índice invertido de trigramas (sem acentos, minúsculas) sobre os valores distintos de cada coluna:
+a consulta soma os pesos dos trigramas em comum e devolve os candidatos mais parecidos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from compactacao import obter_coluna
+from roteador import normalizar
+
+
+COLUNAS_BUSCA = ['NOME', 'EMAIL', 'CARGO']
+
+# Valores mais longos são cortados: o índice fica com largura fixa
+TAMANHO_MAXIMO = 64
+
+# Trigramas presentes em mais que essa fração dos valores (ex.: "@empresa.com") não selecionam candidatos
+FRACAO_COMUM = 0.1
+
+# Candidatos reavaliados pela semelhança exata, por resultado pedido
+CANDIDATOS_POR_RESULTADO = 4
+
+# Valores processados por vez na construção (limita a memória das matrizes de caracteres)
+TAMANHO_BLOCO = 200_000
+
+# Palavras de pergunta que não fazem parte do que se procura
+PALAVRAS_IGNORADAS = {
+    'quem', 'qual', 'quais', 'e', 'o', 'a', 'os', 'as', 'do', 'da', 'dos', 'das', 'de', 'dados',
+    'procurar', 'buscar', 'busca', 'encontrar', 'email', 'e-mail', 'nome', 'cargo', 'sobre', 'com'
+}
+
+# Caractere (code point) -> byte: sem acento e minúsculo até Latin Extended-A, o resto cai na faixa 0x80-0xFF
+_DOBRA = np.array([
+    ord(normalizar(chr(c))) if len(normalizar(chr(c))) == 1 and ord(normalizar(chr(c))) < 0x80 else 0x80 | (c & 0x7F)
+    for c in range(0x180)
+], dtype=np.uint32)
+_DOBRA[0] = 0
+
+
+# ==================== TRIGRAMAS ====================
+def _caracteres(textos):
+    """Matriz (textos x largura) de bytes dobrados, com espaço antes e depois de cada texto"""
+    textos = np.asarray(textos, dtype=f'U{TAMANHO_MAXIMO}')
+    codigos = textos.view(np.uint32).reshape(len(textos), TAMANHO_MAXIMO)
+
+    matriz = np.zeros((len(textos), TAMANHO_MAXIMO + 2), dtype=np.uint32)
+    matriz[:, 0] = ord(' ')
+    matriz[:, 1:-1] = np.where(codigos < len(_DOBRA), _DOBRA[np.minimum(codigos, len(_DOBRA) - 1)],
+                               0x80 | (codigos & 0x7F))
+    matriz[np.arange(len(textos)), (codigos != 0).sum(axis=1) + 1] = ord(' ')
+    return matriz
+
+
+def _trigramas(textos):
+    """(códigos, índice do texto) de cada trigrama dos textos; código = 3 bytes em um inteiro"""
+    matriz = _caracteres(textos)
+    codigos = (matriz[:, :-2] << 16) | (matriz[:, 1:-1] << 8) | matriz[:, 2:]
+    validos = matriz[:, 2:] != 0
+    linhas = np.broadcast_to(np.arange(len(matriz), dtype=np.uint32)[:, None], codigos.shape)
+    return codigos[validos], linhas[validos]
+
+
+def semelhanca(a, b):
+    """Coeficiente de Dice entre os conjuntos de trigramas de dois textos (0 a 1)"""
+    codigos, linhas = _trigramas([a, b])
+    x, y = set(codigos[linhas == 0].tolist()), set(codigos[linhas == 1].tolist())
+    return 2 * len(x & y) / (len(x) + len(y)) if x or y else 0.0
+
+
+# ==================== ÍNDICE ====================
+class IndiceColuna:
+    """Trigramas -> valores distintos de uma coluna (postagens ordenadas) e valor -> linhas"""
+
+    def __init__(self, serie, tamanho_bloco=TAMANHO_BLOCO):
+        codigos_linha, valores = pd.factorize(serie, sort=False)
+        self.valores = np.asarray(valores, dtype=object)
+        self.linhas = len(serie)
+
+        # Linhas de cada valor distinto: posições ordenadas pelo código do valor
+        self._ordem_linhas = np.argsort(codigos_linha, kind='stable')
+        self._inicio_linhas = np.searchsorted(codigos_linha[self._ordem_linhas], np.arange(len(valores) + 1))
+
+        # Chave (trigrama << 32 | valor): ordenar agrupa por trigrama e elimina repetições dentro do valor
+        chaves = []
+        for inicio in range(0, len(valores), tamanho_bloco):
+            codigos, ids = _trigramas(self.valores[inicio:inicio + tamanho_bloco].astype(str))
+            chaves.append((codigos.astype(np.uint64) << np.uint64(32)) | (ids + inicio).astype(np.uint64))
+        chaves = np.unique(np.concatenate(chaves)) if chaves else np.array([], dtype=np.uint64)
+
+        trigramas = (chaves >> np.uint64(32)).astype(np.uint32)
+        self._ids = (chaves & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        self._trigramas, inicio = np.unique(trigramas, return_index=True)
+        self._inicio = np.append(inicio, len(trigramas))
+
+    def __len__(self):
+        return len(self.valores)
+
+    def postagens(self, trigrama):
+        """Valores (ids, ordenados) que contêm o trigrama"""
+        i = np.searchsorted(self._trigramas, trigrama)
+        if i == len(self._trigramas) or self._trigramas[i] != trigrama:
+            return self._ids[:0]
+        return self._ids[self._inicio[i]:self._inicio[i + 1]]
+
+    def linhas_do_valor(self, id_valor):
+        """Posições (iloc) das linhas com o valor"""
+        return np.sort(self._ordem_linhas[self._inicio_linhas[id_valor]:self._inicio_linhas[id_valor + 1]])
+
+    def buscar(self, texto, limite=5):
+        """[(id do valor, nota 0-1)] dos valores mais parecidos com o texto"""
+        consulta, _ = _trigramas([texto])
+        postagens = [p for p in map(self.postagens, np.unique(consulta)) if len(p)]
+        if not postagens:
+            return []
+
+        # Peso de cada trigrama = raridade (idf); os muito comuns só selecionam se não houver outros
+        total = len(self.valores)
+        seletivas = [p for p in postagens if len(p) <= FRACAO_COMUM * total] or postagens
+        ids = np.concatenate(seletivas)
+        pesos = np.concatenate([np.full(len(p), np.log1p(total / len(p))) for p in seletivas])
+        candidatos, inverso = np.unique(ids, return_inverse=True)
+        notas = np.bincount(inverso, weights=pesos)
+
+        quantidade = limite * CANDIDATOS_POR_RESULTADO
+        if len(candidatos) > quantidade:
+            melhores = np.argpartition(-notas, quantidade - 1)[:quantidade]
+            candidatos = candidatos[melhores]
+
+        # Poucos candidatos: nota final pela semelhança exata dos trigramas
+        resultado = [(int(i), semelhanca(texto, str(self.valores[i]))) for i in candidatos]
+        resultado.sort(key=lambda r: (-r[1], len(str(self.valores[r[0]]))))
+        return resultado[:limite]
+
+
+class IndiceBusca:
+    """Busca aproximada nas colunas de texto dos funcionários (as derivadas são montadas só para indexar)"""
+
+    def __init__(self, funcionarios, colunas=COLUNAS_BUSCA, tamanho_bloco=TAMANHO_BLOCO):
+        self.colunas = {}
+        for coluna in colunas:
+            try:
+                serie = obter_coluna(funcionarios, coluna)
+            except KeyError:
+                continue
+            self.colunas[coluna] = IndiceColuna(serie.reset_index(drop=True), tamanho_bloco)
+
+    @staticmethod
+    def termo(pergunta):
+        """O que se procura na pergunta: sem acentos, sem pontuação final e sem as palavras de pergunta"""
+        palavras = normalizar(pergunta).replace('?', ' ').replace('!', ' ').split()
+        return ' '.join(p for p in palavras if p not in PALAVRAS_IGNORADAS)
+
+    def buscar(self, pergunta, limite=5, nota_minima=0.45):
+        """
+        Candidatos mais parecidos, da maior nota para a menor.
+
+        Cada item: {'coluna', 'valor', 'nota', 'linhas'} (posições iloc em funcionarios).
+        """
+        termo = self.termo(pergunta)
+        if len(termo) < 3:
+            return []
+
+        candidatos = [
+            {'coluna': coluna, 'valor': indice.valores[id_valor], 'nota': nota,
+             'linhas': indice.linhas_do_valor(id_valor)}
+            for coluna, indice in self.colunas.items()
+            for id_valor, nota in indice.buscar(termo, limite)
+            if nota >= nota_minima
+        ]
+        candidatos.sort(key=lambda c: -c['nota'])
+        return candidatos[:limite]
@@ -0,0 +1,108 @@
+"""
+🗃️ CACHE DE RESPOSTAS DO AGENTE
+Cache LRU das respostas agregadas; cada resposta guarda a versão dos dados de que depende
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+
+# ==================== CACHE LRU ====================
+class CacheRespostas:
+    """
+    Cache LRU limitado por quantidade de itens e por tamanho total das respostas.
+
+    Cada item guarda a versão (das tabelas que a resposta usa) com que foi calculado: uma versão
+    diferente na consulta invalida só aquele item, nunca as respostas das outras intenções.
+    """
+
+    def __init__(self, max_itens=256, max_caracteres=2_000_000):
+        self.max_itens = max_itens
+        self.max_caracteres = max_caracteres
+        self._itens = OrderedDict()
+        self._caracteres = 0
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.invalidacoes = 0
+
+    def obter(self, intencao, parametros, versao, calcular):
+        """Retorna a resposta de (intenção, parâmetros) na versão dos dados, calculando se preciso"""
+        chave = (intencao, parametros)
+
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                versao_item, resposta = item
+                if versao_item == versao:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return resposta
+                # Tabelas da resposta mudaram: só este item deixa de valer
+                self._remover(chave)
+                self.invalidacoes += 1
+
+            self.falhas += 1
+
+        # Calcula fora do lock: duas threads podem calcular a mesma chave, nunca se bloqueiam
+        resposta = calcular()
+
+        with self._lock:
+            if len(resposta) <= self.max_caracteres:
+                # Outra thread pode ter guardado a mesma chave (em outra versão) enquanto calculávamos
+                if chave in self._itens:
+                    self._remover(chave)
+                self._itens[chave] = (versao, resposta)
+                self._caracteres += len(resposta)
+                while len(self._itens) > self.max_itens or self._caracteres > self.max_caracteres:
+                    _, (_, removida) = self._itens.popitem(last=False)
+                    self._caracteres -= len(removida)
+                    self.remocoes += 1
+
+        return resposta
+
+    def limpar(self):
+        """Esvazia o cache (os contadores são mantidos)"""
+        with self._lock:
+            self._limpar()
+
+    def _limpar(self):
+        self._itens.clear()
+        self._caracteres = 0
+
+    def _remover(self, chave):
+        _, resposta = self._itens.pop(chave)
+        self._caracteres -= len(resposta)
+
+    def estatisticas(self):
+        """Contadores de uso do cache"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'itens': len(self._itens),
+                'caracteres': self._caracteres,
+                'remocoes': self.remocoes,
+                'invalidacoes': self.invalidacoes
+            }
+
+
+def resposta_em_cache(intencao, parametros=None):
+    """
+    Decorador para métodos responder_* do agente.
+
+    parametros(pergunta) devolve o que, na pergunta, muda a resposta (parte da chave).
+    O objeto precisa expor self.cache e self.versao_dados().
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltorio(self, pergunta):
+            chave = parametros(pergunta) if parametros else ()
+            return self.cache.obter(intencao, chave, self.versao_dados(), lambda: metodo(self, pergunta))
+        return envoltorio
+    return decorador
@@ -0,0 +1,183 @@
+"""
+💳 CÁLCULO MENSAL DE VALE REFEIÇÃO
+Cálculo vetorizado por funcionário: dias úteis do estado, férias, admissões e desligamentos
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# ==================== PARÂMETROS ====================
+# Valor diário e estado (calendário de feriados) de cada sindicato; quem tem direito está em regras_vr
+SINDICATOS = {
+    'SINDPD SP - SIND.TRAB.EM PROC DADOS SP': {'estado': 'SP', 'valor_diario': 37.50},
+    'SINDPPD RS - SINDICATO TRAB. PROC. DADOS RS': {'estado': 'RS', 'valor_diario': 35.00},
+    'SINDPD RJ - SINDICATO TRAB. PROC. DADOS RJ': {'estado': 'RJ', 'valor_diario': 35.00},
+    'SINDPD MG - SINDICATO TRAB. PROC. DADOS MG': {'estado': 'MG', 'valor_diario': 36.00}
+}
+
+# Usado para quem ainda não tem sindicato (ex.: admissões do mês)
+VALOR_DIARIO_PADRAO = 37.50
+
+# Divisão do custo: 80% empresa, 20% desconto em folha
+PERCENTUAL_EMPRESA = 0.8
+
+NOMES_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+FERIADOS_NACIONAIS = ['01-01', '04-21', '05-01', '09-07', '10-12', '11-02', '11-15', '11-20', '12-25']
+
+FERIADOS_ESTADUAIS = {
+    'SP': ['07-09'],
+    'RJ': ['04-23'],
+    'RS': ['09-20'],
+    'MG': []
+}
+
+
+# ==================== CALENDÁRIO ====================
+def calcular_pascoa(ano):
+    """Data da Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return np.datetime64(f'{ano:04d}-{mes:02d}-{dia + 1:02d}')
+
+
+def feriados(ano, estado=''):
+    """Feriados nacionais (incluindo Sexta-feira Santa) e estaduais do ano"""
+    datas = [f'{ano:04d}-{dia}' for dia in FERIADOS_NACIONAIS + FERIADOS_ESTADUAIS.get(estado, [])]
+    datas = np.array(datas, dtype='datetime64[D]')
+    sexta_santa = calcular_pascoa(ano) - np.timedelta64(2, 'D')
+    return np.unique(np.append(datas, sexta_santa))
+
+
+@lru_cache(maxsize=None)
+def calendario(ano, estado=''):
+    """Calendário de dias úteis (seg-sex sem feriados) de um estado"""
+    return np.busdaycalendar(weekmask='1111100', holidays=feriados(ano, estado))
+
+
+def contar_dias_uteis(inicio, fim, estados, ano):
+    """busday_count vetorizado em [inicio, fim), usando o calendário do estado de cada linha"""
+    dias = np.zeros(len(inicio), dtype=np.int64)
+    for estado in pd.unique(estados):
+        mascara = estados == estado
+        dias[mascara] = np.busday_count(inicio[mascara], fim[mascara], busdaycal=calendario(ano, estado))
+    return np.clip(dias, 0, None)
+
+
+def limites_competencia(competencia):
+    """Primeiro dia do mês e primeiro dia do mês seguinte (datetime64[D])"""
+    mes = np.datetime64(competencia, 'M')
+    return mes.astype('datetime64[D]'), (mes + 1).astype('datetime64[D]')
+
+
+def nome_competencia(competencia):
+    """'2025-03' -> 'Março/2025'"""
+    ano, mes = competencia.split('-')[:2]
+    return f"{NOMES_MESES[int(mes) - 1]}/{ano}"
+
+
+# ==================== CÁLCULO ====================
+def calcular_vr(dados, competencia, elegivel=None, sindicatos=None, dias_uteis=None, motivos=None):
+    """
+    Calcula o VR de todos os funcionários e admitidos na competência ('AAAA-MM').
+
+    elegivel: Series 'SIM'/'NAO' indexada por matrícula (ausentes contam como 'SIM').
+    motivos: Series com o motivo de cada inelegível, indexada por matrícula (regras_vr).
+    dias_uteis: dias úteis oficiais por sindicato; substituem os do calendário e a
+    proporcionalidade desconta deles os dias fora da janela trabalhada.
+    """
+    sindicatos = SINDICATOS if sindicatos is None else sindicatos
+    inicio_mes, fim_mes = limites_competencia(competencia)
+    ano = int(str(competencia)[:4])
+
+    # Base: funcionários + admitidos até o fim do mês que ainda não estão no cadastro
+    func = dados['funcionarios']
+    adm = dados['admissoes']
+    novos = adm[~adm['MATRICULA'].isin(func['MATRICULA']) & (adm['DATA_ADMISSAO'] < fim_mes)]
+    base = pd.concat([
+        func[['MATRICULA', 'SINDICATO', 'DATA_ADMISSAO']],
+        novos[['MATRICULA', 'DATA_ADMISSAO']]
+    ], ignore_index=True).drop_duplicates('MATRICULA', ignore_index=True)
+    n = len(base)
+
+    # Sem sindicato (estado '') só contam os feriados nacionais
+    sindicato = base['SINDICATO'].astype(object)
+    estados = sindicato.map({s: p['estado'] for s, p in sindicatos.items()})
+    estados = estados.fillna('').to_numpy(dtype=object)
+    valor_diario = sindicato.map({s: p['valor_diario'] for s, p in sindicatos.items()})
+    valor_diario = valor_diario.fillna(VALOR_DIARIO_PADRAO).to_numpy(dtype=np.float64)
+
+    # Janela trabalhada no mês: [admissão, desligamento] recortada pela competência
+    admissao = base['DATA_ADMISSAO'].to_numpy(dtype='datetime64[D]')
+    inicio = np.maximum(admissao, inicio_mes)
+
+    desl = dados['desligamentos'].drop_duplicates('MATRICULA').set_index('MATRICULA')['DATA_DESLIGAMENTO']
+    data_desl = base['MATRICULA'].map(desl).to_numpy(dtype='datetime64[D]')
+    fim = np.where(np.isnat(data_desl), fim_mes, np.minimum(data_desl + 1, fim_mes))
+    fim = np.maximum(fim, inicio)
+
+    dias_mes = contar_dias_uteis(
+        np.full(n, inicio_mes), np.full(n, fim_mes), estados, ano
+    )
+    dias_trabalhados = contar_dias_uteis(inicio, fim, estados, ano)
+
+    if dias_uteis:
+        oficiais = sindicato.map(dias_uteis).to_numpy(dtype=np.float64)
+        informado = ~np.isnan(oficiais)
+        fora_da_janela = dias_mes - dias_trabalhados
+        dias_mes = np.where(informado, oficiais, dias_mes).astype(np.int64)
+        dias_trabalhados = np.clip(dias_mes - fora_da_janela, 0, None)
+
+    # Férias: dias úteis da interseção de cada período com a janela trabalhada
+    ferias = dados['ferias']
+    posicao = pd.Index(base['MATRICULA']).get_indexer(ferias['MATRICULA'])
+    validas = posicao >= 0
+    posicao = posicao[validas]
+    inicio_ferias = np.maximum(ferias['INICIO_FERIAS'].to_numpy(dtype='datetime64[D]')[validas], inicio[posicao])
+    fim_ferias = np.minimum(ferias['FIM_FERIAS'].to_numpy(dtype='datetime64[D]')[validas] + 1, fim[posicao])
+    dias_ferias_periodo = contar_dias_uteis(
+        inicio_ferias, np.maximum(fim_ferias, inicio_ferias), estados[posicao], ano
+    )
+    dias_ferias = np.bincount(posicao, weights=dias_ferias_periodo, minlength=n).astype(np.int64)
+    dias_ferias = np.minimum(dias_ferias, dias_trabalhados)
+
+    if elegivel is None:
+        eleg = np.full(n, 'SIM', dtype=object)
+    else:
+        eleg = base['MATRICULA'].map(elegivel).fillna('SIM').to_numpy(dtype=object)
+
+    if motivos is None:
+        motivo = np.full(n, '', dtype=object)
+    else:
+        motivo = base['MATRICULA'].map(motivos.astype(object)).fillna('').to_numpy(dtype=object)
+
+    dias_uteis = dias_trabalhados - dias_ferias
+    valor_total = np.round(dias_uteis * valor_diario * (eleg == 'SIM'), 2)
+    custo_empresa = np.round(valor_total * PERCENTUAL_EMPRESA, 2)
+
+    return pd.DataFrame({
+        'MATRICULA': base['MATRICULA'].to_numpy(),
+        'COMPETENCIA': str(competencia),
+        'ESTADO': estados,
+        'ELEGIVEL': eleg,
+        'MOTIVO_INELEGIBILIDADE': motivo,
+        'VALOR_DIARIO': valor_diario,
+        'DIAS_UTEIS_MES': dias_mes,
+        'DIAS_FERIAS': dias_ferias,
+        'DIAS_UTEIS': dias_uteis,
+        'VALOR_TOTAL': valor_total,
+        'DESCONTO_FUNCIONARIO': np.round(valor_total - custo_empresa, 2),
+        'CUSTO_EMPRESA': custo_empresa
+    })
@@ -0,0 +1,127 @@
+"""
+🗜️ COMPACTAÇÃO DAS TABELAS EM MEMÓRIA
+Colunas de baixa cardinalidade viram category, inteiros são reduzidos ao menor tipo
+e colunas geradas por fórmula (NOME/EMAIL) deixam de ser guardadas.
+"""
+
+import string
+
+import pandas as pd
+
+
+# Fração máxima de valores distintos para uma coluna de texto virar category
+LIMITE_CARDINALIDADE = 0.5
+
+# Colunas que costumam seguir uma fórmula sobre outra coluna; só são removidas se todas as linhas seguirem
+FORMULAS = {
+    'funcionarios': {
+        'NOME': 'Funcionário {MATRICULA}',
+        'EMAIL': 'func{MATRICULA}@empresa.com'
+    }
+}
+
+
+# ==================== FÓRMULAS ====================
+def _montar(df, modelo):
+    """Gera a coluna do modelo ('texto {COLUNA} texto') de forma vetorizada"""
+    resultado = None
+    for literal, campo, _, _ in string.Formatter().parse(modelo):
+        partes = [literal] if literal else []
+        if campo:
+            partes.append(df[campo].astype(str))
+        for parte in partes:
+            resultado = parte if resultado is None else resultado + parte
+    if isinstance(resultado, str):
+        return pd.Series(resultado, index=df.index)
+    return resultado
+
+
+def colunas_derivadas(df):
+    """Modelos das colunas que foram removidas por serem derivadas ({coluna: modelo})"""
+    return df.attrs.get('colunas_derivadas', {})
+
+
+def derivar_registro(registro, derivadas):
+    """Completa um registro (dict) com as colunas derivadas"""
+    for coluna, modelo in derivadas.items():
+        registro[coluna] = modelo.format(**registro)
+    return registro
+
+
+def obter_coluna(df, coluna):
+    """Uma coluna de df, montada pela fórmula se for derivada (sem materializar as demais)"""
+    derivadas = colunas_derivadas(df)
+    if coluna in derivadas:
+        return _montar(df, derivadas[coluna])
+    return df[coluna]
+
+
+def materializar(df):
+    """Devolve df com as colunas derivadas de volta (use em fatias: página, exportação)"""
+    derivadas = colunas_derivadas(df)
+    if not derivadas:
+        return df
+
+    df = df.copy()
+    for coluna, modelo in derivadas.items():
+        df[coluna] = _montar(df, modelo)
+
+    ordem = [c for c in df.attrs.get('colunas_originais', []) if c in df.columns]
+    return df[ordem + [c for c in df.columns if c not in ordem]]
+
+
+# ==================== COMPACTAÇÃO ====================
+def _reduzir_numerica(serie):
+    """
+    Menor tipo inteiro que comporta os valores.
+
+    Floats ficam em float64: são valores em reais e as somas em float32 perdem centavos.
+    """
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast='integer')
+    return serie
+
+
+def compactar_tabela(df, formulas=None):
+    """Versão compacta da tabela (não altera a original)"""
+    df = df.copy()
+    df.attrs['colunas_originais'] = list(df.columns)
+    derivadas = {}
+
+    for coluna, modelo in (formulas or {}).items():
+        if coluna in df.columns and df[coluna].equals(_montar(df, modelo)):
+            derivadas[coluna] = modelo
+    df = df.drop(columns=list(derivadas))
+
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype == object and len(serie) and serie.nunique() <= LIMITE_CARDINALIDADE * len(serie):
+            df[coluna] = serie.astype('category')
+        elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            df[coluna] = _reduzir_numerica(serie)
+
+    df.attrs['colunas_derivadas'] = derivadas
+    return df
+
+
+def memoria(df):
+    """Bytes ocupados pela tabela, contando o conteúdo dos textos"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compactar_dados(dados):
+    """Compacta as cinco tabelas; devolve (dados, relatório de memória antes/depois)"""
+    compactos = {}
+    linhas = []
+    for tabela, df in dados.items():
+        compactos[tabela] = compactar_tabela(df, FORMULAS.get(tabela))
+        antes, depois = memoria(df), memoria(compactos[tabela])
+        linhas.append({
+            'Tabela': tabela,
+            'Linhas': len(df),
+            'Antes (MB)': antes / 2**20,
+            'Depois (MB)': depois / 2**20,
+            'Redução': 1 - depois / antes if antes else 0.0
+        })
+
+    return compactos, pd.DataFrame(linhas)
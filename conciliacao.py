@@ -0,0 +1,234 @@
+"""
+🧮 CONCILIAÇÃO COM O ARQUIVO DE RETORNO DA OPERADORA
+Lê o CSV da operadora (matrícula, valor creditado, status) em blocos e cruza cada bloco por hash
+(pd.Index.get_indexer) com o VR calculado: a memória fica limitada ao bloco e a um acumulador por
+linha de VR, qualquer que seja o tamanho do arquivo.
+"""
+
+import csv
+import gzip
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from ingestao import padronizar_colunas
+from roteador import normalizar
+
+
+TAMANHO_BLOCO = 500_000
+
+# Diferença em reais abaixo da qual crédito e cálculo são considerados iguais
+TOLERANCIA = 0.01
+
+# Colunas do arquivo (sem acento, maiúsculas) -> coluna da conciliação; a matrícula segue os
+# sinônimos da ingestão
+SINONIMOS_RETORNO = {
+    'VALOR_CREDITADO': 'VALOR', 'VALOR': 'VALOR', 'CREDITO': 'VALOR', 'VALOR_CREDITO': 'VALOR',
+    'TOTAL': 'VALOR', 'VALOR_PAGO': 'VALOR',
+    'STATUS': 'STATUS', 'SITUACAO': 'STATUS', 'STATUS_CREDITO': 'STATUS'
+}
+
+# Status (sem acento, minúsculo) que contam como crédito efetivado; os demais são recusas
+STATUS_CREDITADO = {'creditado', 'credito', 'ok', 'pago', 'processado', 'efetivado', 'sucesso'}
+
+# Linhas guardadas como exemplo para matrículas que não estão no cálculo
+MAX_EXEMPLOS = 20
+
+# Linhas lidas antes do arquivo para descobrir o formato dos valores ('1.234,56' ou '1234.56')
+LINHAS_AMOSTRA = 200
+_DECIMAL_VIRGULA = re.compile(r',\d{1,2}$')
+
+
+# ==================== LEITURA ====================
+def _abrir(arquivo):
+    """
+    Texto a partir de um caminho ou de um arquivo binário já aberto (ex.: upload do Streamlit).
+
+    Nomes terminados em .gz são descompactados durante a leitura.
+    """
+    if isinstance(arquivo, io.TextIOBase):
+        return arquivo
+    nome = arquivo if isinstance(arquivo, str) else getattr(arquivo, 'name', '')
+    if isinstance(arquivo, str):
+        binario = open(arquivo, 'rb')
+    else:
+        arquivo.seek(0)
+        binario = arquivo
+    if str(nome).lower().endswith('.gz'):
+        binario = gzip.GzipFile(fileobj=binario, mode='rb')
+    return io.TextIOWrapper(binario, encoding='utf-8-sig', newline='')
+
+
+def _fechar(entrada, arquivo):
+    """Fecha o que _abrir criou, sem fechar o arquivo de quem chamou"""
+    if entrada is arquivo:
+        return
+    if isinstance(arquivo, str):
+        entrada.close()
+        return
+    binario = entrada.detach()
+    if binario is not arquivo:
+        binario.close()
+
+
+def _cabecalho(linha):
+    """(separador, nomes das colunas) detectados pela linha de cabeçalho"""
+    separador = csv.Sniffer().sniff(linha, delimiters=';,\t|').delimiter
+    return separador, next(csv.reader([linha], delimiter=separador))
+
+
+def _colunas(originais):
+    """Nome original -> MATRICULA/VALOR/STATUS (ValueError se faltar matrícula ou valor)"""
+    colunas = {}
+    for original in originais:
+        chave = re.sub(r'[^A-Z0-9]+', '_', normalizar(original).upper()).strip('_')
+        padronizada = padronizar_colunas(pd.DataFrame(columns=[original])).columns[0]
+        coluna = SINONIMOS_RETORNO.get(chave) or ('MATRICULA' if padronizada == 'MATRICULA' else None)
+        if coluna and coluna not in colunas.values():
+            colunas[original] = coluna
+
+    faltando = {'MATRICULA', 'VALOR'} - set(colunas.values())
+    if faltando:
+        raise ValueError(
+            f"Arquivo da operadora sem a(s) coluna(s): {', '.join(sorted(faltando))} "
+            f"(colunas encontradas: {', '.join(originais)})"
+        )
+    return colunas
+
+
+def _formato_decimal(entrada, separador, posicao_valor):
+    """(decimal, milhar) dos valores, por uma amostra das primeiras linhas; volta ao início dos dados"""
+    inicio = entrada.tell()
+    amostra = [entrada.readline() for _ in range(LINHAS_AMOSTRA)]
+    entrada.seek(inicio)
+    for campos in csv.reader([linha for linha in amostra if linha], delimiter=separador):
+        if len(campos) > posicao_valor and _DECIMAL_VIRGULA.search(campos[posicao_valor].strip()):
+            return ',', '.'
+    return '.', None
+
+
+def _numero(texto):
+    """Valores em texto ('1.234,56', 'R$ 37,50', '825.00') como float (NaN se inválido)"""
+    texto = texto.astype(str).str.strip().str.replace(r'^R\$\s*', '', regex=True)
+    virgula = texto.str.contains(',', regex=False, na=False)
+    texto = texto.where(~virgula, texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def ler_blocos(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Blocos (MATRICULA, VALOR, STATUS) do arquivo de retorno, com tipos já convertidos.
+
+    Os números são convertidos pelo parser do pandas; só blocos com valores fora do padrão
+    (ex.: 'R$ 37,50') passam pela conversão em texto.
+    """
+    entrada = _abrir(arquivo)
+    try:
+        separador, originais = _cabecalho(entrada.readline())
+        colunas = _colunas(originais)
+        posicao_valor = originais.index(next(o for o, c in colunas.items() if c == 'VALOR'))
+        decimal, milhar = _formato_decimal(entrada, separador, posicao_valor)
+        leitor = pd.read_csv(
+            entrada, sep=separador, header=None, names=originais, usecols=list(colunas),
+            dtype={o: str for o, c in colunas.items() if c == 'STATUS'},
+            decimal=decimal, thousands=milhar, chunksize=tamanho_bloco
+        )
+        for bloco in leitor:
+            bloco = bloco.rename(columns=colunas)
+            matricula, valor = bloco['MATRICULA'], bloco['VALOR']
+            yield pd.DataFrame({
+                'MATRICULA': matricula if matricula.dtype.kind in 'if' else pd.to_numeric(matricula, errors='coerce'),
+                'VALOR': valor if valor.dtype.kind in 'if' else _numero(valor),
+                'STATUS': bloco['STATUS'].fillna('') if 'STATUS' in bloco else 'creditado'
+            })
+    finally:
+        _fechar(entrada, arquivo)
+
+
+# ==================== CONCILIAÇÃO ====================
+def _tabela(matriculas, esperado, creditado):
+    tabela = pd.DataFrame({
+        'MATRICULA': matriculas,
+        'ESPERADO': esperado,
+        'CREDITADO': np.round(creditado, 2),
+        'DIFERENCA': np.round(creditado - esperado, 2)
+    })
+    return tabela.sort_values('DIFERENCA', key=np.abs, ascending=False, kind='stable').reset_index(drop=True)
+
+
+def conciliar(arquivo, dados, tamanho_bloco=TAMANHO_BLOCO, tolerancia=TOLERANCIA):
+    """
+    Concilia o arquivo de retorno com dados['vr'] (créditos da mesma matrícula são somados).
+
+    Devolve um dict com os totais e as tabelas (MATRICULA, ESPERADO, CREDITADO, DIFERENCA) de
+    'faltantes' (sem crédito), 'a_maior', 'a_menor' e 'desligados' (desligados creditados além do
+    proporcional, fora de 'a_maior'), além de 'sem_calculo' (matrículas fora do VR) e 'recusados'
+    (linhas por status não creditado).
+    """
+    vr = dados['vr'].drop_duplicates('MATRICULA')
+    indice = pd.Index(vr['MATRICULA'].to_numpy())
+    esperado = vr['VALOR_TOTAL'].to_numpy(dtype=np.float64)
+    desligado = indice.isin(dados['desligamentos']['MATRICULA'])
+
+    # Acumuladores do tamanho do VR calculado, nunca do arquivo
+    creditado = np.zeros(len(indice))
+    creditos = np.zeros(len(indice), dtype=np.int64)
+    linhas = invalidas = 0
+    sem_calculo = {'linhas': 0, 'valor': 0.0, 'exemplos': []}
+    recusados = {}
+
+    for bloco in ler_blocos(arquivo, tamanho_bloco):
+        linhas += len(bloco)
+        validas = bloco['MATRICULA'].notna() & bloco['VALOR'].notna()
+        invalidas += int((~validas).sum())
+        bloco = bloco[validas]
+
+        # Status avaliado uma vez por valor distinto
+        codigos, status = pd.factorize(bloco['STATUS'])
+        status = [str(s).strip() for s in status]
+        efetivado = np.array([normalizar(s) in STATUS_CREDITADO for s in status] + [False])[codigos]
+        recusa = np.bincount(codigos[~efetivado], minlength=len(status))
+        valor_recusa = np.bincount(codigos[~efetivado], weights=bloco['VALOR'].to_numpy()[~efetivado], minlength=len(status))
+        for i in np.flatnonzero(recusa):
+            anterior = recusados.get(status[i], (0, 0.0))
+            recusados[status[i]] = (anterior[0] + int(recusa[i]), anterior[1] + float(valor_recusa[i]))
+
+        matriculas = bloco['MATRICULA'].to_numpy(dtype=np.int64)[efetivado]
+        valores = bloco['VALOR'].to_numpy(dtype=np.float64)[efetivado]
+
+        # Junção por hash: posição de cada matrícula do bloco no VR calculado (-1 = não calculada)
+        posicao = indice.get_indexer(matriculas)
+        encontradas = posicao >= 0
+        creditado += np.bincount(posicao[encontradas], weights=valores[encontradas], minlength=len(indice))
+        creditos += np.bincount(posicao[encontradas], minlength=len(indice))
+
+        fora = ~encontradas
+        sem_calculo['linhas'] += int(fora.sum())
+        sem_calculo['valor'] += float(valores[fora].sum())
+        faltam = MAX_EXEMPLOS - len(sem_calculo['exemplos'])
+        if faltam > 0:
+            sem_calculo['exemplos'].extend(zip(matriculas[fora][:faltam].tolist(), valores[fora][:faltam].tolist()))
+
+    matriculas = indice.to_numpy()
+    diferenca = creditado - esperado
+    faltantes = (esperado > tolerancia) & (creditos == 0)
+    a_menor = (creditos > 0) & (diferenca < -tolerancia)
+    # Desligado só tem direito ao proporcional calculado: o que passar disso é crédito indevido
+    desligados = desligado & (diferenca > tolerancia)
+    a_maior = (diferenca > tolerancia) & ~desligado
+
+    return {
+        'linhas': linhas,
+        'linhas_invalidas': invalidas,
+        'valor_creditado': float(creditado.sum() + sem_calculo['valor']),
+        'valor_esperado': float(esperado.sum()),
+        'faltantes': _tabela(matriculas[faltantes], esperado[faltantes], creditado[faltantes]),
+        'a_maior': _tabela(matriculas[a_maior], esperado[a_maior], creditado[a_maior]),
+        'a_menor': _tabela(matriculas[a_menor], esperado[a_menor], creditado[a_menor]),
+        'desligados': _tabela(matriculas[desligados], esperado[desligados], creditado[desligados]),
+        'sem_calculo': sem_calculo,
+        'recusados': recusados
+    }
+
@@ -0,0 +1,102 @@
+"""
+💬 HISTÓRICO DAS CONVERSAS
+Só as mensagens mais recentes de cada sessão ficam em memória; as anteriores vão em lotes para um
+SQLite local e só voltam quando a tela pede mensagens mais antigas ("carregar mais").
+"""
+
+import os
+import sqlite3
+import tempfile
+import uuid
+import weakref
+from contextlib import closing
+
+
+# Banco compartilhado pelas sessões do processo (cada sessão tem seu id)
+CAMINHO_BANCO_PADRAO = os.path.join(tempfile.gettempdir(), 'agente_vr_conversas.sqlite3')
+
+# Mensagens por sessão mantidas em memória
+LIMITE_MEMORIA = 40
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS mensagens (
+    sessao TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    PRIMARY KEY (sessao, posicao)
+) WITHOUT ROWID
+"""
+
+
+def _conectar(caminho):
+    # Uma conexão por operação: as sessões do Streamlit rodam em threads diferentes
+    conexao = sqlite3.connect(caminho, timeout=30)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute(_ESQUEMA)
+    return conexao
+
+
+def _apagar(caminho, sessao):
+    """Remove do banco as mensagens de uma sessão"""
+    if not os.path.exists(caminho):
+        return
+    with closing(_conectar(caminho)) as conexao, conexao:
+        conexao.execute('DELETE FROM mensagens WHERE sessao = ?', (sessao,))
+
+
+class HistoricoMensagens:
+    """
+    Mensagens de uma sessão ({'tipo': 'user' | 'bot', 'texto'}), da mais antiga para a mais recente.
+
+    Passando de limite_memoria, a metade mais antiga vai para o SQLite numa transação só; quando a
+    sessão acaba (objeto coletado), as mensagens dela são apagadas do banco.
+    """
+
+    def __init__(self, limite_memoria=LIMITE_MEMORIA, caminho=CAMINHO_BANCO_PADRAO):
+        self.limite_memoria = max(limite_memoria, 2)
+        self.caminho = caminho
+        self.sessao = uuid.uuid4().hex
+        self._recentes = []
+        # Mensagens já gravadas no banco (posições 0 a _em_disco - 1)
+        self._em_disco = 0
+        weakref.finalize(self, _apagar, caminho, self.sessao)
+
+    def __len__(self):
+        return self._em_disco + len(self._recentes)
+
+    def adicionar(self, tipo, texto):
+        self._recentes.append({'tipo': tipo, 'texto': texto})
+        if len(self._recentes) > self.limite_memoria:
+            self._descarregar(len(self._recentes) - self.limite_memoria // 2)
+
+    def _descarregar(self, quantidade):
+        """Grava as `quantidade` mensagens mais antigas da memória no banco"""
+        lote = [
+            (self.sessao, self._em_disco + i, mensagem['tipo'], mensagem['texto'])
+            for i, mensagem in enumerate(self._recentes[:quantidade])
+        ]
+        with closing(_conectar(self.caminho)) as conexao, conexao:
+            conexao.executemany('INSERT INTO mensagens VALUES (?, ?, ?, ?)', lote)
+        del self._recentes[:quantidade]
+        self._em_disco += quantidade
+
+    def ultimas(self, quantidade):
+        """As `quantidade` mensagens mais recentes, em ordem (as que não estão em memória vêm do banco)"""
+        quantidade = min(quantidade, len(self))
+        faltam = quantidade - len(self._recentes)
+        if faltam <= 0:
+            return self._recentes[len(self._recentes) - quantidade:]
+
+        with closing(_conectar(self.caminho)) as conexao:
+            antigas = conexao.execute(
+                'SELECT tipo, texto FROM mensagens WHERE sessao = ? AND posicao >= ? ORDER BY posicao',
+                (self.sessao, self._em_disco - faltam)
+            ).fetchall()
+        return [{'tipo': tipo, 'texto': texto} for tipo, texto in antigas] + self._recentes
+
+    def limpar(self):
+        if self._em_disco:
+            _apagar(self.caminho, self.sessao)
+        self._recentes = []
+        self._em_disco = 0
@@ -0,0 +1,294 @@
+"""
+🧊 CUBO DE AGREGADOS DOS FUNCIONÁRIOS
+Contagens e somas de VR pré-calculadas por (departamento, cargo, sindicato, estado, situação, elegibilidade):
+qualquer combinação de filtros é respondida somando células, sem refiltrar as tabelas.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from ingestao import UFS
+from roteador import normalizar
+
+
+# Coluna -> nome exibido
+DIMENSOES = {
+    'DEPARTAMENTO': 'Departamento',
+    'CARGO': 'Cargo',
+    'SINDICATO': 'Sindicato',
+    'ESTADO': 'Estado',
+    'SITUACAO': 'Situação',
+    'ELEGIVEL': 'Elegível ao VR'
+}
+
+# Somas de VR guardadas em cada célula (além da contagem de funcionários)
+MEDIDAS = ['VALOR_TOTAL', 'CUSTO_EMPRESA', 'DESCONTO_FUNCIONARIO']
+
+# Dimensões em que a primeira palavra sozinha já seleciona o grupo ("analistas", "sindpd")
+DIMENSOES_POR_PREFIXO = ['CARGO', 'SINDICATO']
+
+# Palavras de elegibilidade (os valores SIM/NAO não servem para procurar na pergunta)
+ELEGIBILIDADE = {'elegivel': 'SIM', 'elegiveis': 'SIM', 'inelegivel': 'NAO', 'inelegiveis': 'NAO'}
+
+# Estado por sigla ou nome (sem acento, minúsculo); siglas que também são palavras ("se", "to", "pe")
+# só valem em maiúsculas na pergunta ou quando o estado existe nos dados
+NOMES_ESTADOS = {tuple(nome.lower().split()): uf for nome, uf in UFS.items()}
+SIGLAS_ESTADOS = set(UFS.values())
+
+# Preposições de lugar: um nome próprio depois delas que não casou com nada é avisado na resposta
+PREPOSICOES_DE_LUGAR = {'em', 'no', 'na', 'nos', 'nas'}
+
+# Filtros que, sozinhos e sem agrupamento, têm responder próprio ("quem está de férias?")
+FILTROS_COM_RESPONDER = [{'SITUACAO': ['Férias']}]
+
+# Palavras de contagem/custo: sem elas (nem "por ..."), uma pergunta genérica que cita um cargo é busca
+PISTAS_DE_RECORTE = {'quantos', 'quantas', 'quanto', 'custo', 'custos', 'total', 'totais', 'valor', 'valores'}
+
+# "por <palavra>" -> dimensão do agrupamento
+AGRUPAMENTOS = {
+    'departamento': 'DEPARTAMENTO', 'departamentos': 'DEPARTAMENTO', 'area': 'DEPARTAMENTO', 'areas': 'DEPARTAMENTO',
+    'cargo': 'CARGO', 'cargos': 'CARGO', 'funcao': 'CARGO',
+    'sindicato': 'SINDICATO', 'sindicatos': 'SINDICATO',
+    'estado': 'ESTADO', 'estados': 'ESTADO', 'uf': 'ESTADO',
+    'situacao': 'SITUACAO', 'status': 'SITUACAO',
+    'elegibilidade': 'ELEGIVEL'
+}
+
+
+def _codificar(serie):
+    """(códigos, valores) de uma coluna; vazios viram o valor '(vazio)'"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.int64)
+        valores = [str(v) for v in serie.cat.categories]
+    else:
+        codigos, valores = pd.factorize(serie, sort=True)
+        valores = [str(v) for v in valores]
+    if (codigos < 0).any():
+        codigos = np.where(codigos < 0, len(valores), codigos)
+        valores.append('(vazio)')
+    return codigos, valores
+
+
+def _atributo(funcionarios, novos, dimensao):
+    """Coluna da dimensão no cadastro seguida da dos admitidos fora dele (vazia se a admissão não a tem)"""
+    coluna = funcionarios[dimensao]
+    extra = novos[dimensao] if dimensao in novos.columns else pd.Series(np.nan, index=novos.index, dtype=object)
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return pd.Series(union_categoricals([coluna, extra.astype('category')], ignore_order=True))
+    return pd.concat([coluna, extra], ignore_index=True)
+
+
+class CuboFuncionarios:
+    """
+    Células não vazias do cubo: códigos das dimensões, número de funcionários e somas de VR.
+
+    Base: as linhas do VR (como nos agregados), com os atributos do cadastro pela matrícula; admitidos
+    que ainda não estão no cadastro levam o cargo da admissão. O estado é o do cálculo do VR (calendário
+    do sindicato). Funcionários do cadastro sem linha de VR entram como não elegíveis, R$ 0.
+    """
+
+    def __init__(self, dados):
+        funcionarios = dados['funcionarios']
+        vr = dados['vr'].drop_duplicates('MATRICULA')
+        admissoes = dados['admissoes']
+        novos = admissoes[~admissoes['MATRICULA'].isin(funcionarios['MATRICULA'])].drop_duplicates('MATRICULA')
+
+        # Linhas do cubo: as do VR e depois as do cadastro sem VR; `posicao` = linha no cadastro (-1 = nenhuma)
+        cadastro = pd.Index(np.concatenate([funcionarios['MATRICULA'].to_numpy(), novos['MATRICULA'].to_numpy()]))
+        sem_vr = np.flatnonzero(~funcionarios['MATRICULA'].isin(vr['MATRICULA']).to_numpy())
+        posicao = np.concatenate([cadastro.get_indexer(vr['MATRICULA']), sem_vr])
+        no_cadastro = posicao >= 0
+        linhas = len(posicao)
+
+        codigos, self._valores = {}, {}
+        for dimensao in DIMENSOES:
+            if dimensao == 'ELEGIVEL':
+                elegivel = np.zeros(linhas, dtype=bool)
+                elegivel[:len(vr)] = (vr['ELEGIVEL'] == 'SIM').to_numpy()
+                codigos[dimensao] = np.where(elegivel, 0, 1)
+                self._valores[dimensao] = ['SIM', 'NAO']
+                continue
+
+            if dimensao == 'ESTADO':
+                codigos_vr, valores = _codificar(vr['ESTADO'].astype(object).replace('', np.nan))
+                if linhas > len(vr) and '(vazio)' not in valores:
+                    valores.append('(vazio)')
+                codigos[dimensao] = np.full(linhas, len(valores) - 1, dtype=np.int64)
+                codigos[dimensao][:len(vr)] = codigos_vr
+                self._valores[dimensao] = valores
+                continue
+
+            codigos_cadastro, valores = _codificar(_atributo(funcionarios, novos, dimensao))
+            if not no_cadastro.all() and '(vazio)' not in valores:
+                valores.append('(vazio)')
+            codigos[dimensao] = np.full(linhas, len(valores) - 1, dtype=np.int64)
+            codigos[dimensao][no_cadastro] = codigos_cadastro[posicao[no_cadastro]]
+            self._valores[dimensao] = valores
+
+        medidas = np.zeros((linhas, len(MEDIDAS)))
+        medidas[:len(vr)] = vr[MEDIDAS].to_numpy(dtype=np.float64)
+
+        # Célula = índice linear das dimensões; só as que têm funcionários são guardadas
+        tamanhos = tuple(len(self._valores[d]) for d in DIMENSOES)
+        linear = np.ravel_multi_index(tuple(codigos[d] for d in DIMENSOES), tamanhos)
+        celulas, inverso = np.unique(linear, return_inverse=True)
+
+        self.celulas = len(celulas)
+        self._codigos = dict(zip(DIMENSOES, np.unravel_index(celulas, tamanhos)))
+        self._funcionarios = np.bincount(inverso, minlength=len(celulas))
+        self._somas = np.column_stack([
+            np.bincount(inverso, weights=medidas[:, i], minlength=len(celulas)) for i in range(len(MEDIDAS))
+        ]) if len(celulas) else np.zeros((0, len(MEDIDAS)))
+
+    def valores(self, dimensao):
+        """Valores possíveis de uma dimensão"""
+        return self._valores[dimensao]
+
+    def _recorte(self, filtro):
+        """Máscara das células que passam no filtro ({dimensão: [valores]})"""
+        mascara = np.ones(self.celulas, dtype=bool)
+        for dimensao, valores in (filtro or {}).items():
+            if valores:
+                codigos = [self._valores[dimensao].index(v) for v in valores if v in self._valores[dimensao]]
+                mascara &= np.isin(self._codigos[dimensao], codigos)
+        return mascara
+
+    def totais(self, filtro=None):
+        """{'FUNCIONARIOS', 'ELEGIVEIS', medidas...} do recorte"""
+        mascara = self._recorte(filtro)
+        elegiveis = mascara & (self._codigos['ELEGIVEL'] == 0)
+        totais = {
+            'FUNCIONARIOS': int(self._funcionarios[mascara].sum()),
+            'ELEGIVEIS': int(self._funcionarios[elegiveis].sum())
+        }
+        totais.update(zip(MEDIDAS, self._somas[mascara].sum(axis=0).tolist()))
+        return totais
+
+    def agrupar(self, dimensao, filtro=None):
+        """Funcionários e somas de VR do recorte por valor da dimensão (maior primeiro, sem grupos vazios)"""
+        mascara = self._recorte(filtro)
+        codigos = self._codigos[dimensao][mascara]
+        tamanho = len(self._valores[dimensao])
+
+        tabela = pd.DataFrame(
+            {'FUNCIONARIOS': np.bincount(codigos, weights=self._funcionarios[mascara], minlength=tamanho).astype(np.int64)},
+            index=pd.Index(self._valores[dimensao], name=dimensao)
+        )
+        for i, medida in enumerate(MEDIDAS):
+            tabela[medida] = np.bincount(codigos, weights=self._somas[mascara, i], minlength=tamanho)
+        tabela = tabela[tabela['FUNCIONARIOS'] > 0]
+        return tabela.sort_values('FUNCIONARIOS', ascending=False, kind='stable')
+
+
+# ==================== PERGUNTAS ====================
+def _variantes(palavra):
+    """A palavra e seus singulares prováveis (analistas -> analista, gerentes -> gerente)"""
+    variantes = {palavra}
+    if palavra.endswith('es') and len(palavra) > 4:
+        variantes.add(palavra[:-2])
+    if palavra.endswith('s') and len(palavra) > 3:
+        variantes.add(palavra[:-1])
+    return variantes
+
+
+def _inicios(palavras, frase):
+    """Posições em que a frase (lista de palavras) começa na pergunta (palavras = lista de conjuntos de variantes)"""
+    n = len(frase)
+    return [
+        i for i in range(len(palavras) - n + 1)
+        if all(frase[j] in palavras[i + j] for j in range(n))
+    ]
+
+
+def _contem(palavras, frase):
+    """A frase aparece em sequência na pergunta"""
+    return bool(frase) and bool(_inicios(palavras, frase))
+
+
+def _estados(originais, palavras, variantes, no_cubo):
+    """Siglas dos estados citados (por sigla ou nome, na ordem da pergunta) e as palavras usadas nisso"""
+    citados, usadas = [], set()
+    for i, (original, palavra) in enumerate(zip(originais, palavras)):
+        if palavra.upper() in SIGLAS_ESTADOS and (original.isupper() or palavra in no_cubo):
+            citados.append((i, palavra.upper()))
+            usadas.add(palavra)
+    # Nomes com inicial maiúscula ("Pará", não "para"); o mais longo vence ("Mato Grosso do Sul")
+    ocupadas = set()
+    for nome, uf in sorted(NOMES_ESTADOS.items(), key=lambda item: -len(item[0])):
+        for i in _inicios(variantes, list(nome)):
+            posicoes = set(range(i, i + len(nome)))
+            if originais[i][:1].isupper() and not posicoes & ocupadas:
+                citados.append((i, uf))
+                ocupadas |= posicoes
+                usadas.update(nome)
+    siglas = list(dict.fromkeys(uf for _, uf in sorted(citados)))
+    return siglas, usadas
+
+
+def interpretar(pergunta, cubo, exigir_pista=False):
+    """
+    Filtros e agrupamento citados na pergunta: {'filtro': {dimensão: [valores]}, 'por': dimensão ou None}.
+    None quando a pergunta não pede um recorte: nenhum filtro nem agrupamento, ou só um dos
+    FILTROS_COM_RESPONDER; com exigir_pista, também quando não há "por ..." nem PISTAS_DE_RECORTE.
+
+    Um valor é reconhecido pelo nome completo (sem acentos, no singular ou plural); em cargo e sindicato,
+    a primeira palavra sozinha seleciona todos os valores que começam com ela. Estados valem por sigla
+    ou nome, mesmo sem funcionários nos dados (o recorte fica vazio, nunca maior). Nomes próprios depois
+    de "em/no/na" que não casam com nada vão em 'nao_reconhecidos': o recorte não é calculado sem eles.
+    """
+    texto = normalizar(pergunta)
+    palavras = re.findall(r'\w+', texto)
+    originais = re.findall(r'\w+', pergunta)
+    if len(originais) != len(palavras):
+        originais = palavras
+    por = None
+    for i, palavra in enumerate(palavras[:-1]):
+        if palavra == 'por' and palavras[i + 1] in AGRUPAMENTOS:
+            por = AGRUPAMENTOS[palavras[i + 1]]
+            break
+    if exigir_pista and por is None and PISTAS_DE_RECORTE.isdisjoint(palavras):
+        return None
+
+    variantes = [_variantes(p) for p in palavras]
+    filtro = {}
+    # Palavras da pergunta que casaram com algum valor
+    usadas = set()
+
+    for dimensao in DIMENSOES:
+        if dimensao == 'ELEGIVEL':
+            for i, palavra in enumerate(palavras):
+                if palavra in ELEGIBILIDADE:
+                    negado = i > 0 and palavras[i - 1] == 'nao'
+                    filtro[dimensao] = ['NAO' if negado else ELEGIBILIDADE[palavra]]
+            continue
+
+        if dimensao == 'ESTADO':
+            no_cubo = {normalizar(valor) for valor in cubo.valores(dimensao)}
+            siglas, palavras_estado = _estados(originais, palavras, variantes, no_cubo)
+            if siglas:
+                filtro[dimensao] = siglas
+                usadas |= palavras_estado
+            continue
+
+        nomes = {valor: re.findall(r'\w+', normalizar(valor.split(' - ')[0])) for valor in cubo.valores(dimensao)}
+        completos = [valor for valor, frase in nomes.items() if _contem(variantes, frase)]
+        if completos:
+            usadas.update(p for valor in completos for p in nomes[valor])
+        elif dimensao in DIMENSOES_POR_PREFIXO:
+            completos = [valor for valor, frase in nomes.items() if _contem(variantes, frase[:1])]
+            usadas.update(nomes[valor][0] for valor in completos)
+        if completos:
+            filtro[dimensao] = completos
+
+    nao_reconhecidos = [
+        original for i, original in enumerate(originais)
+        if i > 0 and palavras[i - 1] in PREPOSICOES_DE_LUGAR and original[:1].isupper()
+        and variantes[i].isdisjoint(usadas)
+    ]
+
+    if por is None and not nao_reconhecidos and (not filtro or filtro in FILTROS_COM_RESPONDER):
+        return None
+    return {'filtro': filtro, 'por': por, 'nao_reconhecidos': nao_reconhecidos}
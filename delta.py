@@ -0,0 +1,154 @@
+"""
+🔄 MOVIMENTAÇÃO INCREMENTAL (DELTAS DO DIA)
+Aplica admissões, desligamentos e férias novos às tabelas já carregadas e recalcula o VR
+só das matrículas afetadas, sem recarregar nem recalcular a base inteira. As tabelas tocadas
+(incluindo o VR) são remontadas por inteiro com as linhas novas: custo de cópia O(linhas),
+bem abaixo do cálculo de VR de todos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from regras_vr import calcular_vr_com_regras
+
+
+# Tabela -> colunas que identificam uma linha: uma linha nova com a mesma chave substitui a antiga
+CHAVES = {
+    'admissoes': ['MATRICULA'],
+    'desligamentos': ['MATRICULA'],
+    'ferias': ['MATRICULA', 'INICIO_FERIAS']
+}
+
+
+# ==================== TABELAS ====================
+def _alinhar(df, novas):
+    """novas com as colunas e tipos de df; categorias que faltam são acrescentadas em df (cópia)"""
+    novas = novas.reindex(columns=df.columns)
+    for coluna in df.columns:
+        tipo = df[coluna].dtype
+        if isinstance(tipo, pd.CategoricalDtype):
+            faltando = pd.Index(novas[coluna].dropna().unique()).difference(tipo.categories)
+            if len(faltando):
+                df[coluna] = df[coluna].cat.add_categories(faltando)
+            novas[coluna] = pd.Categorical(novas[coluna], categories=df[coluna].cat.categories)
+        elif pd.api.types.is_integer_dtype(tipo) and len(novas) and novas[coluna].notna().all():
+            # Inteiros compactados (int8/int16...) sobem de tipo se o valor novo não couber
+            valores = novas[coluna].to_numpy(dtype=np.int64)
+            limites = np.iinfo(tipo)
+            if valores.min() < limites.min or valores.max() > limites.max:
+                df[coluna] = df[coluna].astype(np.int64)
+            novas[coluna] = valores.astype(df[coluna].dtype)
+        elif pd.api.types.is_datetime64_any_dtype(tipo):
+            novas[coluna] = pd.to_datetime(novas[coluna]).astype(tipo)
+    return df, novas
+
+
+def _mesma_chave(df, novas, chave):
+    """Máscara das linhas de df cuja chave aparece em novas"""
+    if len(chave) == 1:
+        return df[chave[0]].isin(novas[chave[0]]).to_numpy()
+    return pd.MultiIndex.from_frame(df[chave]).isin(pd.MultiIndex.from_frame(novas[chave]))
+
+
+def mesclar(df, novas, chave):
+    """
+    Tabela com as linhas novas no fim; linhas de df com a mesma chave saem (a última versão vale).
+
+    Tipos, categorias e atributos de df (colunas derivadas da compactação) são preservados.
+    """
+    novas = novas.drop_duplicates(chave, keep='last')
+    manter = df[~_mesma_chave(df, novas, chave)].copy()
+    manter, novas = _alinhar(manter, novas)
+    resultado = pd.concat([manter, novas], ignore_index=True)
+    resultado.attrs = dict(df.attrs)
+    return resultado
+
+
+# ==================== VR ====================
+def parametros_vr(dados):
+    """
+    (sindicatos, dias_uteis) que reproduzem o cálculo de VR já feito, lidos das próprias tabelas.
+
+    Cada sindicato fica com o estado, o valor diário e os dias úteis do mês da primeira linha de VR
+    de um funcionário dele; assim o recálculo parcial segue os mesmos parâmetros da carga.
+    Varre o cadastro e o VR inteiros: quem aplica vários deltas guarda o resultado (as movimentações
+    não mudam o cadastro, e as linhas recalculadas usam esses mesmos parâmetros).
+    """
+    funcionarios = dados['funcionarios']
+    vr = dados['vr'].drop_duplicates('MATRICULA')
+    posicao = pd.Index(vr['MATRICULA']).get_indexer(funcionarios['MATRICULA'])
+    com_vr = posicao >= 0
+
+    linhas = pd.DataFrame({
+        'SINDICATO': funcionarios['SINDICATO'].astype(object).to_numpy()[com_vr],
+        'ESTADO': vr['ESTADO'].astype(object).to_numpy()[posicao[com_vr]],
+        'VALOR_DIARIO': vr['VALOR_DIARIO'].to_numpy()[posicao[com_vr]],
+        'DIAS_UTEIS_MES': vr['DIAS_UTEIS_MES'].to_numpy()[posicao[com_vr]]
+    }).drop_duplicates('SINDICATO')
+
+    sindicatos = {
+        s: {'estado': e, 'valor_diario': float(v)}
+        for s, e, v in zip(linhas['SINDICATO'], linhas['ESTADO'], linhas['VALOR_DIARIO'])
+    }
+    dias_uteis = dict(zip(linhas['SINDICATO'], linhas['DIAS_UTEIS_MES'].astype(int)))
+    return sindicatos, dias_uteis
+
+
+def recalcular_vr(dados, matriculas, competencia, parametros=None):
+    """
+    Linhas de VR das matrículas pedidas, calculadas só com as linhas delas em cada tabela.
+
+    A elegibilidade é reavaliada pelas regras dos sindicatos (um desligamento novo pode cair no corte).
+    parametros: (sindicatos, dias_uteis) de parametros_vr, quando quem chama já os tem.
+    """
+    recorte = {
+        tabela: dados[tabela][dados[tabela]['MATRICULA'].isin(matriculas).to_numpy()]
+        for tabela in ('funcionarios', 'ferias', 'admissoes', 'desligamentos')
+    }
+    sindicatos, dias_uteis = parametros if parametros is not None else parametros_vr(dados)
+    return calcular_vr_com_regras(recorte, competencia, sindicatos=sindicatos, dias_uteis=dias_uteis)
+
+
+# ==================== APLICAÇÃO ====================
+def aplicar_delta(dados, delta, competencia, parametros=None):
+    """
+    Aplica a movimentação ({tabela: linhas novas}) e devolve (novos dados, alterações).
+
+    dados não é alterado: as tabelas mudadas são cópias novas, remontadas inteiras (filtro + concat),
+    e as demais são as mesmas de antes. Só o cálculo de VR se limita às matrículas afetadas.
+    alterações: {'tabelas', 'matriculas', 'vr_removidas', 'vr_novas'} (linhas de VR antes/depois).
+    parametros: ver recalcular_vr.
+    """
+    desconhecidas = set(delta) - set(CHAVES)
+    if desconhecidas:
+        raise ValueError(f"Tabela(s) sem movimentação incremental: {', '.join(sorted(desconhecidas))}")
+
+    novos = dict(dados)
+    tabelas = set()
+    afetadas = []
+    for tabela, linhas in delta.items():
+        if linhas is None or not len(linhas):
+            continue
+        novos[tabela] = mesclar(dados[tabela], linhas, CHAVES[tabela])
+        tabelas.add(tabela)
+        afetadas.append(linhas['MATRICULA'].to_numpy(dtype=np.int64))
+
+    matriculas = np.unique(np.concatenate(afetadas)) if afetadas else np.array([], dtype=np.int64)
+    vr = dados['vr']
+    afetada = vr['MATRICULA'].isin(matriculas).to_numpy()
+    removidas = vr[afetada]
+    vr_novas = recalcular_vr(novos, matriculas, competencia, parametros) if len(matriculas) else removidas.iloc[:0]
+
+    if len(matriculas):
+        manter = vr[~afetada].copy()
+        manter, vr_novas = _alinhar(manter, vr_novas)
+        novos['vr'] = pd.concat([manter, vr_novas], ignore_index=True)
+        novos['vr'].attrs = dict(vr.attrs)
+        tabelas.add('vr')
+
+    return novos, {
+        'tabelas': tabelas,
+        'matriculas': matriculas,
+        'vr_removidas': removidas,
+        'vr_novas': vr_novas
+    }
@@ -0,0 +1,184 @@
+"""
+📥 EXPORTAÇÃO DAS TABELAS
+Grava qualquer tabela (ou um recorte filtrado) em CSV, CSV gzip, Parquet ou XLSX,
+bloco a bloco em um arquivo temporário: a memória fica limitada ao tamanho do bloco.
+"""
+
+import gzip
+import os
+import tempfile
+import weakref
+
+import pandas as pd
+
+from compactacao import materializar
+
+
+# formato -> (extensão, tipo MIME)
+FORMATOS = {
+    'CSV': ('.csv', 'text/csv'),
+    'CSV (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'XLSX': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+TAMANHO_BLOCO = 50_000
+
+# Linhas por planilha no XLSX (limite do Excel, menos o cabeçalho); acima disso abre outra aba
+LINHAS_POR_PLANILHA = 1_048_575
+
+
+# ==================== BLOCOS ====================
+def aplicar_filtro(df, filtro):
+    """Linhas de df cujas colunas estão nos valores pedidos ({coluna: [valores]}; lista vazia = sem filtro)"""
+    if not filtro:
+        return df
+    mascara = None
+    for coluna, valores in filtro.items():
+        if not valores:
+            continue
+        condicao = df[coluna].isin(valores)
+        mascara = condicao if mascara is None else mascara & condicao
+    return df if mascara is None else df[mascara]
+
+
+def blocos(df, filtro=None, tamanho=TAMANHO_BLOCO):
+    """Fatias de até tamanho linhas, já filtradas e com as colunas derivadas de volta"""
+    for inicio in range(0, len(df), tamanho):
+        bloco = aplicar_filtro(df.iloc[inicio:inicio + tamanho], filtro)
+        if len(bloco):
+            yield materializar(bloco)
+
+
+# ==================== ESCRITORES ====================
+def _gravar_csv(arquivo, partes):
+    linhas = 0
+    for i, bloco in enumerate(partes):
+        bloco.to_csv(arquivo, header=i == 0, index=False)
+        linhas += len(bloco)
+    return linhas
+
+
+def _gravar_parquet(caminho, partes):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    linhas = 0
+    try:
+        for bloco in partes:
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema)
+            escritor.write_table(tabela.cast(escritor.schema))
+            linhas += len(bloco)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return linhas
+
+
+def _celula(valor):
+    """Valor aceito pelo openpyxl (Timestamp -> datetime, NaN/NaT -> vazio, numpy -> Python)"""
+    if valor is None or pd.isna(valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def _gravar_xlsx(caminho, partes):
+    from openpyxl import Workbook
+
+    # write_only grava as linhas direto no arquivo temporário do openpyxl, sem montar a planilha em memória
+    livro = Workbook(write_only=True)
+    planilha = None
+    linhas_planilha = 0
+    linhas = 0
+    for bloco in partes:
+        colunas = list(bloco.columns)
+        if planilha is None and bloco.empty:
+            planilha = livro.create_sheet('Dados 1')
+            planilha.append(colunas)
+        for registro in bloco.itertuples(index=False, name=None):
+            if planilha is None or linhas_planilha == LINHAS_POR_PLANILHA:
+                planilha = livro.create_sheet(f'Dados {len(livro.worksheets) + 1}')
+                planilha.append(colunas)
+                linhas_planilha = 0
+            planilha.append([_celula(v) for v in registro])
+            linhas_planilha += 1
+        linhas += len(bloco)
+
+    livro.save(caminho)
+    return linhas
+
+
+def _gravar(formato, caminho, partes):
+    """Grava as partes no caminho conforme o formato; devolve o número de linhas"""
+    if formato == 'CSV':
+        with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+            return _gravar_csv(arquivo, partes)
+    if formato == 'CSV (gzip)':
+        with gzip.open(caminho, 'wt', encoding='utf-8', newline='', compresslevel=6) as arquivo:
+            return _gravar_csv(arquivo, partes)
+    if formato == 'Parquet':
+        return _gravar_parquet(caminho, partes)
+    return _gravar_xlsx(caminho, partes)
+
+
+# ==================== EXPORTAÇÃO ====================
+def exportar(df, formato, filtro=None, pasta=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Grava df (filtrado) no formato pedido em um arquivo temporário.
+
+    Retorna (caminho, linhas). O arquivo é de quem chamou: apague com remover_exportacao() ou entregue a um ArquivoExportado.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+
+    extensao, _ = FORMATOS[formato]
+    descritor, caminho = tempfile.mkstemp(suffix=extensao, prefix='exportacao_', dir=pasta)
+    os.close(descritor)
+
+    try:
+        linhas = _gravar(formato, caminho, blocos(df, filtro, tamanho_bloco))
+
+        # Filtro sem nenhuma linha: ainda assim um arquivo válido, só com o cabeçalho
+        if linhas == 0:
+            _gravar(formato, caminho, iter([materializar(df.iloc[:0])]))
+    except Exception:
+        remover_exportacao(caminho)
+        raise
+
+    return caminho, linhas
+
+
+def remover_exportacao(caminho):
+    """Apaga o arquivo temporário de uma exportação (se ainda existir)"""
+    try:
+        os.remove(caminho)
+    except (FileNotFoundError, TypeError):
+        pass
+
+
+class ArquivoExportado:
+    """
+    Arquivo de exportação de uma sessão (caminho, linhas, nome e tipo MIME para o download).
+
+    O arquivo é apagado com remover() ou, no mais tardar, quando o objeto é coletado (fim da sessão).
+    """
+
+    def __init__(self, caminho, linhas, nome, mime):
+        self.caminho = caminho
+        self.linhas = linhas
+        self.nome = nome
+        self.mime = mime
+        self._remover = weakref.finalize(self, remover_exportacao, caminho)
+
+    @property
+    def existe(self):
+        return self._remover.alive and os.path.exists(self.caminho)
+
+    def remover(self):
+        """Apaga o arquivo agora (chamadas seguintes não fazem nada)"""
+        self._remover()
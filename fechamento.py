@@ -0,0 +1,334 @@
+"""
+🧾 FECHAMENTO MENSAL DO VR (SEM STREAMLIT)
+Recalcula o VR, roda as validações e monta o arquivo da operadora por partição (sindicato ou estado)
+em um pool de processos. As tabelas vão para os processos como arquivos Arrow mapeados em memória
+(em /dev/shm quando existe), sem pickle de DataFrames; as saídas são juntadas na ordem das partições.
+Bases pequenas (ou um único processo útil) fecham em série: subir o pool custaria mais que o ganho.
+
+Uso: python fechamento.py [--pasta bases_do_mes] [--funcionarios 1000000] [--por sindicato|estado]
+                          [--processos 4] [--saida fechamento] [--comparar-serial] [--historico]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from anomalias import encontrar_matriculas, resumir_anomalias
+from app import COMPETENCIA_ATUAL, FUNCIONARIOS_SIMULADOS, PASTA_DADOS, PASTA_HISTORICO, carregar_dados
+from delta import parametros_vr
+from gerador import gerar_dados
+from historico import salvar_competencia
+from ingestao import carregar_pasta
+from regras_vr import calcular_vr_com_regras
+
+
+# Tabelas de entrada do fechamento (o VR é recalculado em cada partição)
+TABELAS = ('funcionarios', 'ferias', 'admissoes', 'desligamentos')
+
+# Partição de quem não tem sindicato no cadastro (admitidos do mês)
+SEM_SINDICATO = '(sem sindicato)'
+
+# Abaixo disso (funcionários no cadastro), a escolha automática fecha em série: com 50 mil,
+# 2 processos ficavam em 0,92x da execução em série
+LINHAS_MINIMAS_PARALELO = 200_000
+
+# Coluna do arquivo da operadora -> coluna calculada
+LAYOUT_OPERADORA = {
+    'Matricula': 'MATRICULA',
+    'Admissão': 'DATA_ADMISSAO',
+    'Sindicato do Colaborador': 'SINDICATO',
+    'Competência': 'COMPETENCIA',
+    'Dias': 'DIAS_UTEIS',
+    'VALOR DIÁRIO VR': 'VALOR_DIARIO',
+    'TOTAL': 'VALOR_TOTAL',
+    'Custo empresa': 'CUSTO_EMPRESA',
+    'Desconto profissional': 'DESCONTO_FUNCIONARIO',
+    'OBS GERAL': 'OBS'
+}
+
+# Formato do CSV da operadora (padrão brasileiro)
+CSV_OPERADORA = {'sep': ';', 'decimal': ',', 'date_format': '%d/%m/%Y', 'index': False}
+
+
+# ==================== PARTIÇÕES ====================
+def _pasta_compartilhada():
+    """Pasta temporária em memória (/dev/shm) quando o sistema tem, senão a padrão"""
+    return tempfile.mkdtemp(prefix='fechamento_', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+
+def _gravar_arrow(df, caminho):
+    """Grava df no formato de arquivo Arrow IPC (lido depois com memory map, sem cópia)"""
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(caminho, 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def _ler_arrow(caminho, inicio=0, fim=None):
+    """Linhas [inicio, fim) de um arquivo Arrow mapeado em memória"""
+    tabela = pa.ipc.open_file(pa.memory_map(caminho)).read_all()
+    fim = tabela.num_rows if fim is None else fim
+    return tabela.slice(inicio, fim - inicio).to_pandas()
+
+
+def particionar(dados, sindicatos, por='sindicato'):
+    """
+    Chave de partição de cada linha (pela matrícula) e as tabelas ordenadas por ela.
+
+    Devolve ([(partição, código)], {tabela: (tabela ordenada, limites)}): as linhas da partição
+    de código i em uma tabela são [limites[i], limites[i + 1]).
+    """
+    funcionarios = dados['funcionarios'].drop_duplicates('MATRICULA')
+    chave = funcionarios['SINDICATO'].astype(object)
+    if por == 'estado':
+        chave = chave.map({s: p['estado'] for s, p in sindicatos.items()})
+    chave = chave.fillna(SEM_SINDICATO).replace('', SEM_SINDICATO)
+    por_matricula = pd.Series(chave.to_numpy(), index=funcionarios['MATRICULA'].to_numpy())
+
+    particoes = sorted(set(por_matricula) | {SEM_SINDICATO})
+    codigo = {p: i for i, p in enumerate(particoes)}
+
+    ordenadas = {}
+    for tabela in TABELAS:
+        df = dados[tabela]
+        chaves = df['MATRICULA'].map(por_matricula).fillna(SEM_SINDICATO).map(codigo).to_numpy(dtype=np.int64)
+        ordem = np.argsort(chaves, kind='stable')
+        limites = np.searchsorted(chaves[ordem], np.arange(len(particoes) + 1))
+        ordenadas[tabela] = (df.iloc[ordem].reset_index(drop=True), limites)
+
+    # Partições sem nenhuma linha (ex.: nenhum admitido sem sindicato) não viram tarefa
+    usadas = [
+        (particao, i) for i, particao in enumerate(particoes)
+        if any(limites[i + 1] > limites[i] for _, limites in ordenadas.values())
+    ]
+    return usadas, ordenadas
+
+
+# ==================== TRABALHO DE UMA PARTIÇÃO ====================
+def layout_operadora(vr, dados):
+    """Linhas do arquivo da operadora: quem tem VR a receber, com admissão, sindicato e observações"""
+    cadastro = pd.concat([
+        dados['funcionarios'][['MATRICULA', 'DATA_ADMISSAO', 'SINDICATO']],
+        dados['admissoes'][['MATRICULA', 'DATA_ADMISSAO']]
+    ], ignore_index=True).drop_duplicates('MATRICULA').set_index('MATRICULA')
+    desligamento = dados['desligamentos'].drop_duplicates('MATRICULA').set_index('MATRICULA')['DATA_DESLIGAMENTO']
+
+    pagos = vr[(vr['VALOR_TOTAL'] > 0).to_numpy()]
+    matriculas = pagos['MATRICULA']
+    data_desligamento = matriculas.map(desligamento)
+    dias_ferias = pagos['DIAS_FERIAS'].to_numpy()
+
+    obs = np.where(dias_ferias > 0, 'Férias: ' + pd.Series(dias_ferias).astype(str).to_numpy() + ' dia(s) útil(eis)', '')
+    desligados = data_desligamento.notna().to_numpy()
+    texto_desligamento = 'Desligado em ' + data_desligamento.dt.strftime('%d/%m/%Y').fillna('').to_numpy(dtype=object)
+    obs = np.where(desligados & (obs != ''), obs + '; ' + texto_desligamento, np.where(desligados, texto_desligamento, obs))
+
+    linhas = pd.DataFrame({
+        'MATRICULA': matriculas.to_numpy(),
+        'DATA_ADMISSAO': matriculas.map(cadastro['DATA_ADMISSAO']).to_numpy(),
+        'SINDICATO': matriculas.map(cadastro['SINDICATO']).fillna('').to_numpy(dtype=object),
+        'COMPETENCIA': pagos['COMPETENCIA'].to_numpy(),
+        'DIAS_UTEIS': pagos['DIAS_UTEIS'].to_numpy(),
+        'VALOR_DIARIO': pagos['VALOR_DIARIO'].to_numpy(),
+        'VALOR_TOTAL': pagos['VALOR_TOTAL'].to_numpy(),
+        'CUSTO_EMPRESA': pagos['CUSTO_EMPRESA'].to_numpy(),
+        'DESCONTO_FUNCIONARIO': pagos['DESCONTO_FUNCIONARIO'].to_numpy(),
+        'OBS': obs
+    })
+    return linhas.rename(columns={coluna: nome for nome, coluna in LAYOUT_OPERADORA.items()})[list(LAYOUT_OPERADORA)]
+
+
+def fechar_particao(tarefa):
+    """
+    Fecha uma partição: lê só as suas linhas dos arquivos Arrow, calcula o VR, valida e grava as partes.
+
+    Roda dentro do processo do pool; recebe e devolve só caminhos, números e as matrículas das validações.
+    """
+    indice, particao, fatias, pasta, competencia, sindicatos, dias_uteis = tarefa
+    etapas = {}
+
+    inicio = time.perf_counter()
+    dados = {tabela: _ler_arrow(caminho, a, b) for tabela, (caminho, a, b) in fatias.items()}
+    etapas['leitura'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    dados['vr'] = calcular_vr_com_regras(dados, competencia, sindicatos=sindicatos, dias_uteis=dias_uteis)
+    etapas['vr'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    validacoes = encontrar_matriculas(dados, competencia)
+    etapas['validacoes'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    caminho_vr = os.path.join(pasta, f'vr_{indice:04d}.arrow')
+    _gravar_arrow(dados['vr'], caminho_vr)
+    caminho_layout = os.path.join(pasta, f'layout_{indice:04d}.csv')
+    layout_operadora(dados['vr'], dados).to_csv(caminho_layout, header=False, **CSV_OPERADORA)
+    etapas['layout'] = time.perf_counter() - inicio
+
+    return {
+        'particao': particao,
+        'funcionarios': len(dados['vr']),
+        'valor_total': float(dados['vr']['VALOR_TOTAL'].sum()),
+        'segundos': sum(etapas.values()),
+        'etapas': etapas,
+        'vr': caminho_vr,
+        'layout': caminho_layout,
+        'validacoes': validacoes
+    }
+
+
+# ==================== FECHAMENTO ====================
+def _juntar(resultados, saida, competencia):
+    """Junta as partes na ordem das partições: VR (Parquet), arquivo da operadora e validações"""
+    os.makedirs(saida, exist_ok=True)
+    arquivos = {
+        'vr': os.path.join(saida, f'vr_{competencia}.parquet'),
+        'layout': os.path.join(saida, f'VR_MENSAL_{competencia}.csv'),
+        'validacoes': os.path.join(saida, f'validacoes_{competencia}.csv')
+    }
+
+    # Via pandas: as partes podem ter categorias diferentes (MOTIVO_INELEGIBILIDADE) ou vir vazias
+    vr = pd.concat([_ler_arrow(r['vr']) for r in resultados], ignore_index=True)
+    vr.to_parquet(arquivos['vr'], index=False)
+
+    with open(arquivos['layout'], 'w', encoding='utf-8', newline='') as destino:
+        destino.write(CSV_OPERADORA['sep'].join(LAYOUT_OPERADORA) + '\n')
+        for r in resultados:
+            with open(r['layout'], encoding='utf-8', newline='') as parte:
+                shutil.copyfileobj(parte, destino)
+
+    encontradas = {}
+    for r in resultados:
+        for tipo, matriculas in r['validacoes'].items():
+            encontradas.setdefault(tipo, []).append(np.asarray(matriculas))
+    anomalias = resumir_anomalias({tipo: np.unique(np.concatenate(m)) for tipo, m in encontradas.items()})
+    pd.DataFrame(anomalias, columns=['Tipo', 'Severidade', 'Descrição', 'Quantidade']).to_csv(
+        arquivos['validacoes'], index=False
+    )
+    return arquivos, anomalias, vr
+
+
+def escolher_processos(linhas, particoes, processos=None):
+    """
+    Processos do pool (0 = em série). None escolhe sozinho: em série abaixo de LINHAS_MINIMAS_PARALELO,
+    senão um por CPU. Nunca mais processos que partições; se sobrar um só, em série.
+    """
+    if processos is None:
+        processos = 0 if linhas < LINHAS_MINIMAS_PARALELO else os.cpu_count() or 1
+    processos = min(processos, particoes)
+    return processos if processos > 1 else 0
+
+
+def fechar_mes(dados, competencia, saida, por='sindicato', processos=None, historico=None):
+    """
+    Fechamento completo: particiona, fecha cada partição (processos=0 roda em série, no próprio processo;
+    None escolhe pelo tamanho, ver escolher_processos) e junta as saídas em saida/.
+    Devolve {'arquivos', 'particoes', 'anomalias', 'processos', 'segundos'}.
+
+    Com historico (pasta), as tabelas e o VR fechado viram o retrato imutável da competência.
+    """
+    inicio = time.perf_counter()
+    sindicatos, dias_uteis = parametros_vr(dados)
+    particoes, ordenadas = particionar(dados, sindicatos, por)
+
+    pasta = _pasta_compartilhada()
+    try:
+        caminhos = {}
+        for tabela, (df, _) in ordenadas.items():
+            caminhos[tabela] = os.path.join(pasta, f'{tabela}.arrow')
+            _gravar_arrow(df, caminhos[tabela])
+
+        tarefas = [
+            (i, particao, {
+                tabela: (caminhos[tabela], int(limites[codigo]), int(limites[codigo + 1]))
+                for tabela, (_, limites) in ordenadas.items()
+            }, pasta, competencia, sindicatos, dias_uteis)
+            for i, (particao, codigo) in enumerate(particoes)
+        ]
+        preparo = time.perf_counter() - inicio
+
+        processos = escolher_processos(len(dados['funcionarios']), len(tarefas), processos)
+        if processos == 0:
+            resultados = [fechar_particao(t) for t in tarefas]
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = list(executor.map(fechar_particao, tarefas))
+
+        arquivos, anomalias, vr = _juntar(resultados, saida, competencia)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    if historico:
+        arquivos['historico'] = salvar_competencia(
+            {**{tabela: dados[tabela] for tabela in TABELAS}, 'vr': vr}, competencia, historico
+        )
+
+    return {
+        'arquivos': arquivos,
+        'particoes': resultados,
+        'anomalias': anomalias,
+        'processos': processos,
+        'preparo': preparo,
+        'segundos': time.perf_counter() - inicio
+    }
+
+
+def relatorio(paralelo, serial=None):
+    """Tempo por partição, total e (se houver) ganho sobre a execução em série"""
+    execucao = f"{paralelo['processos']} processos" if paralelo['processos'] else 'em série'
+    linhas = [f"{'partição':<46} {'funcionários':>12} {'VR (R$)':>16} {'tempo':>9}"]
+    for r in paralelo['particoes']:
+        linhas.append(f"{r['particao'][:46]:<46} {r['funcionarios']:>12,} {r['valor_total']:>16,.2f} {r['segundos']:>7.2f} s")
+    soma = sum(r['segundos'] for r in paralelo['particoes'])
+    linhas.append(f"Preparo (partições e arquivos Arrow): {paralelo['preparo']:.2f} s")
+    linhas.append(f"Soma das partições: {soma:.2f} s · total ({execucao}): {paralelo['segundos']:.2f} s")
+    if serial is not None:
+        linhas.append(f"Total em série: {serial['segundos']:.2f} s · ganho: {serial['segundos'] / paralelo['segundos']:.2f}x")
+    for anomalia in paralelo['anomalias']:
+        linhas.append(f"⚠️ [{anomalia['Severidade']}] {anomalia['Descrição']}")
+    for nome, caminho in paralelo['arquivos'].items():
+        linhas.append(f"📄 {nome}: {caminho}")
+    return '\n'.join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pasta', default=PASTA_DADOS, help='pasta com as bases do mês em .xlsx ou .csv (padrão: dados simulados)')
+    parser.add_argument('--funcionarios', type=int, default=FUNCIONARIOS_SIMULADOS)
+    parser.add_argument('--competencia', default=COMPETENCIA_ATUAL)
+    parser.add_argument('--por', choices=['sindicato', 'estado'], default='sindicato')
+    parser.add_argument('--processos', type=int, default=None,
+                        help=f'0 = em série (padrão: em série abaixo de {LINHAS_MINIMAS_PARALELO:,} funcionários, '
+                             'senão um por CPU)')
+    parser.add_argument('--saida', default='fechamento')
+    parser.add_argument('--comparar-serial', action='store_true', help='roda também em série e mostra o ganho')
+    parser.add_argument('--historico', nargs='?', const=PASTA_HISTORICO, default=None,
+                        help=f'salva a competência fechada no histórico (padrão: {PASTA_HISTORICO})')
+    args = parser.parse_args()
+
+    if args.pasta:
+        dados = carregar_pasta(args.pasta, args.competencia)
+    elif args.funcionarios == FUNCIONARIOS_SIMULADOS and args.competencia == COMPETENCIA_ATUAL:
+        dados = carregar_dados()
+    else:
+        dados = gerar_dados(args.funcionarios, competencia=args.competencia, seed=42)
+
+    serial = None
+    if args.comparar_serial:
+        serial = fechar_mes(dados, args.competencia, args.saida, args.por, processos=0)
+    try:
+        paralelo = fechar_mes(dados, args.competencia, args.saida, args.por, args.processos, args.historico)
+    except FileExistsError as erro:
+        parser.error(f"{erro}: retratos são imutáveis; rode sem --historico para refazer só os arquivos")
+    print(relatorio(paralelo, serial))
+
+
+if __name__ == '__main__':
+    main()
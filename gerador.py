@@ -0,0 +1,261 @@
+"""
+🧪 GERADOR DE DADOS SINTÉTICOS
+Gera as cinco tabelas do agente de forma vetorizada e reprodutível (numpy Generator),
+em blocos que podem ir direto para disco, para testes de carga de qualquer tamanho.
+
+Uso: python gerador.py --funcionarios 10000000 --pasta dados_sinteticos [--formato parquet|csv]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculo_vr import SINDICATOS
+from regras_vr import calcular_vr_com_regras
+
+MATRICULA_INICIAL = 30000
+
+TAMANHO_BLOCO_PADRAO = 1_000_000
+
+CARGOS = [
+    'ANALISTA DE SISTEMAS', 'DESENVOLVEDOR', 'ANALISTA CONTÁBIL',
+    'TECH RECRUITER', 'COORDENADOR', 'GERENTE', 'ASSISTENTE',
+    'ANALISTA DE DADOS', 'ENGENHEIRO DE SOFTWARE', 'PRODUCT OWNER'
+]
+
+# Cargos raros que a maioria dos acordos exclui do VR (regras_vr), e sua fração do quadro
+CARGOS_ESPECIAIS = ['ESTAGIÁRIO', 'APRENDIZ', 'DIRETOR']
+FRACAO_CARGOS_ESPECIAIS = 0.03
+P_CARGOS = [(1 - FRACAO_CARGOS_ESPECIAIS) / len(CARGOS)] * len(CARGOS) + \
+    [FRACAO_CARGOS_ESPECIAIS / len(CARGOS_ESPECIAIS)] * len(CARGOS_ESPECIAIS)
+
+DEPARTAMENTOS = ['TI', 'RH', 'FINANCEIRO', 'OPERAÇÕES']
+
+MOTIVOS = ['Pedido demissão', 'Término contrato', 'Justa causa']
+
+# Proporções das demais situações (a de 'Férias' vem de taxa_ferias)
+SITUACOES = {'Trabalhando': 1600, 'Afastado': 50, 'Licença': 30, 'Home Office': 55, 'Exterior': 10}
+
+# Nome dos arquivos no formato csv, no padrão que ingestao.identificar_arquivos reconhece
+ARQUIVOS_CSV = {
+    'funcionarios': 'ATIVOS.csv',
+    'ferias': 'FERIAS.csv',
+    'admissoes': 'ADMISSOES.csv',
+    'desligamentos': 'DESLIGAMENTOS.csv'
+}
+
+
+# ==================== GERAÇÃO ====================
+def _datas_aleatorias(rng, inicio, fim, n):
+    """n datas uniformes em [inicio, fim)"""
+    inicio = np.datetime64(inicio, 'D')
+    dias = int((np.datetime64(fim, 'D') - inicio).astype(int))
+    return pd.to_datetime(inicio + rng.integers(0, max(dias, 1), n))
+
+
+def _gerar_bloco(rng, primeira_matricula, n, primeira_admissao, competencia, meses_historico,
+                 taxa_ferias, taxa_desligamento, taxa_admissao):
+    """Gera as cinco tabelas para n funcionários com matrículas consecutivas"""
+    fim_mes = (np.datetime64(competencia, 'M') + 1).astype('datetime64[D]')
+    inicio_historico = (np.datetime64(competencia, 'M') - (meses_historico - 1)).astype('datetime64[D]')
+
+    matriculas = np.arange(primeira_matricula, primeira_matricula + n, dtype=np.int64)
+    texto_matriculas = pd.Series(matriculas).astype(str)
+
+    nomes_situacao = ['Férias'] + list(SITUACOES)
+    pesos = np.array(list(SITUACOES.values()), dtype=np.float64)
+    p_situacao = np.concatenate([[taxa_ferias], (1 - taxa_ferias) * pesos / pesos.sum()])
+    situacoes = np.array(nomes_situacao, dtype=object)[rng.choice(len(nomes_situacao), n, p=p_situacao)]
+
+    funcionarios = pd.DataFrame({
+        'MATRICULA': matriculas,
+        'NOME': ('Funcionário ' + texto_matriculas).to_numpy(),
+        'CARGO': rng.choice(CARGOS + CARGOS_ESPECIAIS, n, p=P_CARGOS),
+        'SITUACAO': situacoes,
+        'SINDICATO': rng.choice(list(SINDICATOS), n),
+        'DATA_ADMISSAO': _datas_aleatorias(rng, '2015-01-01', inicio_historico, n),
+        'SALARIO': np.round(rng.uniform(3000, 15000, n), 2),
+        'DEPARTAMENTO': rng.choice(DEPARTAMENTOS, n),
+        'EMAIL': ('func' + texto_matriculas + '@empresa.com').to_numpy()
+    })
+
+    # Férias: quem está com situação 'Férias', com período dentro do histórico
+    em_ferias = matriculas[situacoes == 'Férias']
+    dias_ferias = rng.integers(5, 31, len(em_ferias))
+    inicio_ferias = _datas_aleatorias(rng, inicio_historico, fim_mes, len(em_ferias))
+    ferias = pd.DataFrame({
+        'MATRICULA': em_ferias,
+        'DIAS_FERIAS': dias_ferias,
+        'INICIO_FERIAS': inicio_ferias,
+        'FIM_FERIAS': inicio_ferias + pd.to_timedelta(dias_ferias - 1, unit='D')
+    })
+
+    n_admissoes = round(n * taxa_admissao)
+    admissoes = pd.DataFrame({
+        'MATRICULA': np.arange(primeira_admissao, primeira_admissao + n_admissoes, dtype=np.int64),
+        'DATA_ADMISSAO': np.sort(_datas_aleatorias(rng, inicio_historico, fim_mes, n_admissoes)),
+        'CARGO': rng.choice(CARGOS, n_admissoes),
+        'STATUS': 'Novo'
+    })
+
+    n_desligamentos = round(n * taxa_desligamento)
+    desligamentos = pd.DataFrame({
+        'MATRICULA': rng.choice(matriculas, n_desligamentos, replace=False),
+        'DATA_DESLIGAMENTO': _datas_aleatorias(rng, inicio_historico, fim_mes, n_desligamentos),
+        'MOTIVO': rng.choice(MOTIVOS, n_desligamentos),
+        'COMUNICADO': 'OK'
+    })
+
+    dados = {
+        'funcionarios': funcionarios,
+        'ferias': ferias,
+        'admissoes': admissoes,
+        'desligamentos': desligamentos
+    }
+    dados['vr'] = calcular_vr_com_regras(dados, competencia)
+
+    return dados
+
+
+def gerar_blocos(funcionarios=1816, competencia='2025-01', meses_historico=1, taxa_ferias=0.0446,
+                 taxa_desligamento=0.0286, taxa_admissao=0.0468,
+                 seed=42, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Gera os dados em blocos de até tamanho_bloco funcionários (iterador de dicts com as cinco tabelas).
+
+    Cada bloco tem sua própria semente derivada de seed: o resultado depende só de
+    (parâmetros, seed, tamanho_bloco), nunca da ordem ou de estado global.
+    """
+    n_blocos = max(1, -(-funcionarios // tamanho_bloco))
+    sementes = np.random.SeedSequence(seed).spawn(n_blocos)
+
+    # Admissões numeradas depois do quadro atual, a partir do próximo múltiplo de 5000
+    primeira_admissao = MATRICULA_INICIAL + -(-(funcionarios + 1) // 5000) * 5000
+
+    for i, semente in enumerate(sementes):
+        inicio = i * tamanho_bloco
+        yield _gerar_bloco(
+            np.random.default_rng(semente),
+            MATRICULA_INICIAL + inicio,
+            min(tamanho_bloco, funcionarios - inicio),
+            primeira_admissao + inicio,
+            competencia, meses_historico,
+            taxa_ferias, taxa_desligamento, taxa_admissao
+        )
+
+
+def gerar_dados(funcionarios=1816, **parametros):
+    """Gera os dados inteiros em memória (mesmos parâmetros de gerar_blocos)"""
+    blocos = list(gerar_blocos(funcionarios, **parametros))
+    if len(blocos) == 1:
+        return blocos[0]
+    return {
+        tabela: pd.concat([b[tabela] for b in blocos], ignore_index=True)
+        for tabela in blocos[0]
+    }
+
+
+def gerar_delta(dados, admissoes=20, desligamentos=20, ferias=40, competencia='2025-01', seed=7):
+    """
+    Movimentação de um dia sobre dados já gerados: admissões de matrículas novas,
+    desligamentos e férias de funcionários existentes (no formato de ingestao.normalizar_delta).
+    """
+    rng = np.random.default_rng(seed)
+    inicio_mes = np.datetime64(competencia, 'M').astype('datetime64[D]')
+    fim_mes = (np.datetime64(competencia, 'M') + 1).astype('datetime64[D]')
+    existentes = dados['funcionarios']['MATRICULA'].to_numpy()
+    proxima = int(np.concatenate([existentes, dados['admissoes']['MATRICULA'].to_numpy()]).max()) + 1
+
+    escolhidos = rng.choice(existentes, desligamentos + ferias, replace=False)
+    dias_ferias = rng.integers(5, 31, ferias)
+    inicio_ferias = _datas_aleatorias(rng, inicio_mes, fim_mes, ferias)
+    return {
+        'admissoes': pd.DataFrame({
+            'MATRICULA': np.arange(proxima, proxima + admissoes, dtype=np.int64),
+            'DATA_ADMISSAO': _datas_aleatorias(rng, inicio_mes, fim_mes, admissoes),
+            'CARGO': rng.choice(CARGOS, admissoes),
+            'STATUS': 'Novo'
+        }),
+        'desligamentos': pd.DataFrame({
+            'MATRICULA': escolhidos[:desligamentos],
+            'DATA_DESLIGAMENTO': _datas_aleatorias(rng, inicio_mes, fim_mes, desligamentos),
+            'MOTIVO': rng.choice(MOTIVOS, desligamentos),
+            'COMUNICADO': 'OK'
+        }),
+        'ferias': pd.DataFrame({
+            'MATRICULA': escolhidos[desligamentos:],
+            'DIAS_FERIAS': dias_ferias,
+            'INICIO_FERIAS': inicio_ferias,
+            'FIM_FERIAS': inicio_ferias + pd.to_timedelta(dias_ferias - 1, unit='D')
+        })
+    }
+
+
+# ==================== GRAVAÇÃO EM DISCO ====================
+def gravar_em_disco(pasta, funcionarios, formato='parquet', **parametros):
+    """
+    Grava os blocos em disco conforme são gerados (memória limitada a um bloco).
+
+    parquet: um arquivo por tabela, um row group por bloco.
+    csv: os arquivos mensais que ingestao.carregar_pasta lê (sem a tabela de VR).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    escritores = {}
+    caminhos = {}
+    try:
+        for dados in gerar_blocos(funcionarios, **parametros):
+            for tabela, df in dados.items():
+                if formato == 'csv':
+                    if tabela not in ARQUIVOS_CSV:
+                        continue
+                    caminho = os.path.join(pasta, ARQUIVOS_CSV[tabela])
+                    df.to_csv(caminho, mode='a' if tabela in caminhos else 'w',
+                              header=tabela not in caminhos, index=False, date_format='%Y-%m-%d')
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    caminho = os.path.join(pasta, f'{tabela}.parquet')
+                    tabela_arrow = pa.Table.from_pandas(df, preserve_index=False)
+                    if tabela not in escritores:
+                        escritores[tabela] = pq.ParquetWriter(caminho, tabela_arrow.schema)
+                    escritores[tabela].write_table(tabela_arrow.cast(escritores[tabela].schema))
+                caminhos[tabela] = caminho
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=1816)
+    parser.add_argument('--pasta', default='dados_sinteticos')
+    parser.add_argument('--formato', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--competencia', default='2025-01')
+    parser.add_argument('--meses-historico', type=int, default=1)
+    parser.add_argument('--taxa-ferias', type=float, default=0.0446)
+    parser.add_argument('--taxa-desligamento', type=float, default=0.0286)
+    parser.add_argument('--taxa-admissao', type=float, default=0.0468)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO_PADRAO)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    caminhos = gravar_em_disco(
+        args.pasta, args.funcionarios, args.formato,
+        competencia=args.competencia, meses_historico=args.meses_historico,
+        taxa_ferias=args.taxa_ferias, taxa_desligamento=args.taxa_desligamento,
+        taxa_admissao=args.taxa_admissao, seed=args.seed, tamanho_bloco=args.bloco
+    )
+    print(f"{args.funcionarios:,} funcionários gerados em {time.perf_counter() - inicio:.1f} s")
+    for tabela, caminho in caminhos.items():
+        print(f"  {tabela:<14} {caminho} ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
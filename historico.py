@@ -0,0 +1,312 @@
+"""
+📚 HISTÓRICO DE COMPETÊNCIAS
+Cada competência fechada vira um retrato imutável das tabelas (um Parquet por tabela, ordenado por
+matrícula) e um resumo em JSON. A comparação entre duas competências é um merge das duas tabelas já
+ordenadas, lidas em blocos: só as colunas pedidas e alguns blocos de cada lado ficam em memória.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from calculo_vr import nome_competencia
+
+
+logger = logging.getLogger(__name__)
+
+PASTA_HISTORICO_PADRAO = '.historico'
+
+# Tabelas com uma linha por matrícula (comparáveis); férias ficam ordenadas por matrícula e início
+TABELAS_POR_MATRICULA = ('funcionarios', 'admissoes', 'desligamentos', 'vr')
+
+# Linhas por row group no Parquet e por bloco lido na comparação
+TAMANHO_BLOCO = 100_000
+
+# Colunas comparadas no VR (o motivo acompanha a mudança de elegibilidade)
+COLUNAS_VR = ('ELEGIVEL', 'VALOR_TOTAL', 'MOTIVO_INELEGIBILIDADE')
+
+# Diferença em reais abaixo da qual dois valores são considerados iguais
+TOLERANCIA = 0.005
+
+
+# ==================== RETRATOS ====================
+def _pasta(pasta, competencia):
+    return os.path.join(pasta, competencia)
+
+
+def competencias(pasta=PASTA_HISTORICO_PADRAO):
+    """Competências salvas ('AAAA-MM'), da mais antiga para a mais recente"""
+    if not os.path.isdir(pasta):
+        return []
+    return sorted(
+        nome for nome in os.listdir(pasta)
+        if os.path.exists(os.path.join(pasta, nome, 'resumo.json'))
+    )
+
+
+def resumir_vr(vr):
+    """Totais do VR de uma competência (os mesmos do resumo salvo)"""
+    elegiveis = vr['ELEGIVEL'] == 'SIM'
+    return {
+        'funcionarios': int(vr['MATRICULA'].nunique()),
+        'elegiveis': int(elegiveis.sum()),
+        'valor_total': float(vr['VALOR_TOTAL'].sum()),
+        'custo_empresa': float(vr['CUSTO_EMPRESA'].sum())
+    }
+
+
+def salvar_competencia(dados, competencia, pasta=PASTA_HISTORICO_PADRAO):
+    """
+    Grava o retrato da competência (FileExistsError se ela já foi salva: retratos não são reescritos).
+
+    As tabelas são gravadas numa pasta temporária e renomeadas de uma vez, para que uma gravação
+    interrompida nunca apareça como competência salva.
+    """
+    destino = _pasta(pasta, competencia)
+    if os.path.exists(destino):
+        raise FileExistsError(f"Competência {competencia} já está no histórico ({destino})")
+
+    temporaria = f"{destino}.tmp{os.getpid()}"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    try:
+        atributos = {}
+        for tabela, df in dados.items():
+            if tabela in TABELAS_POR_MATRICULA:
+                df = df.drop_duplicates('MATRICULA', keep='last').sort_values('MATRICULA', kind='stable')
+            else:
+                df = df.sort_values([c for c in ('MATRICULA', 'INICIO_FERIAS') if c in df.columns], kind='stable')
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                os.path.join(temporaria, f'{tabela}.parquet'),
+                row_group_size=TAMANHO_BLOCO
+            )
+            # Colunas derivadas (NOME/EMAIL) não são gravadas: a fórmula vai no resumo
+            atributos[tabela] = dict(dados[tabela].attrs)
+
+        resumo = {
+            'competencia': competencia,
+            'salva_em': datetime.now().isoformat(timespec='seconds'),
+            'linhas': {tabela: len(df) for tabela, df in dados.items()},
+            'vr': resumir_vr(dados['vr']),
+            'atributos': atributos
+        }
+        with open(os.path.join(temporaria, 'resumo.json'), 'w', encoding='utf-8') as arquivo:
+            json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+
+        os.rename(temporaria, destino)
+    except BaseException:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        raise
+
+    logger.info("Competência %s salva no histórico (%s)", competencia, destino)
+    return destino
+
+
+def carregar_resumo(competencia, pasta=PASTA_HISTORICO_PADRAO):
+    with open(os.path.join(_pasta(pasta, competencia), 'resumo.json'), encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def carregar_competencia(competencia, tabela, colunas=None, pasta=PASTA_HISTORICO_PADRAO):
+    """Uma tabela de uma competência salva (só as colunas pedidas), com os atributos da compactação"""
+    df = pd.read_parquet(os.path.join(_pasta(pasta, competencia), f'{tabela}.parquet'), columns=colunas)
+    df.attrs.update(carregar_resumo(competencia, pasta)['atributos'].get(tabela, {}))
+    return df
+
+
+# ==================== COMPARAÇÃO ====================
+def _blocos(origem, tabela, colunas, pasta, tamanho_bloco):
+    """Blocos ordenados por matrícula de uma competência salva ou de uma tabela em memória"""
+    colunas = ['MATRICULA', *colunas]
+    if isinstance(origem, pd.DataFrame):
+        df = origem[colunas].drop_duplicates('MATRICULA', keep='last').sort_values('MATRICULA', kind='stable')
+        for inicio in range(0, len(df), tamanho_bloco):
+            yield df.iloc[inicio:inicio + tamanho_bloco]
+        return
+
+    arquivo = pq.ParquetFile(os.path.join(_pasta(pasta, origem), f'{tabela}.parquet'))
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+        yield lote.to_pandas()
+
+
+def _alinhar(blocos_antes, blocos_depois):
+    """
+    Pares (antes, depois) de blocos que cobrem a mesma faixa de matrículas.
+
+    A cada passo, as matrículas até o fim do bloco que termina primeiro já estão completas dos dois
+    lados; o que passa disso fica pendente para o próximo par.
+    """
+    fontes = [iter(blocos_antes), iter(blocos_depois)]
+    pendentes = [None, None]
+    while True:
+        for lado in (0, 1):
+            while fontes[lado] is not None and (pendentes[lado] is None or pendentes[lado].empty):
+                proximo = next(fontes[lado], None)
+                if proximo is None:
+                    fontes[lado] = None
+                else:
+                    pendentes[lado] = proximo
+
+        if all(p is None or p.empty for p in pendentes):
+            return
+        modelo = next(p for p in pendentes if p is not None)
+        pendentes = [modelo.iloc[:0] if p is None else p for p in pendentes]
+
+        abertos = [p['MATRICULA'].iat[-1] for f, p in zip(fontes, pendentes) if f is not None]
+        par = []
+        for lado, pendente in enumerate(pendentes):
+            corte = len(pendente)
+            if abertos:
+                corte = int(np.searchsorted(pendente['MATRICULA'].to_numpy(), min(abertos), side='right'))
+            par.append(pendente.iloc[:corte])
+            pendentes[lado] = pendente.iloc[corte:]
+        yield par
+
+
+def _diferentes(antes, depois):
+    """Máscara das posições em que os valores mudaram (NaN igual a NaN; reais com tolerância)"""
+    antes, depois = np.asarray(antes), np.asarray(depois)
+    if antes.dtype.kind == 'f' and depois.dtype.kind == 'f':
+        return ~np.isclose(antes, depois, rtol=0, atol=TOLERANCIA, equal_nan=True)
+    return ~((antes == depois) | (pd.isna(antes) & pd.isna(depois)))
+
+
+def _juntar(partes, colunas):
+    """Concatena as partes de cada bloco; colunas category continuam category (categorias unidas)"""
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    juntas = {}
+    for coluna in colunas:
+        valores = [pd.Series(p[coluna]) for p in partes]
+        if all(isinstance(v.dtype, pd.CategoricalDtype) for v in valores):
+            juntas[coluna] = union_categoricals(valores)
+        else:
+            juntas[coluna] = pd.concat(valores, ignore_index=True)
+    return pd.DataFrame(juntas)
+
+
+def comparar(antes, depois, tabela='vr', colunas=COLUNAS_VR, pasta=PASTA_HISTORICO_PADRAO,
+             tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Compara uma tabela entre duas competências por matrícula.
+
+    antes e depois são competências salvas ('AAAA-MM') ou a tabela em memória (competência atual).
+    Devolve {'entraram', 'sairam'} (MATRICULA + colunas) e 'alteracoes' (MATRICULA, COLUNA_ANTES e
+    COLUNA_DEPOIS de cada coluna, só das matrículas em que alguma coluna mudou).
+    """
+    if tabela not in TABELAS_POR_MATRICULA:
+        raise ValueError(f"Tabela '{tabela}' não tem uma linha por matrícula para comparar")
+
+    colunas = list(colunas)
+    entraram, sairam, alteracoes = [], [], []
+    pares = _alinhar(
+        _blocos(antes, tabela, colunas, pasta, tamanho_bloco),
+        _blocos(depois, tabela, colunas, pasta, tamanho_bloco)
+    )
+    for bloco_antes, bloco_depois in pares:
+        chaves_antes = bloco_antes['MATRICULA'].to_numpy(dtype=np.int64)
+        chaves_depois = bloco_depois['MATRICULA'].to_numpy(dtype=np.int64)
+
+        # Merge das duas listas ordenadas: posição de cada matrícula de antes no bloco de depois
+        posicao = np.searchsorted(chaves_depois, chaves_antes)
+        achou = posicao < len(chaves_depois)
+        achou[achou] = chaves_depois[posicao[achou]] == chaves_antes[achou]
+        em_ambos = np.zeros(len(chaves_depois), dtype=bool)
+        em_ambos[posicao[achou]] = True
+
+        sairam.append(bloco_antes[~achou])
+        entraram.append(bloco_depois[~em_ambos])
+
+        comuns_antes = bloco_antes[achou]
+        comuns_depois = bloco_depois.iloc[posicao[achou]]
+        mudou = np.zeros(len(comuns_antes), dtype=bool)
+        valores = {}
+        for coluna in colunas:
+            # .array mantém category como category: o resultado não vira uma coluna de objetos
+            valor_antes = comuns_antes[coluna].array
+            valor_depois = comuns_depois[coluna].array
+            mudou |= _diferentes(valor_antes, valor_depois)
+            valores[coluna] = (valor_antes, valor_depois)
+
+        if mudou.any():
+            parte = {'MATRICULA': chaves_antes[achou][mudou]}
+            for coluna, (valor_antes, valor_depois) in valores.items():
+                parte[f'{coluna}_ANTES'] = valor_antes[mudou]
+                parte[f'{coluna}_DEPOIS'] = valor_depois[mudou]
+            alteracoes.append(pd.DataFrame(parte))
+
+    return {
+        'antes': antes if isinstance(antes, str) else None,
+        'depois': depois if isinstance(depois, str) else None,
+        'entraram': _juntar(entraram, ['MATRICULA', *colunas]),
+        'sairam': _juntar(sairam, ['MATRICULA', *colunas]),
+        'alteracoes': _juntar(
+            alteracoes, ['MATRICULA'] + [f'{c}_{lado}' for c in colunas for lado in ('ANTES', 'DEPOIS')]
+        )
+    }
+
+
+def comparar_vr(antes, depois, pasta=PASTA_HISTORICO_PADRAO, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    comparar() do VR com o que interessa ao RH: 'perderam' e 'ganharam' elegibilidade (entre quem
+    está nas duas competências) e os totais de cada lado ('resumo_antes', 'resumo_depois').
+    """
+    comparacao = comparar(antes, depois, 'vr', COLUNAS_VR, pasta, tamanho_bloco)
+    alteracoes = comparacao['alteracoes']
+    comparacao['perderam'] = alteracoes[
+        (alteracoes['ELEGIVEL_ANTES'] == 'SIM') & (alteracoes['ELEGIVEL_DEPOIS'] == 'NAO')
+    ].reset_index(drop=True)
+    comparacao['ganharam'] = alteracoes[
+        (alteracoes['ELEGIVEL_ANTES'] == 'NAO') & (alteracoes['ELEGIVEL_DEPOIS'] == 'SIM')
+    ].reset_index(drop=True)
+    comparacao['valores'] = alteracoes[
+        _diferentes(alteracoes['VALOR_TOTAL_ANTES'].to_numpy(dtype=float), alteracoes['VALOR_TOTAL_DEPOIS'].to_numpy(dtype=float))
+    ].reset_index(drop=True)
+
+    for lado, origem in (('antes', antes), ('depois', depois)):
+        comparacao[f'resumo_{lado}'] = (
+            carregar_resumo(origem, pasta)['vr'] if isinstance(origem, str) else resumir_vr(origem)
+        )
+    return comparacao
+
+
+# ==================== COMPETÊNCIAS CITADAS ====================
+def resolver_competencias(meses, disponiveis, atual):
+    """
+    (antes, depois) a comparar a partir dos meses citados ([(mês, ano ou None)], na ordem da pergunta).
+
+    Sem ano, o mês é a competência salva mais recente com esse número (ou a do ano da atual).
+    Com um mês só, compara com a competência anterior a ele; sem nenhum, a atual com a anterior.
+    ValueError se alguma das duas não estiver disponível.
+    """
+    disponiveis = sorted(set(disponiveis) | {atual})
+    ano_atual, mes_atual = int(atual[:4]), int(atual[5:7])
+
+    def resolver(mes, ano):
+        if ano:
+            return f'{ano}-{mes:02d}'
+        candidatas = [c for c in disponiveis if int(c[5:7]) == mes and c <= atual]
+        if candidatas:
+            return candidatas[-1]
+        return f'{ano_atual if mes <= mes_atual else ano_atual - 1}-{mes:02d}'
+
+    citadas = [resolver(mes, ano) for mes, ano in meses[:2]]
+    depois = citadas[-1] if citadas else atual
+    antes = citadas[0] if len(citadas) == 2 else next((c for c in reversed(disponiveis) if c < depois), None)
+
+    if antes is None:
+        raise ValueError(f"Não há competência salva antes de {nome_competencia(depois)} para comparar")
+    faltando = [nome_competencia(c) for c in (antes, depois) if c not in disponiveis]
+    if faltando:
+        raise ValueError(f"Competência(s) fora do histórico: {', '.join(faltando)}")
+    return antes, depois
@@ -0,0 +1,89 @@
+"""
+🗂️ ÍNDICES DO AGENTE DE VALE REFEIÇÃO
+Estruturas construídas uma única vez sobre as tabelas de carregar_dados() (e refeitas por inteiro, tabela
+a tabela, nas movimentações)
+"""
+
+import numpy as np
+import pandas as pd
+
+from compactacao import colunas_derivadas, derivar_registro
+
+
+# ==================== ÍNDICE POR MATRÍCULA ====================
+class IndiceMatriculas:
+    """Resolve uma matrícula para seus registros em todas as tabelas em O(1)"""
+
+    TABELAS = ('funcionarios', 'admissoes', 'ferias', 'desligamentos', 'vr')
+
+    # Nome de cada tabela no registro devolvido
+    CHAVES = {
+        'funcionarios': 'funcionario',
+        'admissoes': 'admissao',
+        'ferias': 'ferias',
+        'desligamentos': 'desligamento',
+        'vr': 'vr'
+    }
+
+    def __init__(self, dados):
+        # Tabela -> (índice, linhas indexadas, colunas derivadas, arrays por coluna): trocados juntos
+        self._tabelas = {}
+        self.atualizar(dados, self.TABELAS)
+
+    @staticmethod
+    def _indexar(df):
+        # Mantém só a primeira ocorrência, como o iloc[0] das consultas antigas
+        primeiros = ~df['MATRICULA'].duplicated(keep='first').to_numpy()
+        df = df[primeiros]
+
+        indice = pd.Index(df['MATRICULA'].to_numpy())
+        # Força a construção da tabela hash agora, e não na primeira pergunta
+        indice.is_unique
+
+        return indice, df, colunas_derivadas(df), {col: df[col].array for col in df.columns}
+
+    def atualizar(self, dados, tabelas):
+        """Refaz por inteiro o índice das tabelas pedidas, O(linhas de cada uma); as demais continuam valendo"""
+        for tabela in tabelas:
+            if tabela in self.TABELAS:
+                self._tabelas[tabela] = self._indexar(dados[tabela])
+
+    def __len__(self):
+        return len(self._tabelas['funcionarios'][0])
+
+    def __contains__(self, matricula):
+        return any(matricula in self._tabelas[t][0] for t in self.TABELAS)
+
+    def buscar(self, tabela, matricula):
+        """Retorna o registro (dict) da matrícula na tabela, ou None"""
+        indice, _, derivadas, colunas = self._tabelas[tabela]
+        try:
+            posicao = indice.get_loc(matricula)
+        except KeyError:
+            return None
+
+        registro = {col: valores[posicao] for col, valores in colunas.items()}
+        return derivar_registro(registro, derivadas)
+
+    def registro(self, matricula):
+        """Retorna os registros da matrícula em todas as tabelas"""
+        return {chave: self.buscar(tabela, matricula) for tabela, chave in self.CHAVES.items()}
+
+    def registros(self, matriculas):
+        """Versão em lote de registro(): um hash join (get_indexer) por tabela para todas as matrículas"""
+        matriculas = np.asarray(matriculas, dtype=np.int64)
+        resultado = [dict.fromkeys(self.CHAVES.values()) for _ in range(len(matriculas))]
+
+        for tabela, chave in self.CHAVES.items():
+            indice, df, derivadas, _ = self._tabelas[tabela]
+            posicoes = indice.get_indexer(matriculas)
+            encontradas = np.flatnonzero(posicoes >= 0)
+            parte = df.take(posicoes[encontradas])
+
+            # Coluna a coluna com tolist(): bem mais barato que to_dict('records')
+            colunas = list(parte.columns)
+            valores = zip(*(parte[col].tolist() for col in colunas))
+            for i, linha in zip(encontradas.tolist(), valores):
+                resultado[i][chave] = derivar_registro(dict(zip(colunas, linha)), derivadas)
+
+        return resultado
@@ -0,0 +1,381 @@
+"""
+📥 INGESTÃO DAS BASES MENSAIS
+Lê as planilhas/CSVs do mês, valida e normaliza nas cinco tabelas do agente
+e guarda um cache colunar (Feather) por hash dos arquivos.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from pyarrow import feather
+
+from calculo_vr import SINDICATOS, VALOR_DIARIO_PADRAO
+from regras_vr import calcular_vr_com_regras
+
+logger = logging.getLogger(__name__)
+
+# Muda quando a normalização muda, para não reaproveitar caches antigos
+VERSAO_ESQUEMA = 2
+
+PASTA_CACHE_PADRAO = '.cache_dados'
+
+# Só formatos que as dependências leem (.xls exigiria o xlrd)
+EXTENSOES = ('.xlsx', '.csv')
+
+TABELAS = ('funcionarios', 'ferias', 'admissoes', 'desligamentos', 'vr')
+
+# ==================== IDENTIFICAÇÃO DOS ARQUIVOS ====================
+# Base -> palavras que precisam aparecer no nome do arquivo (sem acento, minúsculo)
+BASES = {
+    'ativos': ['ativo'],
+    'ferias': ['ferias'],
+    'admissoes': ['admiss'],
+    'desligamentos': ['deslig'],
+    'sindicato_valor': ['sindicato', 'valor'],
+    'dias_uteis': ['dias', 'uteis']
+}
+
+OBRIGATORIAS = ('ativos',)
+
+# Nome normalizado da coluna no arquivo -> nome no esquema do agente
+SINONIMOS = {
+    'MATRICULA': 'MATRICULA',
+    'MAT': 'MATRICULA',
+    'NOME': 'NOME',
+    'EMAIL': 'EMAIL',
+    'E_MAIL': 'EMAIL',
+    'CARGO': 'CARGO',
+    'TITULO_DO_CARGO': 'CARGO',
+    'SITUACAO': 'SITUACAO',
+    'DESC_SITUACAO': 'SITUACAO',
+    'SINDICATO': 'SINDICATO',
+    'SINDICADO': 'SINDICATO',
+    'DEPARTAMENTO': 'DEPARTAMENTO',
+    'SALARIO': 'SALARIO',
+    'ADMISSAO': 'DATA_ADMISSAO',
+    'DATA_ADMISSAO': 'DATA_ADMISSAO',
+    'DIAS_DE_FERIAS': 'DIAS_FERIAS',
+    'DIAS_FERIAS': 'DIAS_FERIAS',
+    'INICIO_FERIAS': 'INICIO_FERIAS',
+    'FIM_FERIAS': 'FIM_FERIAS',
+    'DATA_DEMISSAO': 'DATA_DESLIGAMENTO',
+    'DATA_DESLIGAMENTO': 'DATA_DESLIGAMENTO',
+    'MOTIVO': 'MOTIVO',
+    'COMUNICADO_DE_DESLIGAMENTO': 'COMUNICADO',
+    'COMUNICADO': 'COMUNICADO',
+    'ESTADO': 'ESTADO',
+    'UF': 'ESTADO',
+    'VALOR': 'VALOR_DIARIO',
+    'VALOR_DIARIO': 'VALOR_DIARIO',
+    'DIAS_UTEIS': 'DIAS_UTEIS'
+}
+
+COLUNAS_OBRIGATORIAS = {
+    'ativos': ['MATRICULA', 'SINDICATO'],
+    'ferias': ['MATRICULA'],
+    'admissoes': ['MATRICULA', 'DATA_ADMISSAO'],
+    'desligamentos': ['MATRICULA', 'DATA_DESLIGAMENTO'],
+    'sindicato_valor': ['VALOR_DIARIO'],
+    'dias_uteis': ['SINDICATO', 'DIAS_UTEIS']
+}
+
+UFS = {
+    'ACRE': 'AC', 'ALAGOAS': 'AL', 'AMAPA': 'AP', 'AMAZONAS': 'AM', 'BAHIA': 'BA',
+    'CEARA': 'CE', 'DISTRITO FEDERAL': 'DF', 'ESPIRITO SANTO': 'ES', 'GOIAS': 'GO',
+    'MARANHAO': 'MA', 'MATO GROSSO': 'MT', 'MATO GROSSO DO SUL': 'MS', 'MINAS GERAIS': 'MG',
+    'PARA': 'PA', 'PARAIBA': 'PB', 'PARANA': 'PR', 'PERNAMBUCO': 'PE', 'PIAUI': 'PI',
+    'RIO DE JANEIRO': 'RJ', 'RIO GRANDE DO NORTE': 'RN', 'RIO GRANDE DO SUL': 'RS',
+    'RONDONIA': 'RO', 'RORAIMA': 'RR', 'SANTA CATARINA': 'SC', 'SAO PAULO': 'SP',
+    'SERGIPE': 'SE', 'TOCANTINS': 'TO'
+}
+_UF_NO_NOME = re.compile(r'\b(' + '|'.join(sorted(set(UFS.values()))) + r')\b')
+
+
+def _sem_acento(texto):
+    return unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+
+
+def identificar_arquivos(pasta, obrigatorias=OBRIGATORIAS):
+    """Mapeia cada base para o arquivo da pasta cujo nome a identifica"""
+    arquivos = {}
+    for nome in sorted(os.listdir(pasta)):
+        if not nome.lower().endswith(EXTENSOES) or nome.startswith('~$'):
+            continue
+        nome_normalizado = _sem_acento(nome).lower()
+        for base, palavras in BASES.items():
+            if base not in arquivos and all(p in nome_normalizado for p in palavras):
+                arquivos[base] = os.path.join(pasta, nome)
+                break
+
+    faltando = [b for b in obrigatorias if b not in arquivos]
+    if faltando:
+        raise ValueError(
+            f"Base(s) obrigatória(s) não encontrada(s) em {pasta}: {', '.join(faltando)} "
+            f"(formatos aceitos: {', '.join(EXTENSOES)})"
+        )
+
+    return arquivos
+
+
+def hash_arquivos(arquivos, competencia):
+    """Hash do conteúdo dos arquivos + competência + versão do esquema (chave do cache)"""
+    h = hashlib.sha256(f'{VERSAO_ESQUEMA}|{competencia}'.encode())
+    for base in sorted(arquivos):
+        h.update(base.encode())
+        with open(arquivos[base], 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+    return h.hexdigest()[:20]
+
+
+# ==================== LEITURA E NORMALIZAÇÃO ====================
+def ler_arquivo(caminho):
+    """Lê CSV (separador detectado) ou Excel e normaliza os nomes das colunas"""
+    if caminho.lower().endswith('.csv'):
+        df = pd.read_csv(caminho, sep=None, engine='python', encoding='utf-8-sig')
+    else:
+        try:
+            df = pd.read_excel(caminho)
+        except ImportError as e:
+            raise ImportError("Leitura de Excel requer openpyxl (pip install openpyxl)") from e
+
+    return padronizar_colunas(df)
+
+
+def padronizar_colunas(df):
+    """Renomeia as colunas para o esquema do agente (sem acento, maiúsculas, sinônimos)"""
+    colunas = {}
+    for coluna in df.columns:
+        chave = re.sub(r'[^A-Z0-9]+', '_', _sem_acento(coluna).upper()).strip('_')
+        colunas[coluna] = SINONIMOS.get(chave, chave)
+    df = df.rename(columns=colunas)
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def _validar(df, base):
+    """Confere colunas obrigatórias e descarta linhas sem matrícula válida"""
+    faltando = [c for c in COLUNAS_OBRIGATORIAS[base] if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Base '{base}' sem a(s) coluna(s) obrigatória(s): {', '.join(faltando)}")
+
+    if 'MATRICULA' not in df.columns:
+        return df
+
+    matriculas = pd.to_numeric(df['MATRICULA'], errors='coerce')
+    invalidas = matriculas.isna()
+    if invalidas.any():
+        logger.warning("Base '%s': %d linha(s) sem matrícula válida descartada(s)", base, int(invalidas.sum()))
+    df = df[~invalidas].copy()
+    df['MATRICULA'] = matriculas[~invalidas].astype(np.int64)
+    return df
+
+
+def _datas(serie):
+    return pd.to_datetime(serie, errors='coerce', dayfirst=True, format='mixed')
+
+
+def _texto(df, coluna, padrao):
+    if coluna not in df.columns:
+        return pd.Series(padrao, index=df.index, dtype=object)
+    return df[coluna].fillna(padrao).astype(str).str.strip()
+
+
+def uf_do_sindicato(nome):
+    """UF citada no nome do sindicato ('SINDPD SP - ...' -> 'SP'), ou ''"""
+    achado = _UF_NO_NOME.search(_sem_acento(nome).upper())
+    return achado.group(1) if achado else ''
+
+
+def normalizar_ferias(ferias, inicio_mes):
+    """Períodos de férias (MATRICULA, DIAS_FERIAS, INICIO_FERIAS, FIM_FERIAS)"""
+    ferias = _validar(ferias, 'ferias')
+    dias_ferias = pd.to_numeric(ferias.get('DIAS_FERIAS'), errors='coerce') if 'DIAS_FERIAS' in ferias else None
+    inicio_ferias = _datas(ferias['INICIO_FERIAS']) if 'INICIO_FERIAS' in ferias else pd.Series(inicio_mes, index=ferias.index)
+    if 'FIM_FERIAS' in ferias:
+        fim_ferias = _datas(ferias['FIM_FERIAS'])
+    else:
+        # Só a quantidade de dias: período corrido a partir do início
+        fim_ferias = inicio_ferias + pd.to_timedelta(dias_ferias.fillna(1) - 1, unit='D')
+    if dias_ferias is None:
+        dias_ferias = (fim_ferias - inicio_ferias).dt.days + 1
+    return pd.DataFrame({
+        'MATRICULA': ferias['MATRICULA'],
+        'DIAS_FERIAS': dias_ferias.fillna(0).astype(np.int64),
+        'INICIO_FERIAS': inicio_ferias,
+        'FIM_FERIAS': fim_ferias
+    }).dropna(subset=['INICIO_FERIAS', 'FIM_FERIAS']).reset_index(drop=True)
+
+
+def normalizar_admissoes(admissoes):
+    """Admissões (MATRICULA, DATA_ADMISSAO, CARGO, STATUS)"""
+    admissoes = _validar(admissoes, 'admissoes')
+    return pd.DataFrame({
+        'MATRICULA': admissoes['MATRICULA'],
+        'DATA_ADMISSAO': _datas(admissoes['DATA_ADMISSAO']),
+        'CARGO': _texto(admissoes, 'CARGO', 'NÃO INFORMADO'),
+        'STATUS': 'Novo'
+    }).dropna(subset=['DATA_ADMISSAO']).reset_index(drop=True)
+
+
+def normalizar_desligamentos(desligamentos):
+    """Desligamentos (MATRICULA, DATA_DESLIGAMENTO, MOTIVO, COMUNICADO)"""
+    desligamentos = _validar(desligamentos, 'desligamentos')
+    return pd.DataFrame({
+        'MATRICULA': desligamentos['MATRICULA'],
+        'DATA_DESLIGAMENTO': _datas(desligamentos['DATA_DESLIGAMENTO']),
+        'MOTIVO': _texto(desligamentos, 'MOTIVO', 'Não informado'),
+        'COMUNICADO': _texto(desligamentos, 'COMUNICADO', 'OK')
+    }).dropna(subset=['DATA_DESLIGAMENTO']).reset_index(drop=True)
+
+
+def normalizar_bases(bases, competencia):
+    """Converte as bases lidas nas cinco tabelas do agente"""
+    inicio_mes = pd.Timestamp(competencia)
+
+    ativos = _validar(bases['ativos'], 'ativos')
+    funcionarios = pd.DataFrame({
+        'MATRICULA': ativos['MATRICULA'],
+        'NOME': _texto(ativos, 'NOME', '') if 'NOME' in ativos else 'Funcionário ' + ativos['MATRICULA'].astype(str),
+        'CARGO': _texto(ativos, 'CARGO', 'NÃO INFORMADO'),
+        'SITUACAO': _texto(ativos, 'SITUACAO', 'Trabalhando').str.title(),
+        'SINDICATO': _texto(ativos, 'SINDICATO', ''),
+        'DATA_ADMISSAO': _datas(ativos['DATA_ADMISSAO']) if 'DATA_ADMISSAO' in ativos else pd.NaT,
+        'SALARIO': pd.to_numeric(ativos['SALARIO'], errors='coerce') if 'SALARIO' in ativos else np.nan,
+        'DEPARTAMENTO': _texto(ativos, 'DEPARTAMENTO', 'NÃO INFORMADO'),
+        'EMAIL': _texto(ativos, 'EMAIL', '') if 'EMAIL' in ativos else 'func' + ativos['MATRICULA'].astype(str) + '@empresa.com'
+    }).reset_index(drop=True)
+    # Sem data de admissão, a pessoa conta como admitida antes da competência
+    funcionarios['DATA_ADMISSAO'] = funcionarios['DATA_ADMISSAO'].fillna(inicio_mes - pd.Timedelta(days=1))
+
+    ferias = normalizar_ferias(bases.get('ferias', pd.DataFrame(columns=['MATRICULA'])), inicio_mes)
+    admissoes = normalizar_admissoes(bases.get('admissoes', pd.DataFrame(columns=['MATRICULA', 'DATA_ADMISSAO'])))
+    desligamentos = normalizar_desligamentos(
+        bases.get('desligamentos', pd.DataFrame(columns=['MATRICULA', 'DATA_DESLIGAMENTO']))
+    )
+
+    dados = {
+        'funcionarios': funcionarios,
+        'ferias': ferias,
+        'admissoes': admissoes,
+        'desligamentos': desligamentos
+    }
+    dados['vr'] = calcular_vr_com_regras(
+        dados, competencia,
+        sindicatos=montar_sindicatos(funcionarios['SINDICATO'].unique(), bases.get('sindicato_valor')),
+        dias_uteis=montar_dias_uteis(bases.get('dias_uteis'))
+    )
+    return dados
+
+
+def montar_sindicatos(nomes, sindicato_valor):
+    """Parâmetros de cada sindicato (estado e valor diário) para calcular_vr"""
+    valores = {}
+    if sindicato_valor is not None:
+        tabela = _validar(sindicato_valor, 'sindicato_valor').dropna(subset=['VALOR_DIARIO'])
+        chave = 'SINDICATO' if 'SINDICATO' in tabela else 'ESTADO'
+        for nome, valor in zip(tabela[chave], pd.to_numeric(tabela['VALOR_DIARIO'], errors='coerce')):
+            nome = _sem_acento(nome).strip().upper()
+            valores[UFS.get(nome, nome)] = float(valor)
+
+    sindicatos = {}
+    for nome in nomes:
+        uf = SINDICATOS[nome]['estado'] if nome in SINDICATOS else uf_do_sindicato(nome)
+        valor = valores.get(_sem_acento(nome).strip().upper(), valores.get(uf))
+        if valor is None:
+            valor = SINDICATOS.get(nome, {}).get('valor_diario', VALOR_DIARIO_PADRAO)
+            logger.warning("Sindicato sem valor diário na base, usando R$ %.2f: %s", valor, nome)
+        sindicatos[nome] = {'estado': uf, 'valor_diario': valor}
+    return sindicatos
+
+
+def montar_dias_uteis(dias_uteis):
+    """Dias úteis oficiais por sindicato (ou None se a base não veio)"""
+    if dias_uteis is None:
+        return None
+    tabela = _validar(dias_uteis, 'dias_uteis')
+    dias = pd.to_numeric(tabela['DIAS_UTEIS'], errors='coerce')
+    validos = dias.notna()
+    return dict(zip(tabela['SINDICATO'][validos].astype(str).str.strip(), dias[validos].astype(int)))
+
+
+# ==================== CACHE COLUNAR ====================
+def _salvar_cache(dados, pasta):
+    os.makedirs(pasta, exist_ok=True)
+    for tabela, df in dados.items():
+        # Feather sem compressão: na leitura as colunas são mapeadas direto do disco
+        temporario = os.path.join(pasta, f'{tabela}.feather.tmp')
+        df.reset_index(drop=True).to_feather(temporario, compression='uncompressed')
+        os.replace(temporario, os.path.join(pasta, f'{tabela}.feather'))
+
+
+def _ler_cache(pasta):
+    caminhos = {t: os.path.join(pasta, f'{t}.feather') for t in TABELAS}
+    if not all(os.path.exists(c) for c in caminhos.values()):
+        return None
+    # split_blocks evita consolidar colunas numéricas: elas ficam apontando para o mapa do arquivo
+    return {
+        t: feather.read_table(c, memory_map=True).to_pandas(split_blocks=True)
+        for t, c in caminhos.items()
+    }
+
+
+def carregar_pasta(pasta, competencia, pasta_cache=PASTA_CACHE_PADRAO):
+    """
+    Carrega as bases do mês de uma pasta nas cinco tabelas do agente.
+
+    A primeira carga lê e normaliza os arquivos e grava o cache; as seguintes,
+    com os mesmos arquivos, só mapeiam o cache Feather.
+    """
+    inicio = time.perf_counter()
+    arquivos = identificar_arquivos(pasta)
+    chave = hash_arquivos(arquivos, competencia)
+    pasta_chave = os.path.join(pasta_cache, chave)
+
+    dados = _ler_cache(pasta_chave)
+    if dados is not None:
+        logger.info("Carga a quente (cache %s): %.3f s", chave, time.perf_counter() - inicio)
+        return dados
+
+    bases = {base: ler_arquivo(caminho) for base, caminho in arquivos.items()}
+    leitura = time.perf_counter() - inicio
+    dados = normalizar_bases(bases, competencia)
+    _salvar_cache(dados, pasta_chave)
+    logger.info(
+        "Carga a frio (cache %s): %.3f s (leitura %.3f s, %d funcionários)",
+        chave, time.perf_counter() - inicio, leitura, len(dados['funcionarios'])
+    )
+    return dados
+
+
+# ==================== MOVIMENTAÇÃO DO DIA ====================
+# Bases aceitas em uma movimentação (delta) -> tabela do agente
+BASES_DELTA = ('ferias', 'admissoes', 'desligamentos')
+
+
+def normalizar_delta(bases, competencia):
+    """Normaliza só as bases de movimentação presentes (colunas com os mesmos sinônimos dos arquivos mensais)"""
+    inicio_mes = pd.Timestamp(competencia)
+    normalizadores = {
+        'ferias': lambda df: normalizar_ferias(df, inicio_mes),
+        'admissoes': normalizar_admissoes,
+        'desligamentos': normalizar_desligamentos
+    }
+    return {
+        base: normalizadores[base](padronizar_colunas(df))
+        for base, df in bases.items() if base in BASES_DELTA
+    }
+
+
+def carregar_delta(pasta, competencia):
+    """Lê os arquivos de movimentação de uma pasta (admissões, desligamentos e/ou férias do dia)"""
+    arquivos = identificar_arquivos(pasta, obrigatorias=())
+    bases = {base: ler_arquivo(caminho) for base, caminho in arquivos.items() if base in BASES_DELTA}
+    if not bases:
+        raise ValueError(f"Nenhum arquivo de admissões, desligamentos ou férias em {pasta}")
+    return normalizar_delta(bases, competencia)
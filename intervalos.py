@@ -0,0 +1,100 @@
+"""
+📅 ÍNDICE DE INTERVALOS DE DATAS
+Férias, admissões e desligamentos ordenados por data: consultas de ponto e de sobreposição
+de períodos por busca binária (np.searchsorted), sem varrer a tabela.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Intervalos até essa duração ficam na estrutura ordenada; os mais longos (raros) são verificados à parte
+DURACAO_CURTA = np.timedelta64(62, 'D')
+
+
+def _dias(serie):
+    """Coluna de datas como datetime64[D] (NaT preservado)"""
+    return pd.to_datetime(serie).to_numpy().astype('datetime64[D]')
+
+
+class IndiceIntervalos:
+    """
+    Intervalos fechados [inicio, fim] de uma tabela; as consultas devolvem posições (iloc) ordenadas.
+
+    Sobreposição com [a, b]: todo intervalo curto que toca o período começa em [a - DURACAO_CURTA, b],
+    uma fatia contígua da ordem por início; os longos são poucos e filtrados diretamente.
+    """
+
+    def __init__(self, inicio, fim=None, duracao_curta=DURACAO_CURTA):
+        inicio = _dias(inicio)
+        fim = inicio if fim is None else _dias(fim)
+        validos = ~(np.isnat(inicio) | np.isnat(fim))
+        posicoes = np.flatnonzero(validos)
+        inicio, fim = inicio[validos], fim[validos]
+
+        self.linhas = len(validos)
+        self.duracao_curta = duracao_curta
+
+        ordem = np.argsort(inicio, kind='stable')
+        self._posicoes_inicio = posicoes[ordem]
+        self._inicio = inicio[ordem]
+
+        ordem = np.argsort(fim, kind='stable')
+        self._posicoes_fim = posicoes[ordem]
+        self._fim = fim[ordem]
+
+        curtos = (fim - inicio) <= duracao_curta
+        ordem = np.argsort(inicio[curtos], kind='stable')
+        self._curtos_posicoes = posicoes[curtos][ordem]
+        self._curtos_inicio = inicio[curtos][ordem]
+        self._curtos_fim = fim[curtos][ordem]
+
+        self._longos_posicoes = posicoes[~curtos]
+        self._longos_inicio = inicio[~curtos]
+        self._longos_fim = fim[~curtos]
+
+    def __len__(self):
+        return len(self._inicio)
+
+    @staticmethod
+    def _periodo(a, b):
+        a = np.datetime64(a, 'D')
+        return a, a if b is None else np.datetime64(b, 'D')
+
+    def sobrepostos(self, a, b=None):
+        """Intervalos que tocam o período [a, b] (ou o dia a)"""
+        a, b = self._periodo(a, b)
+        lo = np.searchsorted(self._curtos_inicio, a - self.duracao_curta, 'left')
+        hi = np.searchsorted(self._curtos_inicio, b, 'right')
+        candidatos = slice(lo, hi)
+        encontrados = self._curtos_posicoes[candidatos][self._curtos_fim[candidatos] >= a]
+
+        if len(self._longos_posicoes):
+            longos = (self._longos_inicio <= b) & (self._longos_fim >= a)
+            encontrados = np.concatenate([encontrados, self._longos_posicoes[longos]])
+        return np.sort(encontrados)
+
+    def contendo(self, dia):
+        """Intervalos que contêm o dia"""
+        return self.sobrepostos(dia, dia)
+
+    def comecando(self, a, b=None):
+        """Intervalos que começam no período"""
+        a, b = self._periodo(a, b)
+        fatia = slice(np.searchsorted(self._inicio, a, 'left'), np.searchsorted(self._inicio, b, 'right'))
+        return np.sort(self._posicoes_inicio[fatia])
+
+    def terminando(self, a, b=None):
+        """Intervalos que terminam no período"""
+        a, b = self._periodo(a, b)
+        fatia = slice(np.searchsorted(self._fim, a, 'left'), np.searchsorted(self._fim, b, 'right'))
+        return np.sort(self._posicoes_fim[fatia])
+
+
+def indices_de_datas(dados):
+    """Um IndiceIntervalos por tabela com datas: férias (período), admissões e desligamentos (dia)"""
+    return {
+        'ferias': IndiceIntervalos(dados['ferias']['INICIO_FERIAS'], dados['ferias']['FIM_FERIAS']),
+        'admissoes': IndiceIntervalos(dados['admissoes']['DATA_ADMISSAO']),
+        'desligamentos': IndiceIntervalos(dados['desligamentos']['DATA_DESLIGAMENTO'])
+    }
@@ -0,0 +1,172 @@
+"""
+📈 MÉTRICAS DO AGENTE
+Contadores e histogramas de latência dos caminhos quentes, com exportação em texto Prometheus e JSON
+"""
+
+import bisect
+import functools
+import json
+import threading
+import time
+
+
+# Limites superiores (ms) dos baldes do histograma de latência
+LIMITES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Intenção do roteador que significa "pergunta não reconhecida"
+INTENCAO_SEM_RESPOSTA = 'padrao'
+
+
+# ==================== HISTOGRAMA ====================
+class Histograma:
+    """Histograma de baldes fixos: registrar custa um bisect e três somas"""
+
+    def __init__(self, limites_ms=LIMITES_MS):
+        self.limites_ms = limites_ms
+        self.contagens = [0] * (len(limites_ms) + 1)
+        self.total = 0
+        self.soma_ms = 0.0
+
+    def registrar(self, ms):
+        self.contagens[bisect.bisect_left(self.limites_ms, ms)] += 1
+        self.total += 1
+        self.soma_ms += ms
+
+    def quantil(self, q):
+        """Quantil estimado por interpolação linear dentro do balde (como o histogram_quantile do Prometheus)"""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inicio = self.limites_ms[i - 1] if i > 0 else 0.0
+                if i == len(self.limites_ms):
+                    return inicio
+                return inicio + (self.limites_ms[i] - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites_ms[-1]
+
+    def resumo(self):
+        return {
+            'chamadas': self.total,
+            'media_ms': self.soma_ms / self.total if self.total else 0.0,
+            'p50_ms': self.quantil(0.5),
+            'p95_ms': self.quantil(0.95),
+            'p99_ms': self.quantil(0.99)
+        }
+
+
+# ==================== MÉTRICAS ====================
+class MetricasAgente:
+    """Métricas do processo (thread-safe): perguntas por intenção e latência por operação"""
+
+    def __init__(self, limites_ms=LIMITES_MS):
+        self.limites_ms = limites_ms
+        self._lock = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self.inicio = time.time()
+        self.por_intencao = {}
+        self.latencias = {}
+
+    def limpar(self):
+        """Zera contadores e histogramas"""
+        with self._lock:
+            self._limpar()
+
+    def registrar(self, operacao, segundos):
+        """Registra a duração de uma chamada de operacao"""
+        with self._lock:
+            histograma = self.latencias.get(operacao)
+            if histograma is None:
+                histograma = self.latencias[operacao] = Histograma(self.limites_ms)
+            histograma.registrar(segundos * 1e3)
+
+    def registrar_pergunta(self, intencao, segundos=None, quantidade=1):
+        """Conta perguntas roteadas para intencao; segundos é a latência total de processar_pergunta"""
+        with self._lock:
+            self.por_intencao[intencao] = self.por_intencao.get(intencao, 0) + quantidade
+        if segundos is not None:
+            self.registrar('processar_pergunta', segundos)
+
+    def resumo(self, cache=None):
+        """Foto das métricas; cache são as estatísticas de CacheRespostas (opcional)"""
+        with self._lock:
+            por_intencao = dict(self.por_intencao)
+            latencias = {operacao: h.resumo() for operacao, h in self.latencias.items()}
+            inicio = self.inicio
+
+        total = sum(por_intencao.values())
+        return {
+            'desde': inicio,
+            'perguntas': total,
+            'por_intencao': por_intencao,
+            'taxa_sem_resposta': por_intencao.get(INTENCAO_SEM_RESPOSTA, 0) / total if total else 0.0,
+            'latencias': latencias,
+            'cache': cache or {}
+        }
+
+    # ==================== EXPORTAÇÃO ====================
+    def exportar_json(self, cache=None):
+        """Métricas em JSON"""
+        return json.dumps(self.resumo(cache), ensure_ascii=False, indent=2)
+
+    def exportar_prometheus(self, cache=None, prefixo='agente_vr'):
+        """Métricas no formato texto de exposição do Prometheus"""
+        with self._lock:
+            por_intencao = dict(self.por_intencao)
+            histogramas = {
+                operacao: (list(h.contagens), h.total, h.soma_ms)
+                for operacao, h in self.latencias.items()
+            }
+
+        linhas = [
+            f'# HELP {prefixo}_perguntas_total Perguntas processadas por intenção.',
+            f'# TYPE {prefixo}_perguntas_total counter'
+        ]
+        for intencao, quantidade in sorted(por_intencao.items()):
+            linhas.append(f'{prefixo}_perguntas_total{{intencao="{intencao}"}} {quantidade}')
+
+        linhas += [
+            f'# HELP {prefixo}_latencia_segundos Latência por operação do agente.',
+            f'# TYPE {prefixo}_latencia_segundos histogram'
+        ]
+        for operacao, (contagens, total, soma_ms) in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.limites_ms, contagens):
+                acumulado += contagem
+                linhas.append(
+                    f'{prefixo}_latencia_segundos_bucket{{operacao="{operacao}",le="{limite / 1e3:g}"}} {acumulado}'
+                )
+            linhas.append(f'{prefixo}_latencia_segundos_bucket{{operacao="{operacao}",le="+Inf"}} {total}')
+            linhas.append(f'{prefixo}_latencia_segundos_sum{{operacao="{operacao}"}} {soma_ms / 1e3:.6f}')
+            linhas.append(f'{prefixo}_latencia_segundos_count{{operacao="{operacao}"}} {total}')
+
+        for chave, tipo in [('acertos', 'counter'), ('falhas', 'counter'), ('remocoes', 'counter'),
+                            ('invalidacoes', 'counter'), ('itens', 'gauge')]:
+            if cache and chave in cache:
+                nome = f'{prefixo}_cache_{chave}' + ('_total' if tipo == 'counter' else '')
+                linhas.append(f'# TYPE {nome} {tipo}')
+                linhas.append(f'{nome} {cache[chave]}')
+
+        return '\n'.join(linhas) + '\n'
+
+
+def medir_tempo(operacao):
+    """
+    Decorador para métodos do agente: registra a duração de cada chamada em self.metricas.
+
+    Aplicado por fora do cache, mede o que o usuário espera (acerto ou cálculo).
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltorio(self, *args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                self.metricas.registrar(operacao, time.perf_counter() - inicio)
+        return envoltorio
+    return decorador
@@ -0,0 +1,164 @@
+"""
+🔎 NAVEGAÇÃO PAGINADA DAS TABELAS
+Filtros avaliados no servidor sobre bitmaps por categoria (pré-calculados) e intervalos de datas/matrícula;
+só a página visível é materializada e enviada ao navegador.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from compactacao import materializar
+
+
+# Colunas com até esse número de valores distintos ganham um bitmap por valor
+LIMITE_CATEGORIAS = 256
+
+# Resultados de filtro guardados por navegador (trocar de página não refiltra)
+MAX_FILTROS_EM_CACHE = 32
+
+
+class NavegadorTabela:
+    """
+    Índice de filtros de uma tabela: um bitmap compactado (np.packbits) por valor de cada coluna categórica.
+
+    Filtro: {'categorias': {coluna: [valores]}, 'intervalos': {coluna: (inicio, fim)}}; valores de uma
+    coluna se combinam com OU, colunas diferentes com E; intervalos são fechados e aceitam None.
+    """
+
+    def __init__(self, df, limite_categorias=LIMITE_CATEGORIAS):
+        self.df = df
+        self.linhas = len(df)
+        self._bitmaps = {}
+        self._valores = {}
+        self._limites = {}
+        self._arrays = {}
+        self._filtros = OrderedDict()
+        self._lock = threading.Lock()
+
+        for coluna in df.columns:
+            serie = df[coluna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                categorias = serie.cat.categories
+                codigos = serie.cat.codes.to_numpy()
+            elif serie.dtype == object and serie.nunique() <= limite_categorias:
+                codigos, categorias = pd.factorize(serie, sort=True)
+            else:
+                if pd.api.types.is_datetime64_any_dtype(serie) or coluna == 'MATRICULA':
+                    self._arrays[coluna] = serie.to_numpy()
+                continue
+
+            if len(categorias) > limite_categorias:
+                continue
+            self._valores[coluna] = list(categorias)
+            self._bitmaps[coluna] = {
+                valor: np.packbits(codigos == codigo)
+                for codigo, valor in enumerate(categorias)
+            }
+
+    # ==================== METADADOS ====================
+    @property
+    def colunas_categoricas(self):
+        return list(self._valores)
+
+    @property
+    def colunas_intervalo(self):
+        """Colunas filtráveis por intervalo (datas e matrícula)"""
+        return list(self._arrays)
+
+    def valores(self, coluna):
+        """Valores possíveis de uma coluna categórica"""
+        return self._valores[coluna]
+
+    def limites(self, coluna):
+        """(mínimo, máximo) de uma coluna de intervalo, ignorando vazios"""
+        if coluna not in self._limites:
+            serie = self.df[coluna]
+            self._limites[coluna] = (serie.min(), serie.max())
+        return self._limites[coluna]
+
+    # ==================== FILTRO ====================
+    @staticmethod
+    def _chave(filtro):
+        categorias = filtro.get('categorias') or {}
+        intervalos = filtro.get('intervalos') or {}
+        return (
+            tuple(sorted((c, tuple(sorted(map(str, v)))) for c, v in categorias.items() if v)),
+            tuple(sorted((c, tuple(map(str, v))) for c, v in intervalos.items() if v and any(x is not None for x in v)))
+        )
+
+    def _mascara(self, filtro):
+        """Bitmap compactado (ou None = todas as linhas) do filtro"""
+        mascara = None
+
+        for coluna, valores in (filtro.get('categorias') or {}).items():
+            if not valores:
+                continue
+            bitmaps = self._bitmaps[coluna]
+            selecionados = [bitmaps[v] for v in valores if v in bitmaps]
+            if selecionados:
+                coluna_mascara = np.bitwise_or.reduce(selecionados) if len(selecionados) > 1 else selecionados[0]
+            else:
+                coluna_mascara = np.zeros((self.linhas + 7) // 8, dtype=np.uint8)
+            mascara = coluna_mascara if mascara is None else mascara & coluna_mascara
+
+        for coluna, (inicio, fim) in (filtro.get('intervalos') or {}).items():
+            if inicio is None and fim is None:
+                continue
+            valores = self._arrays[coluna]
+            if np.issubdtype(valores.dtype, np.datetime64):
+                inicio = None if inicio is None else np.datetime64(pd.Timestamp(inicio))
+                # Fim inclui o dia inteiro
+                fim = None if fim is None else np.datetime64(pd.Timestamp(fim) + pd.Timedelta(days=1))
+                condicao = np.ones(self.linhas, dtype=bool)
+                if inicio is not None:
+                    condicao &= valores >= inicio
+                if fim is not None:
+                    condicao &= valores < fim
+            else:
+                condicao = np.ones(self.linhas, dtype=bool)
+                if inicio is not None:
+                    condicao &= valores >= inicio
+                if fim is not None:
+                    condicao &= valores <= fim
+            compactada = np.packbits(condicao)
+            mascara = compactada if mascara is None else mascara & compactada
+
+        return mascara
+
+    def filtrar(self, filtro=None):
+        """Posições (np.ndarray) das linhas que passam no filtro; None = sem filtro, todas as linhas"""
+        chave = self._chave(filtro or {})
+        if chave == ((), ()):
+            return None
+
+        with self._lock:
+            if chave in self._filtros:
+                self._filtros.move_to_end(chave)
+                return self._filtros[chave]
+
+        mascara = self._mascara(filtro)
+        posicoes = None if mascara is None else np.flatnonzero(np.unpackbits(mascara, count=self.linhas))
+
+        with self._lock:
+            self._filtros[chave] = posicoes
+            while len(self._filtros) > MAX_FILTROS_EM_CACHE:
+                self._filtros.popitem(last=False)
+        return posicoes
+
+    def contar(self, filtro=None):
+        """Número de linhas que passam no filtro"""
+        posicoes = self.filtrar(filtro)
+        return self.linhas if posicoes is None else len(posicoes)
+
+    def pagina(self, filtro=None, numero=0, tamanho=50):
+        """Linhas da página numero (a partir de 0), já com as colunas derivadas"""
+        inicio = numero * tamanho
+        posicoes = self.filtrar(filtro)
+        if posicoes is None:
+            recorte = self.df.iloc[inicio:inicio + tamanho]
+        else:
+            recorte = self.df.take(posicoes[inicio:inicio + tamanho])
+        return materializar(recorte)
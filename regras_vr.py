@@ -0,0 +1,168 @@
+"""
+📜 REGRAS DE ELEGIBILIDADE AO VR POR SINDICATO
+Tabela declarativa do que cada acordo coletivo exclui (cargos, situações, desligamentos até o dia
+de corte), compilada uma vez: cada regra é avaliada por valor distinto e a população inteira só
+consulta tabelas pequenas pelos códigos, com o motivo de cada exclusão.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculo_vr import calcular_vr, limites_competencia
+from roteador import normalizar
+
+
+# Regras de quem não tem regra própria (inclusive admitidos do mês, ainda sem sindicato).
+# Valor diário e estado de cada sindicato ficam em calculo_vr.SINDICATOS.
+REGRAS_PADRAO = {
+    # Cargos que começam com esses termos (sem acento, minúsculos) não recebem VR
+    'cargos_excluidos': ['estagiario', 'aprendiz', 'diretor'],
+    'situacoes_excluidas': ['Afastado', 'Licença', 'Exterior'],
+    # Desligamento comunicado até esse dia do mês: sem VR na competência (depois dele, proporcional)
+    'dia_corte_desligamento': 15
+}
+
+# Sindicato -> o que o acordo muda em relação ao padrão
+REGRAS_SINDICATO = {
+    'SINDPD SP - SIND.TRAB.EM PROC DADOS SP': {},
+    'SINDPPD RS - SINDICATO TRAB. PROC. DADOS RS': {'dia_corte_desligamento': 20},
+    'SINDPD RJ - SINDICATO TRAB. PROC. DADOS RJ': {'cargos_excluidos': ['estagiario', 'diretor']},
+    'SINDPD MG - SINDICATO TRAB. PROC. DADOS MG': {'dia_corte_desligamento': 10}
+}
+
+# Regra -> explicação gravada em MOTIVO_INELEGIBILIDADE (na ordem de prioridade)
+MOTIVOS = {
+    'cargos_excluidos': 'Cargo sem direito ao VR no acordo: {}',
+    'situacoes_excluidas': 'Situação sem direito ao VR: {}',
+    'dia_corte_desligamento': 'Desligamento comunicado até o dia {} do mês'
+}
+
+
+def _codificar(serie):
+    """(códigos, valores distintos) de uma coluna; vazios têm código -1"""
+    codigos, valores = pd.factorize(serie, sort=False)
+    return codigos, [str(v) for v in valores]
+
+
+class _Textos:
+    """Textos distintos numerados (0 = vazio), para montar uma coluna category direto dos códigos"""
+
+    def __init__(self):
+        self._codigos = {'': 0}
+
+    def codigos(self, textos):
+        return np.array([self._codigos.setdefault(t, len(self._codigos)) for t in textos], dtype=np.int64)
+
+    def categorias(self):
+        return list(self._codigos)
+
+
+class RegrasElegibilidade:
+    """
+    Regras por sindicato já resolvidas contra o padrão; a última posição é a regra padrão.
+
+    avaliar() devolve, por matrícula, ELEGIVEL ('SIM'/'NAO') e MOTIVO (vazio para elegíveis).
+    """
+
+    def __init__(self, regras=None, padrao=None):
+        padrao = REGRAS_PADRAO if padrao is None else padrao
+        regras = REGRAS_SINDICATO if regras is None else regras
+
+        desconhecidas = {chave for r in [padrao, *regras.values()] for chave in r} - set(MOTIVOS)
+        if desconhecidas:
+            raise ValueError(f"Regra(s) desconhecida(s): {', '.join(sorted(desconhecidas))}")
+
+        completas = [{**padrao, **regras[s]} for s in regras] + [dict(padrao)]
+        self.sindicatos = list(regras)
+        self._cargos = [tuple(normalizar(c) for c in r['cargos_excluidos']) for r in completas]
+        self._situacoes = [{normalizar(s) for s in r['situacoes_excluidas']} for r in completas]
+        self._corte = np.array([r['dia_corte_desligamento'] for r in completas], dtype=np.int64)
+
+    def _regra_por_sindicato(self, sindicato):
+        """Índice da regra de cada linha (sindicato sem regra própria ou vazio -> padrão)"""
+        codigos, valores = _codificar(sindicato)
+        posicao = {s: i for i, s in enumerate(self.sindicatos)}
+        tabela = np.array([posicao.get(v, len(self.sindicatos)) for v in valores] + [len(self.sindicatos)])
+        return tabela[codigos]
+
+    def _excluidos(self, serie, regra, condicao, modelo, textos):
+        """
+        (máscara, código do motivo) de uma regra sobre valores de texto.
+
+        A condição roda uma vez por (regra, valor distinto); as linhas só consultam a matriz.
+        """
+        codigos, valores = _codificar(serie)
+        normalizados = [normalizar(v) for v in valores]
+        matriz = np.array([
+            [condicao(i, v) for v in normalizados] + [False]
+            for i in range(len(self._corte))
+        ], dtype=bool).reshape(len(self._corte), len(valores) + 1)
+        mascara = matriz[regra, codigos]
+        return mascara, textos.codigos([modelo.format(v) for v in valores] + [''])[codigos]
+
+    def avaliar(self, dados, competencia):
+        """
+        Elegibilidade de todos os funcionários e admitidos na competência (mesma base de calcular_vr).
+
+        DataFrame indexado por MATRICULA com ELEGIVEL e MOTIVO (category).
+        """
+        inicio_mes, fim_mes = limites_competencia(competencia)
+        func = dados['funcionarios']
+        adm = dados['admissoes']
+        novos = adm[~adm['MATRICULA'].isin(func['MATRICULA']) & (adm['DATA_ADMISSAO'] < fim_mes)]
+        base = pd.concat([
+            func[['MATRICULA', 'SINDICATO', 'CARGO', 'SITUACAO']].astype({'SINDICATO': object, 'CARGO': object, 'SITUACAO': object}),
+            novos[['MATRICULA', 'CARGO']].astype({'CARGO': object})
+        ], ignore_index=True).drop_duplicates('MATRICULA', ignore_index=True)
+
+        regra = self._regra_por_sindicato(base['SINDICATO'])
+        textos = _Textos()
+
+        cargo, motivo_cargo = self._excluidos(
+            base['CARGO'], regra, lambda i, v: v.startswith(self._cargos[i]),
+            MOTIVOS['cargos_excluidos'], textos
+        )
+        situacao, motivo_situacao = self._excluidos(
+            base['SITUACAO'], regra, lambda i, v: v in self._situacoes[i],
+            MOTIVOS['situacoes_excluidas'], textos
+        )
+
+        # Desligamento comunicado até o dia de corte da regra do funcionário
+        desligamentos = dados['desligamentos'].drop_duplicates('MATRICULA')
+        posicao = pd.Index(desligamentos['MATRICULA']).get_indexer(base['MATRICULA'])
+        com_desligamento = posicao >= 0
+        data = np.full(len(base), np.datetime64('NaT'), dtype='datetime64[D]')
+        data[com_desligamento] = desligamentos['DATA_DESLIGAMENTO'].to_numpy(dtype='datetime64[D]')[posicao[com_desligamento]]
+        comunicado = np.zeros(len(base), dtype=bool)
+        comunicado[com_desligamento] = (
+            desligamentos['COMUNICADO'].astype(str).str.strip().str.upper().to_numpy() == 'OK'
+        )[posicao[com_desligamento]]
+        limite = inicio_mes + (self._corte[regra] - 1).astype('timedelta64[D]')
+        desligado = comunicado & (data <= limite)
+        motivo_desligamento = textos.codigos([MOTIVOS['dia_corte_desligamento'].format(d) for d in self._corte])[regra]
+
+        # Prioridade do motivo: cargo, situação, desligamento
+        motivo = np.select(
+            [cargo, situacao, desligado], [motivo_cargo, motivo_situacao, motivo_desligamento], 0
+        )
+        return pd.DataFrame({
+            'ELEGIVEL': np.where(motivo == 0, 'SIM', 'NAO').astype(object),
+            'MOTIVO': pd.Categorical.from_codes(motivo, categories=textos.categorias())
+        }, index=pd.Index(base['MATRICULA'].to_numpy(), name='MATRICULA'))
+
+
+_REGRAS = RegrasElegibilidade()
+
+
+def avaliar_elegibilidade(dados, competencia, regras=None):
+    """Elegibilidade pelas regras dadas (padrão: REGRAS_SINDICATO, compiladas uma vez)"""
+    return (regras or _REGRAS).avaliar(dados, competencia)
+
+
+def calcular_vr_com_regras(dados, competencia, regras=None, **parametros):
+    """calcular_vr com ELEGIVEL e MOTIVO_INELEGIBILIDADE vindos das regras dos sindicatos"""
+    elegibilidade = avaliar_elegibilidade(dados, competencia, regras)
+    return calcular_vr(
+        dados, competencia,
+        elegivel=elegibilidade['ELEGIVEL'], motivos=elegibilidade['MOTIVO'], **parametros
+    )
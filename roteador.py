@@ -0,0 +1,284 @@
+"""
+🧭 ROTEADOR DE INTENÇÕES DO AGENTE
+Classifica a pergunta e extrai as entidades em uma única passada de tokenização
+"""
+
+import re
+import unicodedata
+import calendar
+from datetime import date, timedelta
+
+
+# ==================== VOCABULÁRIO ====================
+# Ordem = prioridade: a primeira intenção encontrada na lista vence
+INTENCOES = [
+    ('saudacao', ['ola', 'oi', 'bom dia', 'boa tarde', 'boa noite', 'hello', 'hi']),
+    ('despedida', ['tchau', 'ate logo', 'ate mais', 'ate breve', 'adeus', 'bye', 'obrigado', 'obrigada']),
+    ('conciliacao', ['concili*']),
+    ('comparacao', ['mudou', 'mudaram', 'mudanc*', 'compar*', 'diferenc*', 'variacao', 'perdeu', 'perderam',
+                    'ganhou', 'ganharam']),
+    ('estatisticas', ['quantos', 'total']),
+    ('ferias', ['ferias']),
+    ('admissoes', ['admiss*', 'admit*', 'contrat*']),
+    ('desligamentos', ['deslig*', 'demiss*']),
+    ('vr', ['vr', 'vale', 'refeicao'])
+]
+
+# A matrícula tem prioridade sobre as perguntas gerais, mas não sobre saudação/despedida;
+# "conciliar arquivo" é um comando e vence qualquer número que venha junto
+PRIORIDADE = ['saudacao', 'despedida', 'conciliacao', 'matricula', 'comparacao', 'estatisticas', 'ferias', 'admissoes', 'desligamentos', 'vr']
+
+# Intenções que sabem responder por período ("em 15/03", "esta semana"); com data, vencem 'estatisticas'
+INTENCOES_COM_DATA = ['ferias', 'admissoes', 'desligamentos']
+
+# Verbos que dizem qual ponta do período de férias interessa; 'retorno' sozinho já indica férias
+EVENTOS = {
+    'volta': 'retorno', 'voltam': 'retorno', 'volto': 'retorno',
+    'retorna': 'retorno', 'retornam': 'retorno', 'retorno': 'retorno',
+    'sai': 'inicio', 'saem': 'inicio', 'comeca': 'inicio', 'comecam': 'inicio',
+    'inicia': 'inicio', 'iniciam': 'inicio'
+}
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+}
+
+PERIODOS_RELATIVOS = {'hoje', 'amanha', 'ontem', 'semana', 'mes'}
+
+DEPARTAMENTOS = {
+    'ti': 'TI',
+    'rh': 'RH',
+    'financeiro': 'FINANCEIRO',
+    'operacoes': 'OPERAÇÕES'
+}
+
+# Tabela de tradução minúscula-sem-acento para todo o Latin-1 (str.translate é bem mais rápido que NFKD por chamada)
+_SEM_ACENTO = {
+    ord(c): unicodedata.normalize('NFKD', c.lower()).encode('ascii', 'ignore').decode() or c.lower()
+    for c in map(chr, range(0xC0, 0x180))
+}
+_SEM_ACENTO.update({ord(c): c.lower() for c in map(chr, range(ord('A'), ord('Z') + 1))})
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos"""
+    return texto.translate(_SEM_ACENTO)
+
+
+# Vocabulário compilado em tabelas hash: palavra, par de palavras e prefixo -> intenção
+_PALAVRAS = {}
+_PARES = {}
+_PREFIXOS = {}
+for _intencao, _termos in INTENCOES:
+    for _termo in _termos:
+        if _termo.endswith('*'):
+            _PREFIXOS[_termo[:-1]] = _intencao
+        elif ' ' in _termo:
+            _PARES[tuple(_termo.split())] = _intencao
+        else:
+            _PALAVRAS[_termo] = _intencao
+_INICIO_PARES = {primeira for primeira, _ in _PARES}
+_TAMANHOS_PREFIXO = sorted({len(p) for p in _PREFIXOS})
+_NOMES_INTENCOES = frozenset(PRIORIDADE)
+_ORDEM = {intencao: i for i, intencao in enumerate(PRIORIDADE)}
+
+# Classes cujo resultado depende de hoje/ano padrão: perguntas com elas não vão para a memória de perguntas
+_CLASSES_DE_DATA = frozenset(['data', 'mes_nome', 'periodo'])
+
+# Única regex da passada: palavras, números e datas dd/mm[/aa[aa]]
+_TOKENS = re.compile(r'\w+(?:/\w+)*')
+_DATA = re.compile(r'(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?$')
+
+# Memória token (minúsculo) -> classe; o vocabulário de perguntas é pequeno, os números não
+_CLASSES = {}
+LIMITE_CLASSES = 50000
+
+# Memória pergunta -> resultado: as mesmas perguntas se repetem muito ("Quantos funcionários temos?")
+_PERGUNTAS = {}
+LIMITE_PERGUNTAS = 20000
+
+
+def _classe_token(token):
+    """Classe de um token: intenção, marcador de entidade ou None"""
+    token = normalizar(token)
+    if token in _PALAVRAS:
+        return _PALAVRAS[token]
+    if token.isdigit():
+        return 'numero' if len(token) == 5 else 'digitos'
+    if '/' in token:
+        return 'data' if _DATA.match(token) else None
+    if token in _INICIO_PARES:
+        return 'par'
+    if token in DEPARTAMENTOS:
+        return 'departamento'
+    if token in EVENTOS:
+        return 'evento'
+    if token in MESES:
+        return 'mes_nome'
+    if token in PERIODOS_RELATIVOS:
+        return 'periodo'
+    if token == 'matricula':
+        return 'rotulo_matricula'
+    for tamanho in _TAMANHOS_PREFIXO:
+        if token[:tamanho] in _PREFIXOS:
+            return _PREFIXOS[token[:tamanho]]
+    return None
+
+
+# ==================== CLASSIFICAÇÃO ====================
+def classificar(pergunta, ano_padrao=None, hoje=None):
+    """
+    Retorna {'intencao', 'matricula', 'data', 'periodo', 'evento', 'departamento'} para a pergunta.
+
+    Cada token é classificado uma única vez (memória por token) e perguntas repetidas sem data vêm
+    prontas da memória de perguntas; a intenção é 'padrao' quando nada casa.
+    periodo é (inicio, fim) em date; expressões relativas ("esta semana") partem de hoje.
+    """
+    global _CLASSES, _PERGUNTAS
+    pronto = _PERGUNTAS.get(pergunta)
+    if pronto is not None:
+        return dict(pronto)
+
+    tokens = _TOKENS.findall(pergunta.lower())
+
+    # Referência local: outra thread pode trocar o dicionário global no meio da chamada.
+    # Caminho comum: todos os tokens já vistos (sem montar conjuntos só para descobrir isso)
+    memoria = _CLASSES
+    try:
+        classes = [memoria[token] for token in tokens]
+    except KeyError:
+        novos = set(tokens).difference(memoria)
+        if len(memoria) + len(novos) > LIMITE_CLASSES:
+            memoria = _CLASSES = {}
+            novos = set(tokens)
+        for token in novos:
+            memoria[token] = _classe_token(token)
+        classes = [memoria[token] for token in tokens]
+
+    presentes = set(classes)
+    encontradas = presentes & _NOMES_INTENCOES
+
+    # Entidades só são procuradas quando o marcador aparece
+    if 'par' in presentes:
+        for anterior, token in zip(tokens, tokens[1:]):
+            par = _PARES.get((normalizar(anterior), normalizar(token)))
+            if par:
+                encontradas.add(par)
+
+    # Como extrair_matricula fazia: um número de 5 dígitos vence "matrícula N"
+    matricula = None
+    if 'numero' in presentes:
+        matricula = int(tokens[classes.index('numero')])
+    elif 'rotulo_matricula' in presentes and 'digitos' in presentes:
+        for anterior, classe, token in zip(classes, classes[1:], tokens[1:]):
+            if anterior == 'rotulo_matricula' and classe == 'digitos':
+                matricula = int(token)
+                break
+    if matricula:
+        encontradas.add('matricula')
+
+    data = None
+    if 'data' in presentes:
+        data = _montar_data(tokens[classes.index('data')], ano_padrao)
+
+    departamento = None
+    if 'departamento' in presentes:
+        departamento = DEPARTAMENTOS[normalizar(tokens[classes.index('departamento')])]
+
+    evento = None
+    if 'evento' in presentes:
+        evento = EVENTOS[normalizar(tokens[classes.index('evento')])]
+        if evento == 'retorno':
+            encontradas.add('ferias')
+
+    periodo = None
+    if presentes & {'data', 'mes_nome', 'periodo'}:
+        periodo = _montar_periodo(tokens, classes, ano_padrao, hoje or date.today())
+
+    intencao = min(encontradas, key=_ORDEM.__getitem__) if encontradas else 'padrao'
+    if periodo and intencao == 'estatisticas':
+        intencao = next((i for i in INTENCOES_COM_DATA if i in encontradas), intencao)
+
+    resultado = {
+        'intencao': intencao,
+        'matricula': matricula,
+        'data': data,
+        'periodo': periodo,
+        'evento': evento,
+        'departamento': departamento
+    }
+    if presentes.isdisjoint(_CLASSES_DE_DATA):
+        memoria = _PERGUNTAS
+        if len(memoria) >= LIMITE_PERGUNTAS:
+            memoria = _PERGUNTAS = {}
+        memoria[pergunta] = resultado
+        return dict(resultado)
+    return resultado
+
+
+def _montar_data(token, ano_padrao):
+    """Converte dd/mm[/aaaa] em date (None se inválida)"""
+    dia, mes, ano = _DATA.match(token).groups()
+    if ano is None:
+        ano = ano_padrao or date.today().year
+    elif len(ano) == 2:
+        ano = 2000 + int(ano)
+
+    try:
+        return date(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None
+
+
+def extrair_meses(pergunta):
+    """Meses citados por nome, na ordem da pergunta: [(mês, ano ou None)] ("de fevereiro para março de 2025")"""
+    palavras = [normalizar(t) for t in _TOKENS.findall(pergunta.lower())]
+    meses = []
+    for i, palavra in enumerate(palavras):
+        if palavra in MESES:
+            seguintes = [p for p in palavras[i + 1:i + 3] if p.isdigit() and len(p) == 4]
+            meses.append((MESES[palavra], int(seguintes[0]) if seguintes else None))
+    return meses
+
+
+def _montar_periodo(tokens, classes, ano_padrao, hoje):
+    """(inicio, fim) da primeira expressão de data: dd/mm [a dd/mm], nome do mês, hoje/semana/mês relativos"""
+    ano = ano_padrao or hoje.year
+    datas = [_montar_data(t, ano) for t, c in zip(tokens, classes) if c == 'data']
+    datas = [d for d in datas if d is not None]
+    if len(datas) >= 2:
+        return min(datas[:2]), max(datas[:2])
+    if datas:
+        return datas[0], datas[0]
+
+    palavras = [normalizar(t) for t in tokens]
+    for i, (palavra, classe) in enumerate(zip(palavras, classes)):
+        if classe == 'mes_nome':
+            # "março de 2025" / "março 2025"
+            seguintes = [p for p in palavras[i + 1:i + 3] if p.isdigit() and len(p) == 4]
+            ano_mes = int(seguintes[0]) if seguintes else ano
+            mes = MESES[palavra]
+            return date(ano_mes, mes, 1), date(ano_mes, mes, calendar.monthrange(ano_mes, mes)[1])
+
+        if classe == 'periodo':
+            vizinhas = set(palavras[max(0, i - 2):i + 3])
+            deslocamento = 0
+            if vizinhas & {'proxima', 'proximo'} or {'que', 'vem'} <= vizinhas:
+                deslocamento = 1
+            elif vizinhas & {'passada', 'passado', 'ultima', 'ultimo'}:
+                deslocamento = -1
+
+            if palavra in ('hoje', 'amanha', 'ontem'):
+                dia = hoje + timedelta(days={'hoje': 0, 'amanha': 1, 'ontem': -1}[palavra])
+                return dia, dia
+            if palavra == 'semana':
+                segunda = hoje - timedelta(days=hoje.weekday()) + timedelta(weeks=deslocamento)
+                return segunda, segunda + timedelta(days=6)
+            if palavra == 'mes':
+                indice_mes = hoje.year * 12 + hoje.month - 1 + deslocamento
+                ano_mes, mes = divmod(indice_mes, 12)
+                mes += 1
+                return date(ano_mes, mes, 1), date(ano_mes, mes, calendar.monthrange(ano_mes, mes)[1])
+
+    return None
@@ -0,0 +1,304 @@
+"""
+🌐 SERVIDOR HTTP DO AGENTE (SEM STREAMLIT)
+Expõe o AgenteChat em JSON para o portal interno e chatbots, com asyncio da biblioteca padrão.
+
+Rotas:
+    POST /perguntar          {"pergunta": "..."}      -> {"pergunta", "intencao", "resposta"}
+    GET  /matricula/<numero>                          -> {"matricula", "encontrada", "resposta", "registro"}
+    POST /lote               {"itens": ["...", ...]}  -> {"respostas": [...]}
+    POST /delta              {"admissoes": [{...}], "desligamentos": [...], "ferias": [...]}
+                                                      -> {"tabelas", "matriculas", "versao"}
+    GET  /saude                                       -> situação e tamanho das tabelas
+    GET  /metricas                                    -> métricas do agente em texto Prometheus
+
+Uso: python servidor.py [--host 127.0.0.1] [--porta 8080] [--threads 8]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from app import COMPETENCIA_ATUAL, FUNCIONARIOS_SIMULADOS, PASTA_DADOS, criar_agente
+from gerador import gerar_dados
+from ingestao import BASES_DELTA, carregar_pasta, normalizar_delta
+
+logger = logging.getLogger(__name__)
+
+# Limites de uma requisição
+MAX_CORPO = 1_000_000
+MAX_ITENS_LOTE = 10_000
+TEMPO_OCIOSO = 30
+
+STATUS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class ErroHTTP(Exception):
+    """Erro que vira uma resposta JSON {"erro": mensagem} com o status dado"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+def _json_padrao(valor):
+    """Converte tipos do pandas/numpy que o json não conhece"""
+    if valor is None or (not isinstance(valor, (list, dict, str)) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (pd.Timestamp, datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return str(valor)
+
+
+def _em_json(conteudo):
+    return json.dumps(conteudo, ensure_ascii=False, default=_json_padrao).encode('utf-8')
+
+
+# ==================== SERVIDOR ====================
+class ServidorAgente:
+    """
+    Servidor HTTP/1.1 mínimo (keep-alive, corpo por Content-Length) sobre um único AgenteChat.
+
+    O trabalho com pandas roda em um pool de threads, fora do loop de eventos. Threads, e não
+    processos: todas compartilham o mesmo conjunto de dados e índices sem copiá-los.
+    """
+
+    def __init__(self, agente, threads=8):
+        self.agente = agente
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='agente')
+        self.rotas = {
+            ('POST', '/perguntar'): self.perguntar,
+            ('POST', '/lote'): self.lote,
+            ('POST', '/delta'): self.delta,
+            ('GET', '/saude'): self.saude,
+            ('GET', '/metricas'): self.metricas
+        }
+
+    async def executar(self, funcao, *args):
+        """Roda funcao(*args) no pool de threads"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, funcao, *args)
+
+    # ==================== ROTAS ====================
+    async def perguntar(self, corpo):
+        pergunta = corpo.get('pergunta')
+        if not isinstance(pergunta, str) or not pergunta.strip():
+            raise ErroHTTP(400, 'Informe "pergunta" (texto)')
+
+        intencao, resposta = await self.executar(self.agente.processar_com_intencao, pergunta)
+        return {'pergunta': pergunta, 'intencao': intencao, 'resposta': resposta}
+
+    async def matricula(self, numero):
+        if not numero.isdigit():
+            raise ErroHTTP(400, 'Matrícula deve ser numérica')
+
+        matricula = int(numero)
+
+        def consultar():
+            return self.agente.consultar_matricula(matricula), self.agente.indice.registro(matricula)
+
+        resposta, registro = await self.executar(consultar)
+        return {
+            'matricula': matricula,
+            'encontrada': any(v is not None for v in registro.values()),
+            'resposta': resposta,
+            'registro': registro
+        }
+
+    async def lote(self, corpo):
+        itens = corpo.get('itens')
+        if not isinstance(itens, list) or not itens:
+            raise ErroHTTP(400, 'Informe "itens" (lista de perguntas/matrículas)')
+        if len(itens) > MAX_ITENS_LOTE:
+            raise ErroHTTP(413, f'Máximo de {MAX_ITENS_LOTE} itens por lote')
+
+        respostas = await self.executar(self.agente.processar_lote, [str(item) for item in itens])
+        return {'respostas': respostas}
+
+    async def delta(self, corpo):
+        bases = {base: linhas for base, linhas in corpo.items() if base in BASES_DELTA}
+        if not bases or not all(isinstance(linhas, list) for linhas in bases.values()):
+            raise ErroHTTP(400, f'Informe ao menos uma lista de linhas em: {", ".join(BASES_DELTA)}')
+
+        def aplicar():
+            movimentacao = normalizar_delta(
+                {base: pd.DataFrame(linhas) for base, linhas in bases.items()}, COMPETENCIA_ATUAL
+            )
+            return self.agente.aplicar_movimentacao(movimentacao)
+
+        try:
+            alteracoes = await self.executar(aplicar)
+        except (KeyError, ValueError, TypeError) as erro:
+            raise ErroHTTP(400, f'Movimentação inválida: {erro}')
+        return {
+            'tabelas': sorted(alteracoes['tabelas']),
+            'matriculas': len(alteracoes['matriculas']),
+            'versao': self.agente.versao
+        }
+
+    async def saude(self, corpo):
+        return {
+            'situacao': 'ok',
+            'competencia': COMPETENCIA_ATUAL,
+            'versao': self.agente.versao,
+            'tabelas': {nome: len(df) for nome, df in self.agente.dados.items()}
+        }
+
+    async def metricas(self, corpo):
+        return self.agente.metricas.exportar_prometheus(self.agente.cache.estatisticas())
+
+    # ==================== HTTP ====================
+    async def despachar(self, metodo, caminho, corpo_bruto):
+        """Resolve a rota; devolve (status, conteúdo)"""
+        caminho = caminho.split('?', 1)[0].rstrip('/') or '/'
+
+        if caminho.startswith('/matricula/'):
+            if metodo != 'GET':
+                raise ErroHTTP(405, 'Use GET')
+            return 200, await self.matricula(caminho[len('/matricula/'):])
+
+        rota = self.rotas.get((metodo, caminho))
+        if rota is None:
+            if any(c == caminho for _, c in self.rotas):
+                raise ErroHTTP(405, 'Método não permitido nesta rota')
+            raise ErroHTTP(404, f'Rota não encontrada: {caminho}')
+
+        corpo = {}
+        if metodo == 'POST':
+            try:
+                corpo = json.loads(corpo_bruto or b'{}')
+            except ValueError:
+                raise ErroHTTP(400, 'Corpo não é JSON válido')
+            if not isinstance(corpo, dict):
+                raise ErroHTTP(400, 'Corpo deve ser um objeto JSON')
+
+        return 200, await rota(corpo)
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão (várias requisições em keep-alive)"""
+        try:
+            while True:
+                try:
+                    linha = await asyncio.wait_for(leitor.readline(), TEMPO_OCIOSO)
+                except asyncio.TimeoutError:
+                    break
+                if not linha:
+                    break
+
+                partes = linha.decode('latin-1').split()
+                if len(partes) != 3:
+                    break
+                metodo, caminho, versao = partes
+
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                manter = (cabecalhos.get('connection', '').lower() != 'close'
+                          if versao == 'HTTP/1.1' else
+                          cabecalhos.get('connection', '').lower() == 'keep-alive')
+
+                inicio = time.perf_counter()
+                try:
+                    try:
+                        tamanho = int(cabecalhos.get('content-length') or 0)
+                    except ValueError:
+                        tamanho = -1
+                    if tamanho < 0:
+                        # Sem saber onde o corpo termina, a conexão não pode ser reaproveitada
+                        manter = False
+                        raise ErroHTTP(400, 'Content-Length inválido')
+                    if tamanho > MAX_CORPO:
+                        manter = False
+                        raise ErroHTTP(413, f'Corpo acima de {MAX_CORPO} bytes')
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b''
+                    status, conteudo = await self.despachar(metodo.upper(), caminho, corpo)
+                except ErroHTTP as erro:
+                    status, conteudo = erro.status, {'erro': erro.mensagem}
+                except Exception:
+                    logger.exception("Erro ao atender %s %s", metodo, caminho)
+                    status, conteudo = 500, {'erro': 'Erro interno'}
+
+                if isinstance(conteudo, str):
+                    dados, tipo = conteudo.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    dados, tipo = _em_json(conteudo), 'application/json; charset=utf-8'
+
+                escritor.write(
+                    f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                    f"Content-Type: {tipo}\r\n"
+                    f"Content-Length: {len(dados)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode('latin-1') + dados
+                )
+                await escritor.drain()
+                logger.debug("%s %s %d %.1f ms", metodo, caminho, status, (time.perf_counter() - inicio) * 1e3)
+
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host, porta, pronto=None):
+        """Escuta até ser cancelado; pronto (asyncio.Event) é sinalizado quando a porta está aberta"""
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        logger.info("Agente servindo em http://%s:%d", host, porta)
+        if pronto is not None:
+            pronto.set()
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def carregar_agente_servidor(pasta=PASTA_DADOS, funcionarios=FUNCIONARIOS_SIMULADOS):
+    """Carrega os dados uma vez (bases do mês ou simulados) e monta o agente compartilhado"""
+    inicio = time.perf_counter()
+    dados = carregar_pasta(pasta, COMPETENCIA_ATUAL) if pasta else gerar_dados(
+        funcionarios, competencia=COMPETENCIA_ATUAL, seed=42
+    )
+    agente = criar_agente(dados)
+    logger.info("Agente carregado em %.1f s (%d funcionários)",
+                time.perf_counter() - inicio, len(agente.dados['funcionarios']))
+    return agente
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--threads', type=int, default=min(32, (os.cpu_count() or 1) + 4))
+    parser.add_argument('--pasta', default=PASTA_DADOS, help='pasta com as bases do mês em .xlsx ou .csv (padrão: dados simulados)')
+    parser.add_argument('--funcionarios', type=int, default=FUNCIONARIOS_SIMULADOS)
+    args = parser.parse_args()
+
+    servidor = ServidorAgente(carregar_agente_servidor(args.pasta, args.funcionarios), args.threads)
+    try:
+        asyncio.run(servidor.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    main()